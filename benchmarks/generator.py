@@ -0,0 +1,178 @@
+"""Generate synthetic Python programs with a given shape.
+
+Every generator takes a size and a seed and returns the same source for
+the same arguments, so benchmark results are comparable across runs.
+
+    python -m benchmarks.generator deep 40
+"""
+import argparse
+from random import Random
+from typing import Callable, Dict, List
+
+# Deepest nesting of blocks inside a function the parser accepts
+max_depth = 98
+
+
+def _simple_statement(random: Random, indent: str) -> str:
+    """Generate a random straight-line statement"""
+    name = f"v{random.randrange(20)}"
+    choice = random.randrange(4)
+    if choice == 0:
+        return f"{indent}{name} = {random.randrange(100)}\n"
+    if choice == 1:
+        return f"{indent}{name} = f({name}, v{random.randrange(20)})\n"
+    if choice == 2:
+        return f"{indent}print({name})\n"
+    return f"{indent}{name} += len(str({name}))\n"
+
+
+def deep_nesting(size: int, seed: int = 0) -> str:
+    """Generate a function whose branches and loops are nested size deep
+
+    Args:
+        size (int): Nesting depth
+        seed (int): Seed of the statements chosen
+
+    Returns:
+        str: Source of the program
+
+    Raises:
+        ValueError: If size is past the nesting depth Python can parse
+    """
+    if size > max_depth:
+        raise ValueError(f"Python cannot parse nesting past {max_depth}")
+    random = Random(seed)
+    source = "def deep(v0):\n"
+    for depth in range(1, size + 1):
+        indent = "    " * depth
+        source += _simple_statement(random, indent)
+        header = ("if v0:", "while v0:", "for v1 in v0:", "try:")[depth % 4]
+        source += f"{indent}{header}\n"
+    indent = "    " * (size + 1)
+    source += _simple_statement(random, indent)
+    # Close the try blocks from the innermost out
+    for depth in range(size, 0, -1):
+        if depth % 4 == 3:
+            source += f"{'    ' * depth}except ValueError:\n"
+            source += f"{'    ' * (depth + 1)}pass\n"
+    return source
+
+
+def wide_module(size: int, seed: int = 0) -> str:
+    """Generate a flat module of size statements with occasional branches
+
+    Args:
+        size (int): Number of statements
+        seed (int): Seed of the statements chosen
+
+    Returns:
+        str: Source of the program
+    """
+    random = Random(seed)
+    source = ""
+    for i in range(size):
+        if i % 10 == 9:
+            source += f"if v{random.randrange(20)}:\n"
+            source += _simple_statement(random, "    ")
+        else:
+            source += _simple_statement(random, "")
+    return source
+
+
+def exception_heavy(size: int, seed: int = 0) -> str:
+    """Generate size try statements with several handlers, else and finally
+    clauses, some of them nested
+
+    Args:
+        size (int): Number of try statements
+        seed (int): Seed of the statements chosen
+
+    Returns:
+        str: Source of the program
+    """
+    random = Random(seed)
+    source = ""
+    for i in range(size):
+        indent = "    " if i % 3 == 2 else ""
+        if indent:
+            source += "try:\n"
+        source += f"{indent}try:\n"
+        source += _simple_statement(random, indent + "    ")
+        for handler in range(random.randrange(1, 4)):
+            source += f"{indent}except E{handler} as error:\n"
+            source += _simple_statement(random, indent + "    ")
+        if random.randrange(2):
+            source += f"{indent}else:\n"
+            source += _simple_statement(random, indent + "    ")
+        source += f"{indent}finally:\n"
+        source += _simple_statement(random, indent + "    ")
+        if indent:
+            source += "except Exception:\n    pass\n"
+    return source
+
+
+def many_functions(size: int, seed: int = 0) -> str:
+    """Generate size small functions and classes with a branch or loop each
+
+    Args:
+        size (int): Number of functions
+        seed (int): Seed of the statements chosen
+
+    Returns:
+        str: Source of the program
+    """
+    random = Random(seed)
+    source = ""
+    for i in range(size):
+        if i % 8 == 7:
+            source += f"class C{i}:\n"
+            indent = "    "
+        else:
+            indent = ""
+        source += f"{indent}def function_{i}(v0):\n"
+        source += _simple_statement(random, indent + "    ")
+        header = ("if v0:", "while v0:", "for v1 in v0:")[i % 3]
+        source += f"{indent}    {header}\n"
+        source += _simple_statement(random, indent + "        ")
+        source += f"{indent}    return v0\n"
+    return source
+
+
+shapes: Dict[str, Callable[[int, int], str]] = {
+    "deep": deep_nesting,
+    "wide": wide_module,
+    "exceptions": exception_heavy,
+    "functions": many_functions,
+}
+
+
+def generate(shape: str, size: int, seed: int = 0) -> str:
+    """Generate a program of a named shape
+
+    Args:
+        shape (str): One of the keys of shapes
+        size (int): Size passed on to the generator of the shape
+        seed (int): Seed of the statements chosen
+
+    Returns:
+        str: Source of the program
+
+    Raises:
+        ValueError: If the shape is unknown
+    """
+    if shape not in shapes:
+        raise ValueError(f"Unknown program shape {shape}")
+    return shapes[shape](size, seed)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("shape", choices=sorted(shapes))
+    parser.add_argument("size", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(generate(args.shape, args.size, args.seed), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Measure CFG build speed, equivalence class throughput and peak memory.
+
+Graphs are built for synthetic programs of every shape in
+benchmarks.generator and for a corpus of standard library modules.
+Results are written as JSON and, given a baseline written by an earlier
+run, any measurement that grew past the tolerance fails the run.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from random import Random
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+from benchmarks.generator import generate, max_depth, shapes
+from src.cfg import CFG
+from src.models.equivalence_classes import EquivalenceClasses
+
+format_version = 1
+# Size and number of the programs of each shape, large enough to time
+sizes = {
+    "deep": (max_depth, 20),
+    "wide": (20000, 1),
+    "exceptions": (2000, 1),
+    "functions": (2000, 1),
+}
+# Measurements where a larger value is a regression
+regressing_metrics = ("seconds", "peak_bytes")
+
+
+def stdlib_corpus(count: int) -> List[str]:
+    """Read standard library modules in a stable order
+
+    Args:
+        count (int): Number of modules to read
+
+    Returns:
+        List[str]: Sources of the first count modules that parse
+    """
+    directory = os.path.dirname(ast.__file__)
+    sources: List[str] = []
+    for name in sorted(os.listdir(directory)):
+        if len(sources) == count:
+            break
+        if not name.endswith(".py"):
+            continue
+        try:
+            with open(os.path.join(directory, name), "rb") as source_file:
+                source = source_file.read().decode()
+            ast.parse(source)
+        except (OSError, UnicodeDecodeError, SyntaxError, ValueError):
+            continue
+        sources.append(source)
+    return sources
+
+
+def python_version() -> str:
+    """Get the implementation and version of the running interpreter"""
+    return f"{platform.python_implementation()} {platform.python_version()}"
+
+
+def platform_name() -> str:
+    """Get the operating system and machine the benchmarks run on"""
+    return f"{sys.platform}-{platform.machine()}"
+
+
+def best_of(repeat: int, run: Callable[[], None]) -> float:
+    """Time the fastest of several runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        run()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def peak_memory(run: Callable[[], object]) -> int:
+    """Measure the most memory allocated at once during a run, in bytes"""
+    tracemalloc.start()
+    try:
+        result = run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def measure_build(sources: List[str], repeat: int) -> Dict[str, float]:
+    """Measure building the graphs of parsed sources
+
+    Args:
+        sources (List[str]): Sources to build graphs of
+        repeat (int): Number of timed runs, of which the fastest counts
+
+    Returns:
+        Dict[str, float]: Seconds, blocks built and peak bytes
+    """
+    modules = [ast.parse(source).body for source in sources]
+
+    def build() -> List[CFG]:
+        return [CFG(nodes) for nodes in modules]
+
+    blocks = sum(len(cfg.basic_blocks) for cfg in build())
+    return {
+        "seconds": best_of(repeat, build),
+        "blocks": blocks,
+        "peak_bytes": peak_memory(build),
+    }
+
+
+def measure_equivalence_classes(
+    count: int, repeat: int
+) -> Dict[str, Dict[str, float]]:
+    """Measure union, batched union and find throughput over random pairs
+
+    Args:
+        count (int): Number of identifiers, pairs unioned and lookups
+        repeat (int): Number of timed runs, of which the fastest counts
+
+    Returns:
+        Dict[str, Dict[str, float]]: Seconds and operations per second of
+        union, of union_many and of find
+    """
+    random = Random(0)
+    pairs = [
+        (random.randrange(count), random.randrange(count))
+        for _ in range(count)
+    ]
+    lookups = [random.randrange(count) for _ in range(count)]
+
+    def fresh() -> EquivalenceClasses:
+        equivalence_classes = EquivalenceClasses()
+        for identifier in range(count):
+            equivalence_classes.add(identifier)
+        return equivalence_classes
+
+    def union():
+        for identifier_one, identifier_two in pairs:
+            unioned.union(identifier_one, identifier_two)
+
+    def union_many():
+        unioned.union_many(pairs)
+
+    def find():
+        for identifier in lookups:
+            unioned.find(identifier)
+
+    union_many_seconds = float("inf")
+    for _ in range(repeat):
+        unioned = fresh()
+        union_many_seconds = min(union_many_seconds, best_of(1, union_many))
+    union_seconds = float("inf")
+    for _ in range(repeat):
+        unioned = fresh()
+        union_seconds = min(union_seconds, best_of(1, union))
+    find_seconds = best_of(repeat, find)
+    return {
+        "union": {
+            "seconds": union_seconds,
+            "operations_per_second": count / union_seconds,
+        },
+        "union_many": {
+            "seconds": union_many_seconds,
+            "operations_per_second": count / union_many_seconds,
+        },
+        "find": {
+            "seconds": find_seconds,
+            "operations_per_second": count / find_seconds,
+        },
+    }
+
+
+def run(
+    scale: float = 1.0, repeat: int = 3, corpus: int = 100
+) -> Dict[str, object]:
+    """Run every benchmark
+
+    Args:
+        scale (float): Factor applied to the size of the synthetic
+        programs and the number of equivalence class operations
+        repeat (int): Number of timed runs, of which the fastest counts
+        corpus (int): Number of standard library modules to build
+
+    Returns:
+        Dict[str, object]: Format version, interpreter, platform, settings
+        and the measurements of each benchmark by name
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    for shape in shapes:
+        size, programs = sizes[shape]
+        size = max(1, int(size * scale))
+        if shape == "deep":
+            size = min(size, max_depth)
+        results[f"build/{shape}"] = measure_build(
+            [generate(shape, size, seed) for seed in range(programs)], repeat
+        )
+    results["build/stdlib"] = measure_build(stdlib_corpus(corpus), repeat)
+    for name, measurements in measure_equivalence_classes(
+        max(1, int(200000 * scale)), repeat
+    ).items():
+        results[f"equivalence_classes/{name}"] = measurements
+    return {
+        "format_version": format_version,
+        "python": python_version(),
+        "platform": platform_name(),
+        "scale": scale,
+        "corpus": corpus,
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, object], baseline: Dict[str, object], tolerance: float
+) -> List[Tuple[str, str, float, float]]:
+    """Find the measurements that regressed against a baseline
+
+    Args:
+        current (Dict[str, object]): Results of this run
+        baseline (Dict[str, object]): Results of an earlier run
+        tolerance (float): Fraction a measurement may grow by
+
+    Returns:
+        List[Tuple[str, str, float, float]]: Benchmark, metric, baseline
+        and current value of every regression
+
+    Raises:
+        ValueError: If the runs used another format, scale or corpus, or
+        ran on another interpreter or platform
+    """
+    for setting in ("format_version", "python", "platform", "scale", "corpus"):
+        if current.get(setting) != baseline.get(setting):
+            raise ValueError(f"Baseline was run with another {setting}")
+    regressions: List[Tuple[str, str, float, float]] = []
+    for name, measurements in current["results"].items():
+        previous = baseline["results"].get(name, {})
+        for metric in regressing_metrics:
+            if metric not in measurements or metric not in previous:
+                continue
+            if measurements[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    (name, metric, previous[metric], measurements[metric])
+                )
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write the results to this file")
+    parser.add_argument("--baseline", help="results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    results = run(args.scale, args.repeat, args.corpus)
+    print(f"{'benchmark':<32} {'seconds':>9} {'peak MiB':>9}")
+    for name, measurements in results["results"].items():
+        peak = measurements.get("peak_bytes")
+        peak_text = f"{peak / 2 ** 20:>9.1f}" if peak is not None else ""
+        print(f"{name:<32} {measurements['seconds']:>9.4f} {peak_text}")
+    if args.output is not None:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+            output.write("\n")
+
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    try:
+        regressions = compare(results, baseline, args.tolerance)
+    except ValueError as error:
+        parser.error(str(error))
+    for name, metric, previous, current in regressions:
+        print(
+            f"regression: {name} {metric} {previous:.4g} -> {current:.4g}",
+            file=sys.stderr,
+        )
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
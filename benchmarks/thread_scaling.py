@@ -0,0 +1,78 @@
+"""Measure how CFG build throughput scales across a thread pool.
+
+Every module is built once serially to get reference identifiers, then
+again with each worker count. Builds in different threads never share
+identifier state, so the threaded graphs must match the serial ones.
+
+    python -m benchmarks.thread_scaling --modules 64 --functions 200
+"""
+import argparse
+from ast import parse
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import List
+from src.cfg import CFG
+
+
+def synthetic_module(functions: int) -> str:
+    """Generate a module with branching, looping and exception handling
+
+    Args:
+        functions (int): Number of functions in the module
+
+    Returns:
+        str: Source of the module
+    """
+    source = ""
+    for i in range(functions):
+        source += f"def function_{i}(x):\n"
+        source += "    y = x + 1\n"
+        source += "    if y > 2:\n"
+        source += "        y = f(y)\n"
+        source += "    else:\n"
+        source += "        for z in range(y):\n"
+        source += "            print(z)\n"
+        source += "    try:\n"
+        source += "        g(y)\n"
+        source += "    except ValueError:\n"
+        source += "        pass\n"
+        source += "    return y\n"
+    return source
+
+
+def build(source: str) -> List[int]:
+    """Build the graph of a module and get its block identifiers"""
+    cfg = CFG(parse(source).body)
+    return [basic_block.identifier for basic_block in cfg.basic_blocks]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, default=64)
+    parser.add_argument("--functions", type=int, default=200)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+    )
+    args = parser.parse_args()
+
+    sources = [synthetic_module(args.functions) for _ in range(args.modules)]
+    expected = [build(source) for source in sources]
+
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>9} {'modules/s':>10} {'speedup':>8}")
+    for workers in args.workers:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            start = perf_counter()
+            identifiers = list(executor.map(build, sources))
+            elapsed = perf_counter() - start
+        if identifiers != expected:
+            raise AssertionError("Threaded builds allocated other identifiers")
+        baseline = baseline or elapsed
+        print(
+            f"{workers:>8} {elapsed:>9.3f} {args.modules / elapsed:>10.1f}"
+            f" {baseline / elapsed:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ setup(
         "Library for building and interacting with Python\
                  control-flow graphs"
     ),
-    packages=["src"],
+    packages=["src", "src.analysis", "src.models"],
+    entry_points={"console_scripts": ["pycfg=src.cli:main"]},
     test_suites="tests",
 )
@@ -0,0 +1,191 @@
+import asyncio
+from ast import parse
+from concurrent.futures import Executor, ProcessPoolExecutor
+from os import cpu_count
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Union
+from src.cfg import CFG
+from src.models.compact_cfg import CompactCFG
+
+
+class BuildResult:
+    """BuildResult is the outcome of building the graph of one file in an
+    asynchronous pipeline, holding either the graph or the error that
+    stopped the file from being read, parsed or built in time
+    """
+
+    __slots__ = ("path", "cfg", "error")
+
+    def __init__(
+        self,
+        path: str,
+        cfg: Optional[CompactCFG] = None,
+        error: Optional[BaseException] = None,
+    ):
+        """Instantiate result of a file
+
+        Args:
+            path (str): Path of the file
+            cfg (Optional[CompactCFG]): Graph of the file, if it was built
+            error (Optional[BaseException]): Error raised reading, parsing
+            or building the file, asyncio.TimeoutError if it took too long
+        """
+        self.path = path
+        self.cfg = cfg
+        self.error = error
+
+    def __repr__(self):
+        outcome = f"error={self.error!r}" if self.cfg is None else "built"
+        return f"BuildResult({self.path!r}, {outcome})"
+
+
+def _read(path: str) -> bytes:
+    """Read a source file in a thread of the event loop"""
+    with open(path, "rb") as source_file:
+        return source_file.read()
+
+
+def _build_source(path: str, source: bytes) -> CompactCFG:
+    """Parse and build the graph of a source in a worker process
+
+    Args:
+        path (str): Path the source was read from
+        source (bytes): Contents of the file
+
+    Returns:
+        CompactCFG: Summary of the graph namespaced by path
+    """
+    module = parse(source, filename=path)
+    return CFG(module.body, zero_copy=True).to_compact(path)
+
+
+async def abuild(
+    paths: Iterable[str],
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[BuildResult]:
+    """Build the graphs of many files without blocking the event loop
+
+    Files are read in the default executor of the loop and parsed and
+    built in a process pool. Bounded queues between reading, building and
+    the consumer keep at most a few sources and graphs per worker in
+    memory, so reading waits when building falls behind and building
+    waits when the consumer does. Failing files are reported in their
+    result instead of stopping the others.
+
+    Closing the iterator with aclose, or cancelling the task iterating
+    over it, cancels the files not yet being built. A build that timed
+    out or was cancelled while running keeps its worker process busy
+    until it finishes.
+
+        async for result in abuild(paths, concurrency=4, timeout=10):
+            ...
+
+    Args:
+        paths (Iterable[str]): Paths of the Python files to build
+        concurrency (Optional[int]): Number of files built at once.
+        Defaults to the number of CPUs
+        timeout (Optional[float]): Seconds the parsing and building of
+        a single file may take once a worker runs it. A file that timed
+        out keeps its worker until it finishes, and no other file is
+        handed to the pool in its place
+        executor (Optional[Executor]): Pool to build in, left running
+        afterwards, with at least concurrency workers. A process pool of
+        concurrency workers is started and shut down when omitted
+
+    Returns:
+        AsyncIterator[BuildResult]: Result of each file, in the order
+        the files finish
+
+    Raises:
+        ValueError: If concurrency is less than 1
+    """
+    if concurrency is None:
+        concurrency = cpu_count() or 1
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1")
+    loop = asyncio.get_running_loop()
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=concurrency)
+    sources: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    # A build keeps its worker until it finishes, even once it timed out,
+    # so files are only handed to the pool while a worker is free
+    workers = asyncio.Semaphore(concurrency)
+
+    def release(build: asyncio.Future):
+        workers.release()
+        if not build.cancelled():
+            # Errors of builds nobody waits for any more are not reported
+            build.exception()
+
+    async def read_all():
+        for path in paths:
+            try:
+                source: Union[bytes, BaseException] = (
+                    await loop.run_in_executor(None, _read, path)
+                )
+            except OSError as error:
+                source = error
+            await sources.put((path, source))
+        for _ in range(concurrency):
+            await sources.put(None)
+
+    async def build_all():
+        while True:
+            item: Optional[Tuple[str, Union[bytes, BaseException]]] = (
+                await sources.get()
+            )
+            if item is None:
+                break
+            path, source = item
+            if isinstance(source, BaseException):
+                await results.put(BuildResult(path, error=source))
+                continue
+            await workers.acquire()
+            build = loop.run_in_executor(
+                executor, _build_source, path, source
+            )
+            build.add_done_callback(release)
+            try:
+                cfg = await asyncio.wait_for(asyncio.shield(build), timeout)
+            except (
+                SyntaxError,
+                ValueError,
+                RecursionError,
+                asyncio.TimeoutError,
+            ) as error:
+                await results.put(BuildResult(path, error=error))
+            else:
+                await results.put(BuildResult(path, cfg))
+        await results.put(None)
+
+    async def guard(stage):
+        # Hand errors of the pipeline itself, such as a broken pool, to
+        # the consumer instead of leaving it waiting
+        try:
+            await stage
+        except Exception as error:
+            await results.put(error)
+
+    tasks: List[asyncio.Task] = [asyncio.ensure_future(guard(read_all()))]
+    tasks.extend(
+        asyncio.ensure_future(guard(build_all())) for _ in range(concurrency)
+    )
+    try:
+        running = concurrency
+        while running > 0:
+            result = await results.get()
+            if result is None:
+                running -= 1
+            elif isinstance(result, Exception):
+                raise result
+            else:
+                yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if owns_executor:
+            executor.shutdown(wait=False)
@@ -0,0 +1,119 @@
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from src.cfg import CFG
+
+
+class BlockGraph:
+    """BlockGraph is a directed view of the control flow of a CFG in which
+    blocks are numbered by their position in basic_blocks. Analyses keep
+    their per-block state in flat lists indexed by these numbers instead of
+    dictionaries keyed by identifier.
+    """
+
+    def __init__(self, cfg: "CFG"):
+        """Index the blocks and edges of a graph
+
+        Args:
+            cfg (CFG): Graph whose control flow is indexed
+        """
+        self.identifiers: List[int] = [
+            basic_block.identifier for basic_block in cfg.basic_blocks
+        ]
+        self.indices: Dict[int, int] = {
+            identifier: i for i, identifier in enumerate(self.identifiers)
+        }
+        indices = self.indices
+        self.successors: List[List[int]] = [
+            sorted(
+                indices[destination]
+                for destination in cfg.flow_successors(identifier)
+            )
+            for identifier in self.identifiers
+        ]
+        self.predecessors: List[List[int]] = [[] for _ in self.identifiers]
+        for i, successors in enumerate(self.successors):
+            for successor in successors:
+                self.predecessors[successor].append(i)
+
+    def __len__(self) -> int:
+        return len(self.identifiers)
+
+    def index(self, identifier: int) -> int:
+        """Get the number of a block within the graph
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            int: Position of the block in basic_blocks
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        try:
+            return self.indices[identifier]
+        except KeyError:
+            raise ValueError("Block is not part of the graph")
+
+    def depth_first_order(
+        self, reverse: bool = False
+    ) -> Tuple[List[int], List[int]]:
+        """Order the blocks so that every block comes before its successors,
+        apart from the targets of back edges
+
+        The search starts from every block without predecessors, in order,
+        then from the first block not yet reached until every block is
+        ordered, so blocks only reachable through a cycle are included.
+
+        Args:
+            reverse (bool): Follow the edges backwards, as needed by
+            backward analyses and post-dominators
+
+        Returns:
+            Tuple[List[int], List[int]]: Every block index in reverse
+            postorder, and the blocks the search was started from
+        """
+        successors = self.predecessors if reverse else self.successors
+        predecessors = self.successors if reverse else self.predecessors
+        count = len(self.identifiers)
+        visited = [False] * count
+        postorder: List[int] = []
+        roots: List[int] = []
+        starts = [i for i in range(count) if len(predecessors[i]) == 0]
+        starts.extend(range(count))
+        for start in starts:
+            if visited[start]:
+                continue
+            visited[start] = True
+            roots.append(start)
+            # (block, index of the next successor to visit)
+            stack = [(start, 0)]
+            while len(stack) > 0:
+                block, position = stack[-1]
+                block_successors = successors[block]
+                while position < len(block_successors):
+                    successor = block_successors[position]
+                    position += 1
+                    if not visited[successor]:
+                        visited[successor] = True
+                        stack[-1] = (block, position)
+                        stack.append((successor, 0))
+                        break
+                else:
+                    stack.pop()
+                    postorder.append(block)
+        postorder.reverse()
+        return postorder, roots
+
+    def reverse_postorder(self, reverse: bool = False) -> List[int]:
+        """Order the blocks so that every block comes before its successors,
+        apart from the targets of back edges
+
+        Args:
+            reverse (bool): Follow the edges backwards
+
+        Returns:
+            List[int]: Every block index in reverse postorder
+        """
+        return self.depth_first_order(reverse)[0]
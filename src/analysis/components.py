@@ -0,0 +1,144 @@
+from typing import List, Tuple
+from .block_graph import BlockGraph
+
+
+class StronglyConnectedComponents:
+    """StronglyConnectedComponents groups the blocks of a graph that can
+    all reach each other, found with an iterative version of Tarjan's
+    algorithm so that long chains of blocks cannot exhaust the stack.
+
+    Components are numbered in the order Tarjan's algorithm completes
+    them, which is a reverse topological order: every edge between two
+    components goes from a higher number to a lower one.
+    """
+
+    def __init__(self, graph: BlockGraph):
+        """Find the strongly connected components of a graph
+
+        Args:
+            graph (BlockGraph): Graph to split into components
+        """
+        self._graph = graph
+        self.component, self.members = strongly_connected(graph.successors)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def component_of(self, identifier: int) -> int:
+        """Get the component a block belongs to
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            int: Number of the component
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        return self.component[self._graph.index(identifier)]
+
+    def is_cyclic(self, component: int) -> bool:
+        """Check whether the blocks of a component lie on a cycle, which is
+        also true of a single block with an edge to itself
+
+        Args:
+            component (int): Number of the component
+
+        Returns:
+            bool: True if control can flow around the component
+        """
+        members = self.members[component]
+        if len(members) > 1:
+            return True
+        return members[0] in self._graph.successors[members[0]]
+
+    def condensation(self) -> List[List[int]]:
+        """Get the edges between components, which form a DAG
+
+        Returns:
+            List[List[int]]: Components each component has an edge to,
+            without duplicates, all numbered lower than the component
+        """
+        component = self.component
+        successors = self._graph.successors
+        condensed: List[List[int]] = []
+        for number, members in enumerate(self.members):
+            targets = {
+                component[successor]
+                for member in members
+                for successor in successors[member]
+            }
+            targets.discard(number)
+            condensed.append(sorted(targets, reverse=True))
+        return condensed
+
+
+def strongly_connected(
+    successors: List[List[int]],
+) -> Tuple[List[int], List[List[int]]]:
+    """Find the strongly connected components of a graph with Tarjan's
+    algorithm, keeping the depth-first path on an explicit stack
+
+    Args:
+        successors (List[List[int]]): Successors of each node, with nodes
+        numbered densely from 0
+
+    Returns:
+        Tuple[List[int], List[List[int]]]: Component of each node, and the
+        nodes of each component, numbered in reverse topological order
+    """
+    count = len(successors)
+    # Order each node was first visited in, or -1 if it was not yet
+    visited = [-1] * count
+    lowest = [0] * count
+    on_stack = [False] * count
+    stack: List[int] = []
+    component = [-1] * count
+    components: List[List[int]] = []
+
+    clock = 0
+    for start in range(count):
+        if visited[start] != -1:
+            continue
+        visited[start] = lowest[start] = clock
+        clock += 1
+        stack.append(start)
+        on_stack[start] = True
+        # (node, index of the next successor to visit)
+        path = [(start, 0)]
+        while len(path) > 0:
+            node, position = path[-1]
+            node_successors = successors[node]
+            while position < len(node_successors):
+                successor = node_successors[position]
+                position += 1
+                if visited[successor] == -1:
+                    visited[successor] = lowest[successor] = clock
+                    clock += 1
+                    stack.append(successor)
+                    on_stack[successor] = True
+                    path[-1] = (node, position)
+                    path.append((successor, 0))
+                    break
+                if on_stack[successor] and visited[successor] < lowest[node]:
+                    lowest[node] = visited[successor]
+            else:
+                path.pop()
+                if len(path) > 0:
+                    parent = path[-1][0]
+                    if lowest[node] < lowest[parent]:
+                        lowest[parent] = lowest[node]
+                if lowest[node] == visited[node]:
+                    number = len(components)
+                    members: List[int] = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = number
+                        members.append(member)
+                        if member == node:
+                            break
+                    members.reverse()
+                    components.append(members)
+    return component, components
@@ -0,0 +1,260 @@
+from typing import Dict, Iterator, List, Sequence, Tuple
+from src.models.basic_block import BasicBlock
+from .block_graph import BlockGraph
+
+
+class BitVectorDataflow:
+    """BitVectorDataflow solves a dataflow problem whose facts are sets
+    packed into the bits of Python ints. Each block transforms the facts
+    flowing into it into gen | (facts & ~kill), and the facts flowing into
+    a block are those flowing out of any of its neighbours, or out of all
+    of them when intersect is set.
+
+    Blocks are visited in reverse postorder of the direction of flow, and
+    only once their inputs have changed, so a graph without cycles is
+    solved in a single pass.
+    """
+
+    def __init__(
+        self,
+        graph: BlockGraph,
+        gen: Sequence[int],
+        kill: Sequence[int],
+        forward: bool = True,
+        intersect: bool = False,
+        universe: int = 0,
+    ):
+        """Solve a dataflow problem over a graph
+
+        Args:
+            graph (BlockGraph): Graph the facts flow through
+            gen (Sequence[int]): Facts each block adds, by block index
+            kill (Sequence[int]): Facts each block removes, by block index
+            forward (bool): Let facts flow along the edges, or against them
+            for backward problems
+            intersect (bool): Only let facts into a block if they flow out
+            of all of its neighbours
+            universe (int): Every fact, which blocks start from before
+            their neighbours are intersected
+        """
+        self._graph = graph
+        count = len(graph)
+        order = graph.reverse_postorder(not forward)
+        position = [0] * count
+        for i, block in enumerate(order):
+            position[block] = i
+        sources = graph.predecessors if forward else graph.successors
+        targets = graph.successors if forward else graph.predecessors
+
+        flowed_in = [0] * count
+        flowed_out = [universe if intersect else 0] * count
+        pending = [True] * count
+        changed = True
+        while changed:
+            changed = False
+            for block in order:
+                if not pending[block]:
+                    continue
+                pending[block] = False
+                block_sources = sources[block]
+                facts = 0
+                if len(block_sources) > 0 and intersect:
+                    facts = universe
+                    for source in block_sources:
+                        facts &= flowed_out[source]
+                else:
+                    for source in block_sources:
+                        facts |= flowed_out[source]
+                flowed_in[block] = facts
+                facts = gen[block] | (facts & ~kill[block])
+                if facts == flowed_out[block]:
+                    continue
+                flowed_out[block] = facts
+                for target in targets[block]:
+                    pending[target] = True
+                    # Targets later in the order are visited in this pass
+                    if position[target] <= position[block]:
+                        changed = True
+
+        # Facts holding at the start and at the end of each block
+        self.entry: List[int] = flowed_in if forward else flowed_out
+        self.exit: List[int] = flowed_out if forward else flowed_in
+
+    def at_entry(self, identifier: int) -> int:
+        """Get the facts holding at the start of a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            int: Facts packed into the bits of an int
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        return self.entry[self._graph.index(identifier)]
+
+    def at_exit(self, identifier: int) -> int:
+        """Get the facts holding at the end of a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            int: Facts packed into the bits of an int
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        return self.exit[self._graph.index(identifier)]
+
+
+class Liveness:
+    """Liveness finds the variables whose value may still be read after
+    each block. A variable is live at the start of a block if the block
+    reads it before binding it, or if it is live at the end of the block
+    and the block does not bind it.
+    """
+
+    def __init__(self, graph: BlockGraph, basic_blocks: List[BasicBlock]):
+        """Find the live variables of a graph
+
+        Args:
+            graph (BlockGraph): Graph of the blocks
+            basic_blocks (List[BasicBlock]): Blocks of the graph, in the
+            order they are indexed by graph
+        """
+        self.names: List[str] = []
+        bits: Dict[str, int] = {}
+        gen: List[int] = []
+        kill: List[int] = []
+        for basic_block in basic_blocks:
+            used = 0
+            defined = 0
+            summary = basic_block.summary
+            for name in summary.exposed:
+                used |= _bit(bits, self.names, name)
+            for name in summary.defined:
+                defined |= _bit(bits, self.names, name)
+            gen.append(used)
+            kill.append(defined)
+        self.dataflow = BitVectorDataflow(graph, gen, kill, forward=False)
+
+    def live_in(self, identifier: int) -> List[str]:
+        """Get the variables live at the start of a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            List[str]: Names of the live variables, sorted
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        bits = self.dataflow.at_entry(identifier)
+        return sorted(self.names[i] for i in _members(bits))
+
+    def live_out(self, identifier: int) -> List[str]:
+        """Get the variables live at the end of a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            List[str]: Names of the live variables, sorted
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        bits = self.dataflow.at_exit(identifier)
+        return sorted(self.names[i] for i in _members(bits))
+
+
+class ReachingDefinitions:
+    """ReachingDefinitions finds the bindings of variables that may still
+    be the current value at each block. A block passes on every binding
+    that reaches it, apart from those of the variables it binds again,
+    along with the last binding of each variable it binds.
+    """
+
+    def __init__(self, graph: BlockGraph, basic_blocks: List[BasicBlock]):
+        """Find the reaching definitions of a graph
+
+        Args:
+            graph (BlockGraph): Graph of the blocks
+            basic_blocks (List[BasicBlock]): Blocks of the graph, in the
+            order they are indexed by graph
+        """
+        # (block identifier, statement index, variable name)
+        self.definitions: List[Tuple[int, int, str]] = []
+        by_name: Dict[str, int] = {}
+        gen: List[int] = []
+        bound_names: List[List[str]] = []
+        for basic_block in basic_blocks:
+            last: Dict[str, int] = {}
+            for i, name in basic_block.summary.definitions:
+                bit = 1 << len(self.definitions)
+                self.definitions.append((basic_block.identifier, i, name))
+                by_name[name] = by_name.get(name, 0) | bit
+                last[name] = bit
+            block_gen = 0
+            for bit in last.values():
+                block_gen |= bit
+            gen.append(block_gen)
+            bound_names.append(list(last))
+        kill: List[int] = []
+        for names in bound_names:
+            block_kill = 0
+            for name in names:
+                block_kill |= by_name[name]
+            kill.append(block_kill)
+        self.dataflow = BitVectorDataflow(graph, gen, kill)
+
+    def reach_in(self, identifier: int) -> List[Tuple[int, int, str]]:
+        """Get the definitions reaching the start of a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            List[Tuple[int, int, str]]: Block identifier, statement index
+            and variable name of each definition, in the order found
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        bits = self.dataflow.at_entry(identifier)
+        return [self.definitions[i] for i in _members(bits)]
+
+    def reach_out(self, identifier: int) -> List[Tuple[int, int, str]]:
+        """Get the definitions reaching the end of a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            List[Tuple[int, int, str]]: Block identifier, statement index
+            and variable name of each definition, in the order found
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        bits = self.dataflow.at_exit(identifier)
+        return [self.definitions[i] for i in _members(bits)]
+
+
+def _bit(bits: Dict[str, int], names: List[str], name: str) -> int:
+    """Get the bit of a name, numbering it if it is new"""
+    if name not in bits:
+        bits[name] = 1 << len(names)
+        names.append(name)
+    return bits[name]
+
+
+def _members(bits: int) -> Iterator[int]:
+    """Iterate over the positions of the set bits of an int, lowest first"""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
@@ -0,0 +1,145 @@
+from typing import List, Optional
+from .block_graph import BlockGraph
+
+
+class DominatorTree:
+    """DominatorTree holds the immediate dominator of every block of a
+    graph, found with the iterative algorithm of Cooper, Harvey and
+    Kennedy over block indices in reverse postorder.
+
+    A graph may have several entries, and blocks that are only reachable
+    through a cycle, so every block the search starts from is treated as
+    a child of a virtual root. Such blocks have no immediate dominator.
+    Post-dominators are the dominators of the graph with its edges reversed.
+    """
+
+    def __init__(self, graph: BlockGraph, post: bool = False):
+        """Compute the dominators of a graph
+
+        Args:
+            graph (BlockGraph): Graph to compute the dominators of
+            post (bool): Compute post-dominators instead
+        """
+        self.post = post
+        self._graph = graph
+        count = len(graph)
+        order, roots = graph.depth_first_order(post)
+        predecessors = graph.successors if post else graph.predecessors
+
+        # The virtual root is numbered count and comes first in the order
+        root = count
+        number = [0] * (count + 1)
+        for position, block in enumerate(order, 1):
+            number[block] = position
+        idom = [-1] * (count + 1)
+        idom[root] = root
+        is_root = [False] * count
+        for block in roots:
+            is_root[block] = True
+            idom[block] = root
+
+        changed = True
+        while changed:
+            changed = False
+            for block in order:
+                if is_root[block]:
+                    continue
+                new_idom = -1
+                for predecessor in predecessors[block]:
+                    if idom[predecessor] == -1:
+                        continue
+                    if new_idom == -1:
+                        new_idom = predecessor
+                        continue
+                    # Walk both fingers up to their common dominator
+                    finger = predecessor
+                    while finger != new_idom:
+                        while number[finger] > number[new_idom]:
+                            finger = idom[finger]
+                        while number[new_idom] > number[finger]:
+                            new_idom = idom[new_idom]
+                if idom[block] != new_idom:
+                    idom[block] = new_idom
+                    changed = True
+
+        self._idom = idom
+        self._children: List[List[int]] = [[] for _ in range(count + 1)]
+        for block in order:
+            self._children[idom[block]].append(block)
+
+        # Preorder intervals of the tree answer dominance in constant time
+        self._entered = [0] * (count + 1)
+        self._exited = [0] * (count + 1)
+        clock = 0
+        stack = [(root, 0)]
+        while len(stack) > 0:
+            block, position = stack.pop()
+            if position == 0:
+                self._entered[block] = clock
+                clock += 1
+            if position < len(self._children[block]):
+                stack.append((block, position + 1))
+                stack.append((self._children[block][position], 0))
+            else:
+                self._exited[block] = clock
+
+    def immediate_dominator(self, identifier: int) -> Optional[int]:
+        """Get the closest block that dominates a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            Optional[int]: Identifier of the immediate dominator, or None
+            if the block is an entry of the graph
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        idom = self._idom[self._graph.index(identifier)]
+        if idom == len(self._graph):
+            return None
+        return self._graph.identifiers[idom]
+
+    def dominates(self, dominator: int, identifier: int) -> bool:
+        """Check whether every path to a block passes through another.
+        For post-dominators, whether every path from the block to an exit
+        passes through the other. A block dominates itself
+
+        Args:
+            dominator (int): Identifier of the dominating block
+            identifier (int): Identifier of the dominated block
+
+        Returns:
+            bool: True if dominator dominates identifier
+
+        Raises:
+            ValueError: If either block is not part of the graph
+        """
+        outer = self._graph.index(dominator)
+        inner = self._graph.index(identifier)
+        return (
+            self._entered[outer] <= self._entered[inner]
+            and self._exited[inner] <= self._exited[outer]
+        )
+
+    def children(self, identifier: Optional[int]) -> List[int]:
+        """Get the blocks immediately dominated by a block
+
+        Args:
+            identifier (Optional[int]): Identifier of the block, or None
+            for the entries of the graph
+
+        Returns:
+            List[int]: Identifiers of the immediately dominated blocks
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        block = (
+            len(self._graph)
+            if identifier is None
+            else self._graph.index(identifier)
+        )
+        identifiers = self._graph.identifiers
+        return [identifiers[child] for child in self._children[block]]
@@ -0,0 +1,133 @@
+from typing import List, Optional, Tuple
+from .block_graph import BlockGraph
+
+
+class Loop:
+    """A Loop is a cycle of blocks, entered through its headers"""
+
+    def __init__(
+        self,
+        headers: List[int],
+        blocks: List[int],
+        back_edges: List[Tuple[int, int]],
+        parent: Optional["Loop"],
+    ):
+        """Instantiate loop
+
+        Args:
+            headers (List[int]): Identifiers of the blocks control enters
+            the loop through
+            blocks (List[int]): Identifiers of every block in the loop,
+            including the blocks of nested loops
+            back_edges (List[Tuple[int, int]]): Source and destination of
+            each edge from inside the loop to one of its headers
+            parent (Optional[Loop]): Innermost loop containing this one
+        """
+        self.headers = headers
+        self.blocks = blocks
+        self.back_edges = back_edges
+        self.parent = parent
+        self.children: List[Loop] = []
+        self.depth = parent.depth + 1 if parent is not None else 1
+
+
+class LoopForest:
+    """LoopForest is the loop-nesting forest of a graph.
+
+    Loops are found from the blocks built for the body of each for and
+    while statement rather than searched for among the cycles of the
+    graph. The first block of a body is the header of its loop, and the
+    edges from the body back to it are its back edges. Blocks of else
+    clauses run once the loop is done, and functions and classes defined
+    in the body run apart from it, so their blocks are left out.
+    """
+
+    def __init__(self, graph: BlockGraph, loop_blocks: List[List[int]]):
+        """Find the loops of a graph
+
+        Args:
+            graph (BlockGraph): Graph to find the loops of
+            loop_blocks (List[List[int]]): Identifiers of the blocks of the
+            body of each loop, including the bodies of nested loops, in
+            the order they were built
+        """
+        self._graph = graph
+        self.loops: List[Loop] = []
+        self.roots: List[Loop] = []
+        self._innermost: List[Optional[Loop]] = [None] * len(graph)
+        self._is_header = [False] * len(graph)
+        indices = graph.indices
+
+        # Enclosing loops sort before the loops nested in them, so the
+        # innermost loop found so far around a header is its parent
+        for blocks in sorted(loop_blocks, key=lambda b: (b[0], -len(b))):
+            blocks = [
+                identifier for identifier in blocks if identifier in indices
+            ]
+            if len(blocks) == 0:
+                continue
+            header = indices[blocks[0]]
+            parent = self._innermost[header]
+            back_edges = [
+                (identifier, blocks[0])
+                for identifier in blocks
+                if header in graph.successors[indices[identifier]]
+            ]
+            loop = Loop([blocks[0]], blocks, back_edges, parent)
+            self.loops.append(loop)
+            if parent is None:
+                self.roots.append(loop)
+            else:
+                parent.children.append(loop)
+            for identifier in blocks:
+                self._innermost[indices[identifier]] = loop
+            self._is_header[header] = True
+
+    def loop_of(self, identifier: int) -> Optional[Loop]:
+        """Get the innermost loop containing a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            Optional[Loop]: Innermost loop, or None if the block is not
+            part of any loop
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        return self._innermost[self._graph.index(identifier)]
+
+    def depth(self, identifier: int) -> int:
+        """Get the number of loops containing a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            int: Loop nesting depth, 0 outside of any loop
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        loop = self.loop_of(identifier)
+        return loop.depth if loop is not None else 0
+
+    def is_header(self, identifier: int) -> bool:
+        """Check whether control enters a loop through a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            bool: True if the block is the header of any loop
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        return self._is_header[self._graph.index(identifier)]
+
+    @property
+    def back_edges(self) -> List[Tuple[int, int]]:
+        """Source and destination of the back edges of every loop"""
+        return [edge for loop in self.loops for edge in loop.back_edges]
@@ -0,0 +1,252 @@
+from bisect import bisect_right
+from difflib import SequenceMatcher
+from hashlib import blake2b
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+from .block_graph import BlockGraph
+
+if TYPE_CHECKING:
+    from src.models.basic_block import BasicBlock
+
+
+class MerkleTree:
+    """MerkleTree hashes every function and class of a graph from the
+    structural hashes of its blocks, the edges leaving them and the hashes
+    of the scopes nested in it, so two scopes with the same hash have the
+    same statements and edges. The module is the scope named "".
+
+    Edges within a scope are hashed by their position relative to its
+    first block, and edges leaving it by the hash of their destination,
+    so a scope hashes the same wherever it is in the graph.
+    """
+
+    def __init__(
+        self,
+        graph: BlockGraph,
+        basic_blocks: List["BasicBlock"],
+        scope_ranges: Dict[str, Tuple[int, int]],
+    ):
+        """Hash every scope of a graph
+
+        Args:
+            graph (BlockGraph): Edges of the graph
+            basic_blocks (List[BasicBlock]): Blocks of the graph, in the
+            order graph numbers them
+            scope_ranges (Dict[str, Tuple[int, int]]): Position of the first
+            block of each function or class, and the position just past its
+            last block, by qualified name. Blocks of nested scopes must lie
+            within the range of the scopes enclosing them
+        """
+        self.graph = graph
+        self.basic_blocks = basic_blocks
+        self.ranges: Dict[str, Tuple[int, int]] = {"": (0, len(graph))}
+        self.children: Dict[str, List[str]] = {"": []}
+        self.hashes: Dict[str, bytes] = {}
+
+        # Enclosing scopes sort before the scopes nested in them
+        names = sorted(
+            (
+                name
+                for name, (start, end) in scope_ranges.items()
+                if start < end
+            ),
+            key=lambda name: (scope_ranges[name][0], -scope_ranges[name][1]),
+        )
+        enclosing = [""]
+        for name in names:
+            start, end = scope_ranges[name]
+            while self.ranges[enclosing[-1]][1] < end:
+                enclosing.pop()
+            self.ranges[name] = (start, end)
+            self.children[name] = []
+            self.children[enclosing[-1]].append(name)
+            enclosing.append(name)
+
+        block_hashes = [
+            basic_block.structural_hash for basic_block in basic_blocks
+        ]
+        for name in reversed([""] + names):
+            start, end = self.ranges[name]
+            digest = blake2b(digest_size=16)
+            for position, child in self._walk(name):
+                if child is not None:
+                    digest.update(b"S" + child.encode() + b"\0")
+                    digest.update(self.hashes[child])
+                    continue
+                digest.update(b"B" + block_hashes[position])
+                for successor in graph.successors[position]:
+                    if start <= successor < end:
+                        offset = successor - start
+                        digest.update(b"e" + offset.to_bytes(4, "little"))
+                    else:
+                        digest.update(b"x" + block_hashes[successor])
+            self.hashes[name] = digest.digest()
+
+    def _walk(self, name: str) -> List[Tuple[int, Optional[str]]]:
+        """List the blocks of a scope outside of its nested scopes, and
+        the nested scopes where they begin, in order
+
+        Args:
+            name (str): Qualified name of the scope
+
+        Returns:
+            List[Tuple[int, Optional[str]]]: Position of each block or
+            nested scope, with the name of the nested scope or None
+        """
+        start, end = self.ranges[name]
+        items: List[Tuple[int, Optional[str]]] = []
+        position = start
+        for child in self.children[name]:
+            child_start, child_end = self.ranges[child]
+            items.extend((i, None) for i in range(position, child_start))
+            items.append((child_start, child))
+            position = child_end
+        items.extend((i, None) for i in range(position, end))
+        return items
+
+    def own_blocks(self, name: str) -> List[int]:
+        """Get the blocks of a scope that are not part of a nested scope
+
+        Args:
+            name (str): Qualified name of the scope, or "" for the module
+
+        Returns:
+            List[int]: Positions of the blocks, in order
+
+        Raises:
+            KeyError: If the scope is not part of the graph
+        """
+        return [
+            position
+            for position, child in self._walk(name)
+            if child is None
+        ]
+
+
+class CFGDiff:
+    """CFGDiff lists the blocks and edges that differ between two graphs.
+
+    Scopes are matched by qualified name and skipped as soon as their
+    Merkle hashes match, so only the scopes enclosing a change are
+    compared. The blocks of a scope outside of its nested scopes are
+    matched by their structural hashes in order; blocks whose statements
+    differ but take the place of each other are changed, the rest are
+    added or removed. Edges are compared through the matched blocks.
+    """
+
+    def __init__(self, old: MerkleTree, new: MerkleTree):
+        """Compare two graphs
+
+        Args:
+            old (MerkleTree): Hashes of the graph before the change
+            new (MerkleTree): Hashes of the graph after the change
+        """
+        self.changed: List[Tuple["BasicBlock", "BasicBlock"]] = []
+        self.added_edges: List[Tuple[int, int]] = []
+        self.removed_edges: List[Tuple[int, int]] = []
+
+        # Old block position to new block position, for compared blocks
+        matches: Dict[int, int] = {}
+        # Old start, old end and new start of scopes that are the same
+        same_ranges: List[Tuple[int, int, int]] = []
+        # Blocks of the compared and the removed or added scopes, whose
+        # edges may have changed
+        old_sources: List[int] = []
+        new_sources: List[int] = []
+        removed: List[int] = []
+        added: List[int] = []
+
+        scopes = [""]
+        while len(scopes) > 0:
+            name = scopes.pop()
+            old_start, old_end = old.ranges[name]
+            if old.hashes[name] == new.hashes[name]:
+                same_ranges.append((old_start, old_end, new.ranges[name][0]))
+                continue
+            new_children = set(new.children[name])
+            for child in old.children[name]:
+                if child in new_children:
+                    scopes.append(child)
+                else:
+                    removed.extend(range(*old.ranges[child]))
+                    old_sources.extend(range(*old.ranges[child]))
+            old_children = set(old.children[name])
+            for child in new.children[name]:
+                if child not in old_children:
+                    added.extend(range(*new.ranges[child]))
+                    new_sources.extend(range(*new.ranges[child]))
+
+            old_blocks = old.own_blocks(name)
+            new_blocks = new.own_blocks(name)
+            old_sources.extend(old_blocks)
+            new_sources.extend(new_blocks)
+            matcher = SequenceMatcher(
+                None,
+                [old.basic_blocks[i].structural_hash for i in old_blocks],
+                [new.basic_blocks[i].structural_hash for i in new_blocks],
+                autojunk=False,
+            )
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                paired = min(i2 - i1, j2 - j1)
+                for offset in range(paired):
+                    old_block = old_blocks[i1 + offset]
+                    new_block = new_blocks[j1 + offset]
+                    matches[old_block] = new_block
+                    if tag != "equal":
+                        self.changed.append(
+                            (
+                                old.basic_blocks[old_block],
+                                new.basic_blocks[new_block],
+                            )
+                        )
+                removed.extend(old_blocks[i1 + paired : i2])
+                added.extend(new_blocks[j1 + paired : j2])
+
+        same_ranges.sort()
+        same_starts = [start for start, _, _ in same_ranges]
+
+        def match(position: int) -> Optional[int]:
+            if position in matches:
+                return matches[position]
+            i = bisect_right(same_starts, position) - 1
+            if i >= 0 and position < same_ranges[i][1]:
+                return same_ranges[i][2] + position - same_ranges[i][0]
+            return None
+
+        self.removed: List["BasicBlock"] = [
+            old.basic_blocks[i] for i in removed
+        ]
+        self.added: List["BasicBlock"] = [new.basic_blocks[i] for i in added]
+        old_identifiers = old.graph.identifiers
+        new_identifiers = new.graph.identifiers
+
+        # Edges of compared blocks that no matched edge accounts for
+        kept: Set[Tuple[int, int]] = set()
+        for source in old_sources:
+            new_source = match(source)
+            for destination in old.graph.successors[source]:
+                new_destination = match(destination)
+                if (
+                    new_source is not None
+                    and new_destination is not None
+                    and new_destination in new.graph.successors[new_source]
+                ):
+                    kept.add((new_source, new_destination))
+                else:
+                    self.removed_edges.append(
+                        (old_identifiers[source], old_identifiers[destination])
+                    )
+        for source in new_sources:
+            for destination in new.graph.successors[source]:
+                if (source, destination) not in kept:
+                    self.added_edges.append(
+                        (new_identifiers[source], new_identifiers[destination])
+                    )
+
+    def __bool__(self) -> bool:
+        return (
+            len(self.added) > 0
+            or len(self.removed) > 0
+            or len(self.changed) > 0
+            or len(self.added_edges) > 0
+            or len(self.removed_edges) > 0
+        )
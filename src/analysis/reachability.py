@@ -0,0 +1,162 @@
+from typing import Iterable, List, Optional, Set, Tuple
+from .block_graph import BlockGraph
+from .components import StronglyConnectedComponents
+
+
+class ReachabilityIndex:
+    """ReachabilityIndex answers whether control can flow from one block
+    to another along the directed edges of a graph.
+
+    Blocks that reach each other are collapsed into their strongly
+    connected components, and the transitive closure of the resulting DAG
+    is stored as one bit array per component. Components are numbered so
+    that edges only lead to lower numbers, so each bit array only covers
+    the components numbered below its own, stored relative to it.
+
+    The closure can take quadratic memory in the worst case. Once it grows
+    past max_closure_bytes it is dropped, and each query searches the DAG
+    instead, skipping every component numbered below the destination.
+    """
+
+    def __init__(
+        self,
+        graph: BlockGraph,
+        components: StronglyConnectedComponents,
+        max_closure_bytes: Optional[int] = 64 * 1024 * 1024,
+    ):
+        """Build the index of a graph
+
+        Args:
+            graph (BlockGraph): Graph to index
+            components (StronglyConnectedComponents): Components of graph
+            max_closure_bytes (Optional[int]): Largest closure to store.
+            None always stores it, and 0 never does
+        """
+        self._graph = graph
+        self._component = components.component
+        self._condensed = components.condensation()
+        self._closure: Optional[List[bytes]] = None
+
+        # Bit i of closure[c] is set if c reaches component c - i
+        closure: List[int] = []
+        size = 0
+        for number, targets in enumerate(self._condensed):
+            reach = 1
+            for target in targets:
+                reach |= closure[target] << (number - target)
+            closure.append(reach)
+            size += (reach.bit_length() + 7) // 8
+            if max_closure_bytes is not None and size > max_closure_bytes:
+                return
+        self._closure = [
+            reach.to_bytes((reach.bit_length() + 7) // 8, "little")
+            for reach in closure
+        ]
+
+    @property
+    def stores_closure(self) -> bool:
+        """Whether queries are answered from the stored closure rather than
+        by searching the graph
+        """
+        return self._closure is not None
+
+    def _reaches(self, source: int, destination: int) -> bool:
+        """Check whether one component reaches another"""
+        if destination > source:
+            return False
+        if self._closure is not None:
+            offset = source - destination
+            reach = self._closure[source]
+            return (
+                offset >> 3 < len(reach)
+                and reach[offset >> 3] >> (offset & 7) & 1 == 1
+            )
+
+        condensed = self._condensed
+        visited = {source}
+        unvisited = [source]
+        while len(unvisited) > 0:
+            component = unvisited.pop()
+            if component == destination:
+                return True
+            for target in condensed[component]:
+                # Targets are sorted from highest, and edges only lead down
+                if target < destination:
+                    break
+                if target not in visited:
+                    visited.add(target)
+                    unvisited.append(target)
+        return False
+
+    def can_reach(self, source: int, destination: int) -> bool:
+        """Check whether control can flow from one block to another. Every
+        block reaches itself
+
+        Args:
+            source (int): Identifier of the block control flows from
+            destination (int): Identifier of the block control flows to
+
+        Returns:
+            bool: True if a path of edges leads from source to destination
+
+        Raises:
+            ValueError: If either block is not part of the graph
+        """
+        return self._reaches(
+            self._component[self._graph.index(source)],
+            self._component[self._graph.index(destination)],
+        )
+
+    def can_reach_many(self, pairs: Iterable[Tuple[int, int]]) -> List[bool]:
+        """Check whether control can flow between many pairs of blocks
+
+        Args:
+            pairs (Iterable[Tuple[int, int]]): Identifiers of the source and
+            destination of each query
+
+        Returns:
+            List[bool]: Answer to each query in order
+
+        Raises:
+            ValueError: If any block is not part of the graph
+        """
+        index = self._graph.index
+        component = self._component
+        return [
+            self._reaches(component[index(source)], component[index(target)])
+            for source, target in pairs
+        ]
+
+    def reachable(self, identifier: int) -> List[int]:
+        """Get every block control can flow to from a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            List[int]: Identifiers of the reachable blocks, including the
+            block itself, ordered by position in basic_blocks
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        source = self._component[self._graph.index(identifier)]
+        reached: Set[int] = set()
+        if self._closure is not None:
+            for position, byte in enumerate(self._closure[source]):
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        reached.add(source - position * 8 - bit)
+        else:
+            reached.add(source)
+            unvisited = [source]
+            while len(unvisited) > 0:
+                for target in self._condensed[unvisited.pop()]:
+                    if target not in reached:
+                        reached.add(target)
+                        unvisited.append(target)
+        return [
+            self._graph.identifiers[block]
+            for block, component in enumerate(self._component)
+            if component in reached
+        ]
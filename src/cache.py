@@ -0,0 +1,277 @@
+import os
+import struct
+import sys
+import time
+from array import array
+from ast import parse
+from hashlib import sha256
+from tempfile import mkstemp
+from typing import Optional
+from src import __version__
+from src.cfg import CFG
+from src.models.compact_cfg import CompactCFG
+
+# Magic, format version, class count, line range count and edge count
+_entry_header = struct.Struct("<4s4I")
+_entry_magic = b"PCFC"
+entry_version = 1
+
+
+def _encode_entry(compact: CompactCFG) -> bytes:
+    """Lay out a graph as a cache entry
+
+    The entry is a header of little-endian unsigned ints followed by the
+    line ranges and the edges as little-endian C ints. The namespace is
+    not stored, as hits take the one they are looked up with.
+
+    Args:
+        compact (CompactCFG): Graph to store
+
+    Returns:
+        bytes: Contents of the entry
+    """
+    line_ranges = array("i", compact.line_ranges)
+    edges = array("i", compact.edges)
+    if sys.byteorder != "little":
+        line_ranges.byteswap()
+        edges.byteswap()
+    return b"".join(
+        [
+            _entry_header.pack(
+                _entry_magic,
+                entry_version,
+                compact.component_count,
+                len(line_ranges),
+                len(edges),
+            ),
+            line_ranges.tobytes(),
+            edges.tobytes(),
+        ]
+    )
+
+
+def _decode_entry(data: bytes) -> CompactCFG:
+    """Read a graph back from a cache entry
+
+    Args:
+        data (bytes): Contents of the entry
+
+    Returns:
+        CompactCFG: Graph stored in the entry, without a namespace
+
+    Raises:
+        ValueError: If the data is not an entry, was written with another
+        format version, or is truncated
+    """
+    if len(data) < _entry_header.size:
+        raise ValueError("Cache entry is truncated")
+    (
+        magic,
+        version,
+        component_count,
+        line_range_count,
+        edge_count,
+    ) = _entry_header.unpack_from(data)
+    if magic != _entry_magic:
+        raise ValueError("File is not a cache entry")
+    if version != entry_version:
+        raise ValueError(f"Unsupported cache entry version {version}")
+    middle = _entry_header.size + 4 * line_range_count
+    if (
+        len(data) != middle + 4 * edge_count
+        or line_range_count % 2 != 0
+        or edge_count % 2 != 0
+    ):
+        raise ValueError("Cache entry is truncated")
+    line_ranges = array("i")
+    line_ranges.frombytes(data[_entry_header.size : middle])
+    edges = array("i")
+    edges.frombytes(data[middle:])
+    if sys.byteorder != "little":
+        line_ranges.byteswap()
+        edges.byteswap()
+    return CompactCFG("", line_ranges, edges, component_count)
+
+
+class CFGCache:
+    """Content-addressed on-disk cache of built control-flow graphs.
+
+    Entries are keyed by the hash of the source, the PyCFG version and the
+    Python version, so a file that has not changed is never parsed or built
+    twice by the same interpreter. Entries are written atomically and the
+    least recently used ones are evicted once the cache grows past its
+    size bound, which makes it safe to share one directory between
+    processes. Entries hold flat arrays behind a fixed header, so reading
+    one never runs code from the shared directory, and entries that cannot
+    be loaded count as misses and are removed.
+    """
+
+    suffix = ".cfg"
+    # Entries are written to temporary files named with this prefix first
+    temporary_prefix = ".tmp-"
+    # Age after which a temporary file was left behind by a dead writer
+    stale_seconds = 3600.0
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        """Open or create a cache directory
+
+        Args:
+            directory (str): Directory holding the cache entries
+            max_bytes (int): Size the cache is trimmed down to when
+            an entry pushes it past this bound
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(size for _, _, size in self._entries())
+
+    @staticmethod
+    def key(source: bytes) -> str:
+        """Get the cache key of a source file
+
+        Args:
+            source (bytes): Contents of the source file
+
+        Returns:
+            str: Hex digest of the source, PyCFG version and Python version,
+            as the AST differs between Python versions
+        """
+        digest = sha256(__version__.encode())
+        digest.update(b"\0")
+        digest.update("{}.{}".format(*sys.version_info[:2]).encode())
+        digest.update(b"\0")
+        digest.update(source)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CFGCache.suffix)
+
+    def _entries(self):
+        """Yield the path, last use and size of every entry"""
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(CFGCache.suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def get(self, source: bytes, namespace: str) -> Optional[CompactCFG]:
+        """Look up the graph of a source file
+
+        Args:
+            source (bytes): Contents of the source file
+            namespace (str): Namespace to give the cached graph
+
+        Returns:
+            Optional[CompactCFG]: The cached graph, or None on a miss
+        """
+        path = self._path(CFGCache.key(source))
+        try:
+            with open(path, "rb") as entry:
+                data = entry.read()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            compact = _decode_entry(data)
+            os.utime(path)
+        except (ValueError, OSError):
+            # Corrupt, truncated or written by an incompatible version
+            self.misses += 1
+            self._remove(path, len(data))
+            return None
+        self.hits += 1
+        compact.namespace = namespace
+        return compact
+
+    def put(self, source: bytes, compact: CompactCFG):
+        """Store the graph of a source file
+
+        Args:
+            source (bytes): Contents of the source file
+            compact (CompactCFG): Graph built from the source
+        """
+        data = _encode_entry(compact)
+        path = self._path(CFGCache.key(source))
+        descriptor, temporary_path = mkstemp(
+            prefix=CFGCache.temporary_prefix, dir=self.directory
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as entry:
+                entry.write(data)
+            try:
+                replaced_size = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced_size = 0
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+        self._size += len(data) - replaced_size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _remove(self, path: str, size: int):
+        """Remove an entry, if another process has not already"""
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            return
+        self._size -= size
+
+    def _sweep_temporary_files(self):
+        """Remove the temporary files of writers that died mid-write"""
+        cutoff = time.time() - CFGCache.stale_seconds
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.startswith(CFGCache.temporary_prefix):
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits
+        within its size bound, along with stale temporary files
+        """
+        self._sweep_temporary_files()
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        self._size = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def build(self, path: str) -> CompactCFG:
+        """Get the graph of a file, building and storing it on a miss
+
+        Args:
+            path (str): Path of the Python file
+
+        Returns:
+            CompactCFG: Graph of the file namespaced by path
+
+        Raises:
+            SyntaxError: If the file cannot be parsed
+        """
+        with open(path, "rb") as source_file:
+            source = source_file.read()
+        compact = self.get(source, path)
+        if compact is None:
+            compact = CFG(
+                parse(source, filename=path).body, zero_copy=True
+            ).to_compact(path)
+            self.put(source, compact)
+        return compact
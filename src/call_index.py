@@ -0,0 +1,239 @@
+import os
+import pickle
+from ast import parse
+from sys import intern
+from tempfile import mkstemp
+from typing import Dict, Iterable, List, Tuple
+from src import __version__
+from src.cfg import CFG
+
+# (file, block identifier, line)
+Posting = Tuple[str, int, int]
+
+
+class CallIndex:
+    """Inverted index from called functions to the blocks calling them,
+    across every file of a project.
+
+    Callees are indexed by the dotted name they are called through, and
+    by the last part of that name so that method calls can be found
+    whatever they are called on. Postings come from the block summaries,
+    so nested calls are indexed too. Adding a file again replaces its
+    postings, which keeps the index current as graphs are rebuilt. The
+    postings of each name are kept by file, so replacing a file only
+    touches its own postings however many files call the same names.
+    """
+
+    format_version = 2
+
+    def __init__(self):
+        """Instantiate empty index"""
+        # Postings of each name and attribute by file, in the order added
+        self._by_name: Dict[str, Dict[str, List[Posting]]] = {}
+        self._by_attribute: Dict[str, Dict[str, List[Posting]]] = {}
+        # Names each file has postings under
+        self._files: Dict[str, Tuple[str, ...]] = {}
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    @property
+    def files(self) -> List[str]:
+        """Files with postings in the index, in the order added"""
+        return list(self._files)
+
+    def add(self, path: str, cfg: CFG):
+        """Index the calls of a file, replacing any earlier postings of it
+
+        Args:
+            path (str): Name the postings of the file are filed under
+            cfg (CFG): Graph built from the file. Scopes a lazy graph has
+            not built yet are not indexed
+        """
+        if path in self._files:
+            self.remove(path)
+        path = intern(path)
+        names: Dict[str, None] = {}
+        for basic_block in cfg.basic_blocks:
+            identifier = basic_block.identifier
+            for name, line in basic_block.summary.calls:
+                if name == "":
+                    continue
+                posting = (path, identifier, line)
+                CallIndex._file_postings(self._by_name, name, path).append(
+                    posting
+                )
+                attribute = name.rpartition(".")[2]
+                if attribute != name:
+                    CallIndex._file_postings(
+                        self._by_attribute, attribute, path
+                    ).append(posting)
+                names[name] = None
+        self._files[path] = tuple(names)
+
+    def add_file(self, path: str):
+        """Build the graph of a file and index its calls
+
+        Args:
+            path (str): Path of the Python file
+
+        Raises:
+            SyntaxError: If the file cannot be parsed
+        """
+        with open(path, "rb") as source_file:
+            source = source_file.read()
+        self.add(path, CFG(parse(source, filename=path).body, zero_copy=True))
+
+    def remove(self, path: str):
+        """Drop every posting of a file
+
+        Args:
+            path (str): Name the postings of the file are filed under
+
+        Raises:
+            ValueError: If the file is not part of the index
+        """
+        try:
+            names = self._files.pop(path)
+        except KeyError:
+            raise ValueError("File is not part of the index")
+        for name in names:
+            CallIndex._discard(self._by_name, name, path)
+            attribute = name.rpartition(".")[2]
+            if attribute != name:
+                CallIndex._discard(self._by_attribute, attribute, path)
+
+    @staticmethod
+    def _file_postings(
+        postings: Dict[str, Dict[str, List[Posting]]], key: str, path: str
+    ) -> List[Posting]:
+        """Get the postings of a file filed under one key, to add to"""
+        by_file = postings.get(key)
+        if by_file is None:
+            by_file = postings[key] = {}
+        file_postings = by_file.get(path)
+        if file_postings is None:
+            file_postings = by_file[path] = []
+        return file_postings
+
+    @staticmethod
+    def _discard(
+        postings: Dict[str, Dict[str, List[Posting]]], key: str, path: str
+    ):
+        """Drop the postings of a file filed under one key"""
+        by_file = postings.get(key)
+        if by_file is None:
+            return
+        by_file.pop(path, None)
+        if len(by_file) == 0:
+            del postings[key]
+
+    def callers(self, name: str, any_receiver: bool = False) -> List[Posting]:
+        """Find every call of a function
+
+        Args:
+            name (str): Dotted name the function is called through
+            any_receiver (bool): Also find calls of a method or function
+            with this name whatever it is called on, such as self.name()
+            for name
+
+        Returns:
+            List[Posting]: File, block identifier and line of each call,
+            grouped by file in the order the files were added
+        """
+        by_file = self._by_name.get(name, {})
+        attribute_by_file = (
+            self._by_attribute.get(name, {}) if any_receiver else {}
+        )
+        if len(attribute_by_file) == 0:
+            return [
+                posting
+                for file_postings in by_file.values()
+                for posting in file_postings
+            ]
+        callers: List[Posting] = []
+        for path in self._files:
+            if path in by_file or path in attribute_by_file:
+                callers.extend(
+                    sorted(
+                        by_file.get(path, []) + attribute_by_file.get(path, [])
+                    )
+                )
+        return callers
+
+    def save(self, path: str):
+        """Write the index to a file atomically
+
+        Args:
+            path (str): Path of the file to write
+        """
+        data = pickle.dumps(
+            (
+                CallIndex.format_version,
+                __version__,
+                self._by_name,
+                self._by_attribute,
+                self._files,
+            ),
+            pickle.HIGHEST_PROTOCOL,
+        )
+        descriptor, temporary_path = mkstemp(
+            dir=os.path.dirname(os.path.abspath(path))
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as index_file:
+                index_file.write(data)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    @staticmethod
+    def load(path: str) -> "CallIndex":
+        """Read an index written by save
+
+        Args:
+            path (str): Path of the file to read
+
+        Returns:
+            CallIndex: The saved index
+
+        Raises:
+            ValueError: If the file was written by another version of
+            PyCFG or is not an index
+        """
+        with open(path, "rb") as index_file:
+            try:
+                saved = pickle.load(index_file)
+            except (EOFError, pickle.UnpicklingError):
+                raise ValueError("File is not a call index")
+        if (
+            not isinstance(saved, tuple)
+            or len(saved) != 5
+            or saved[:2] != (CallIndex.format_version, __version__)
+        ):
+            raise ValueError("Call index was saved by another version")
+        index = CallIndex()
+        _, _, index._by_name, index._by_attribute, index._files = saved
+        return index
+
+    @staticmethod
+    def build(paths: Iterable[str]) -> "CallIndex":
+        """Index the calls of many files
+
+        Args:
+            paths (Iterable[str]): Paths of the Python files
+
+        Returns:
+            CallIndex: Index of every call in the files
+
+        Raises:
+            SyntaxError: If a file cannot be parsed
+        """
+        index = CallIndex()
+        for path in paths:
+            index.add_file(path)
+        return index
@@ -1,25 +1,650 @@
-from typing import List
-from ast import AST, stmt
+from array import array
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+from ast import (
+    AST,
+    AsyncFor,
+    AsyncFunctionDef,
+    ClassDef,
+    ExceptHandler,
+    For,
+    FunctionDef,
+    If,
+    Return,
+    While,
+    increment_lineno,
+    parse,
+    stmt,
+)
+from src.analysis.block_graph import BlockGraph
+from src.analysis.components import StronglyConnectedComponents
+from src.analysis.dataflow import Liveness, ReachingDefinitions
+from src.analysis.dominators import DominatorTree
+from src.analysis.loops import LoopForest
+from src.analysis.merkle import CFGDiff, MerkleTree
+from src.analysis.reachability import ReachabilityIndex
 from src.models.basic_block import BasicBlock
+from src.models.compact_cfg import CompactCFG
 from src.models.equivalence_classes import EquivalenceClasses
+from src.models.source_body import SourceBody, SourceText
+from src.serialization import write_cfg
+from src.stats import BuildStats
 from _ast import Try
 
+if TYPE_CHECKING:
+    from src.cache import CFGCache
+
 
 class CFG:
     """Class representing the control-flow graph of a program
     """
 
+    scope_types = {FunctionDef, AsyncFunctionDef, ClassDef}
+    loop_types = {For, AsyncFor, While}
+    _build_block = staticmethod(BasicBlock.build_from_ast_range)
+
     def __init__(
-        self, ast_nodes: List[AST],
+        self,
+        ast_nodes: List[AST],
+        freeze: bool = False,
+        zero_copy: bool = False,
+        lazy: bool = False,
+        summarize: bool = False,
+        stats: bool = False,
+        stats_hook: Optional[Callable[[BuildStats], None]] = None,
     ):
         """Instantiate Control Flow Graph by parsing list of AST nodes
 
         Args:
             ast_nodes (List[AST]): AST nodes of program to generate graph for
+            freeze (bool): Store the edges in a compact, read-only graph
+            once built instead of per-node sets
+            zero_copy (bool): Give basic blocks read-only views over the
+            statement lists of the AST instead of copying their statements
+            lazy (bool): Only build the blocks of a function or class once
+            it is looked up in scopes
+            summarize (bool): Collect the summary of each block as it is
+            built instead of on first access
+            stats (bool): Record where the time of each full build went
+            in stats. Scopes rebuilt in place by update, or built when
+            they are looked up, are not recorded, so stats always describe
+            the last full build
+            stats_hook (Optional[Callable[[BuildStats], None]]): Called
+            with the statistics after each full build. Implies stats
+
+        Raises:
+            ValueError: If both lazy and freeze are set, as deferred scopes
+            are spliced into the edges when they are looked up
         """
-        self.ast_nodes = ast_nodes
-        self.equivalence_classes = EquivalenceClasses()
+        if lazy and freeze:
+            raise ValueError("Lazy graphs cannot be frozen")
+        self.ast_nodes: Optional[List[AST]] = ast_nodes
+        self.source: Optional[str] = None
+        self._retain_ast = True
+        self.scopes = _Scopes(self)
+        self._freeze = freeze
+        self._zero_copy = zero_copy
+        self._lazy = lazy
+        self._summarize = summarize
+        # Functions and classes built along with every scope nested in them
+        self._eager_scopes: Set[Tuple[int, ...]] = set()
+        self._analyses: Dict[str, Any] = {}
+        self._analyses_version: Optional[Tuple[EquivalenceClasses, int]] = None
+        self.stats: Optional[BuildStats] = None
+        self._stats_hook = stats_hook
+        self._record_stats = stats or stats_hook is not None
+        self._build()
+
+    def _build(self):
+        """Build all basic blocks and equivalence classes from scratch"""
+        self._start_build(EquivalenceClasses())
+        if self._record_stats:
+            self._build_instrumented()
+            return
         self.basic_blocks = self._build_all_basic_blocks(self.ast_nodes)
+        if self._freeze:
+            self.equivalence_classes.freeze()
+
+    def _start_build(
+        self, equivalence_classes: Union[EquivalenceClasses, "_EdgeStream"]
+    ):
+        """Reset the state the builder keeps while walking the statements
+
+        Args:
+            equivalence_classes (Union[EquivalenceClasses, _EdgeStream]):
+            Classes the blocks and edges are recorded in
+        """
+        self.equivalence_classes = equivalence_classes
+        self._next_identifier = 0
+        self._scope_links: Dict[Tuple[int, ...], _NestedLink] = {}
+        # Blocks of the body of each loop by the identifier of its first
+        self._loop_blocks: Dict[int, List[int]] = {}
+        self._flow_successors: Dict[int, List[int]] = {}
+
+    def _build_instrumented(self):
+        """Build like _build while recording statistics, then hand them to
+        the hook. Timing wrappers shadow the builder methods on this
+        instance and its equivalence classes only while building
+        """
+        stats = BuildStats()
+        equivalence_classes = self.equivalence_classes
+        link = stats.timed("link", self._resolve_nested_link)
+
+        def resolve_nested_link(nested_link: _NestedLink, *args):
+            if nested_link.depth + 1 > stats.max_depth:
+                stats.max_depth = nested_link.depth + 1
+            link(nested_link, *args)
+
+        validate = stats.timed("validate", BasicBlock._validate_ast_range)
+        build_body = stats.timed("build_body", BasicBlock._build_body_range)
+
+        def build_block(
+            ast: List[AST],
+            start: int,
+            zero_copy: bool,
+            identifier: int,
+            summarize: bool,
+        ) -> Tuple[BasicBlock, int]:
+            # Same steps as BasicBlock.build_from_ast_range, timed one by one
+            end = validate(ast, start)
+            body = build_body(ast, start, end, zero_copy)
+            basic_block = BasicBlock(body, identifier)
+            return basic_block._summarized(summarize), end
+
+        self._build_block = stats.timed("build_blocks", build_block)
+        self._resolve_nested_link = resolve_nested_link
+        equivalence_classes._find_root = stats.counted_find_root(
+            equivalence_classes
+        )
+        start = perf_counter()
+        try:
+            self.basic_blocks = self._build_all_basic_blocks(self.ast_nodes)
+        finally:
+            del self._build_block
+            del self._resolve_nested_link
+            del equivalence_classes._find_root
+        if self._freeze:
+            stats.timed("freeze", equivalence_classes.freeze)()
+        stats.total_seconds = perf_counter() - start
+
+        stats.block_count = len(self.basic_blocks)
+        stats.edge_count = sum(
+            len(equivalence_classes.successors(basic_block.identifier))
+            for basic_block in self.basic_blocks
+        )
+        stats.component_count = equivalence_classes.count
+        self.stats = stats
+        if self._stats_hook is not None:
+            self._stats_hook(stats)
+
+    @classmethod
+    def from_source(
+        cls, source: str, retain_ast: bool = True, **kwargs
+    ) -> "CFG":
+        """Instantiate Control Flow Graph by parsing Python source. The
+        source is kept so that update can find the lines that were edited
+
+        Without the AST, each block only keeps the positions and kinds of
+        its statements in a SourceBody, which parses them again from the
+        source when they are read, and ast_nodes is None.
+
+        Args:
+            source (str): Source of the program
+            retain_ast (bool): Keep the AST once the graph is built
+            **kwargs: Options passed on to the constructor
+
+        Returns:
+            CFG: Control Flow Graph of the program
+
+        Raises:
+            SyntaxError: If the source cannot be parsed
+            ValueError: If the AST is not retained for a lazy graph, which
+            builds its scopes from the AST when they are looked up
+        """
+        if not retain_ast:
+            if kwargs.get("lazy", False):
+                raise ValueError("Lazy graphs must retain the AST")
+            # Views keep the statements wrapped in Expr nodes, whose
+            # positions are the ones to parse again
+            kwargs["zero_copy"] = True
+        cfg = cls(parse(source).body, **kwargs)
+        cfg.source = source
+        if not retain_ast:
+            cfg._retain_ast = False
+            cfg._drop_ast()
+        return cfg
+
+    def _drop_ast(self):
+        """Replace the body of every block with a SourceBody and release
+        the AST, keeping what the graph still reads from it
+        """
+        source = SourceText(self.source)
+        # Scope names are only found in the AST
+        self.scopes.keys_by_name
+        for basic_block in self.basic_blocks:
+            basic_block.body = SourceBody.from_statements(
+                basic_block.body.statements, source
+            )
+            basic_block._function_calls = None
+        empty_body = SourceBody.from_statements([], source)
+        for link in self._scope_links.values():
+            link.entrance_node = None
+            # Empty blocks before a compound statement are never added
+            previous_body = link.previous_block.body
+            if len(previous_body) == 0:
+                link.previous_block.body = empty_body
+                link.previous_block._summary = None
+            elif not isinstance(previous_body, SourceBody):
+                link.previous_block.body = SourceBody.from_statements(
+                    previous_body.statements, source
+                )
+        self.ast_nodes = None
+
+    @classmethod
+    def iter_basic_blocks(
+        cls,
+        ast_nodes: List[AST],
+        zero_copy: bool = False,
+        summarize: bool = False,
+    ) -> Iterator[Union[BasicBlock, Tuple[int, int]]]:
+        """Build the control flow graph of a program as a stream
+
+        Each basic block is yielded as soon as its statements are known,
+        and each edge as a (source, destination) tuple of block identifiers
+        as soon as it is created, so every edge comes after both of its
+        blocks. Blocks and edges are not kept once yielded, so only the
+        equivalence classes of the block identifiers grow with the program.
+
+        Args:
+            ast_nodes (List[AST]): AST nodes of program to generate graph for
+            zero_copy (bool): Give basic blocks read-only views over the
+            statement lists of the AST instead of copying their statements
+            summarize (bool): Collect the summary of each block as it is
+            built instead of on first access
+
+        Returns:
+            Iterator[Union[BasicBlock, Tuple[int, int]]]: Blocks and edges
+            in the order they are created, with the same identifiers and
+            edges as a CFG built from the same nodes
+        """
+        # The graph of an empty program builds the blocks, recording them
+        # in a stream rather than in its own equivalence classes
+        cfg = cls([], zero_copy=zero_copy, summarize=summarize)
+        stream = _EdgeStream()
+        cfg._start_build(stream)
+        edges = stream.edges
+        for basic_block in cfg._iter_all_basic_blocks(ast_nodes, None):
+            yield from edges
+            edges.clear()
+            yield basic_block
+        yield from edges
+
+    def update(
+        self, source: str, changed_lines: Optional[Tuple[int, int]] = None,
+    ):
+        """Update the graph after the source of the program was edited
+
+        Only the blocks of the innermost function or class containing every
+        edit are rebuilt, and only the edges at the boundaries of that scope
+        are relinked. Blocks outside of it keep their identifiers, and the
+        AST kept by the graph is patched in place. Edits outside of any
+        function or class, to a frozen graph, or to a graph that dropped
+        its AST, rebuild the whole graph.
+
+        Args:
+            source (str): Edited source of the program
+            changed_lines (Optional[Tuple[int, int]]): First and last line of
+            the edited source that changed. Found by comparing against the
+            previous source when omitted
+
+        Raises:
+            SyntaxError: If the edited source cannot be parsed
+        """
+        new_nodes = parse(source).body
+        line_delta = None
+        if changed_lines is None and self.source is not None:
+            changed_lines, line_delta = CFG._find_changed_lines(
+                self.source, source
+            )
+            if changed_lines is None:
+                self.source = source
+                return
+
+        if not self._retain_ast:
+            # Scopes are only patched in the AST, so rebuild without it
+            self.ast_nodes = new_nodes
+            self.source = source
+            self._build()
+            self.scopes.clear()
+            self._drop_ast()
+            return
+
+        scope = None
+        if changed_lines is not None and not self._freeze:
+            scope = self._find_changed_scope(
+                new_nodes, changed_lines, line_delta
+            )
+        if scope is not None:
+            # Scopes nested in the edited one may have moved
+            key = scope[0]
+            self._eager_scopes = {
+                eager_key
+                for eager_key in self._eager_scopes
+                if eager_key[: len(key)] != key or len(eager_key) == len(key)
+            }
+        if scope is None or not self._replace_scope(*scope):
+            self.ast_nodes = new_nodes
+            self._eager_scopes = set()
+            self._build()
+        self.scopes.clear()
+        self.source = source
+
+    def materialize_all(self):
+        """Build every function and class a lazy graph deferred, so that
+        the blocks and edges cover the whole program. Unlike looking up
+        each name in scopes, this also builds definitions shadowed by a
+        later one of the same name
+        """
+        deferred_keys = [
+            key for key, link in self._scope_links.items() if link.deferred
+        ]
+        for key in deferred_keys:
+            self._materialize(key)
+
+    @classmethod
+    def build_many(
+        cls,
+        paths: Iterable[str],
+        workers: Optional[int] = None,
+        chunksize: Optional[int] = None,
+        cache: Optional["CFGCache"] = None,
+    ) -> List[CompactCFG]:
+        """Parse and build the graphs of many files in a process pool
+
+        Args:
+            paths (Iterable[str]): Paths of the Python files to build
+            workers (Optional[int]): Number of worker processes. Defaults
+            to the number of CPUs; 1 builds in the calling process
+            chunksize (Optional[int]): Number of files sent to a worker
+            at once. Defaults to a quarter of each worker's share
+            cache (Optional[CFGCache]): Cache to look graphs up in before
+            building them, and to store newly built graphs in
+
+        Returns:
+            List[CompactCFG]: The graph of each file, in the order of paths
+
+        Raises:
+            SyntaxError: If any of the files cannot be parsed
+        """
+        paths = list(paths)
+        if cache is None:
+            return CFG._build_compact_many(paths, workers, chunksize)
+
+        results: List[Optional[CompactCFG]] = []
+        sources: List[bytes] = []
+        for path in paths:
+            with open(path, "rb") as source_file:
+                sources.append(source_file.read())
+            results.append(cache.get(sources[-1], path))
+        missing = [i for i, result in enumerate(results) if result is None]
+        built = CFG._build_compact_many(
+            [paths[i] for i in missing], workers, chunksize
+        )
+        for i, compact in zip(missing, built):
+            cache.put(sources[i], compact)
+            results[i] = compact
+        return results
+
+    @staticmethod
+    def _build_compact_many(
+        paths: List[str], workers: Optional[int], chunksize: Optional[int],
+    ) -> List[CompactCFG]:
+        """Build the compact graph of each file, in a process pool when
+        there is more than one worker and file
+        """
+        if workers is None:
+            workers = cpu_count() or 1
+        if workers <= 1 or len(paths) <= 1:
+            return [_build_compact(path) for path in paths]
+        if chunksize is None:
+            chunksize = max(1, len(paths) // (workers * 4))
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(_build_compact, paths, chunksize=chunksize)
+            )
+
+    def to_compact(self, namespace: str) -> CompactCFG:
+        """Summarize the graph into flat arrays that are cheap to pickle
+
+        Args:
+            namespace (str): Name identifying the source of the graph,
+            usually its file path
+
+        Returns:
+            CompactCFG: Summary with blocks numbered by build order
+        """
+        positions = {
+            basic_block.identifier: i
+            for i, basic_block in enumerate(self.basic_blocks)
+        }
+        line_ranges = array("i")
+        edges = array("i")
+        for i, basic_block in enumerate(self.basic_blocks):
+            line_ranges.extend(basic_block.line_range)
+            for destination in sorted(
+                positions[identifier]
+                for identifier in self.equivalence_classes.successors(
+                    basic_block.identifier
+                )
+            ):
+                edges.append(i)
+                edges.append(destination)
+        return CompactCFG(
+            namespace, line_ranges, edges, self.equivalence_classes.count
+        )
+
+    def save(self, path: str):
+        """Write the graph to a binary file that MappedCFG can open without
+        deserializing it
+
+        Args:
+            path (str): Path of the file to write
+
+        Raises:
+            ValueError: If an identifier does not fit in a C int
+        """
+        write_cfg(self, path)
+
+    def _analysis(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Get the result of an analysis of the graph, computing it only if
+        the graph changed since it was last computed
+
+        Args:
+            name (str): Name the result is cached under
+            compute (Callable[[], Any]): Computes the result
+
+        Returns:
+            Any: The cached or newly computed result
+        """
+        version = (self.equivalence_classes, self.equivalence_classes.version)
+        if self._analyses_version != version:
+            self._analyses = {}
+            self._analyses_version = version
+        if name not in self._analyses:
+            self._analyses[name] = compute()
+        return self._analyses[name]
+
+    def flow_successors(self, identifier: int) -> List[int]:
+        """Get the blocks control can run to right after a block. Unlike
+        the edges of the equivalence classes, which only join the blocks
+        of a compound statement to the blocks around it, these follow
+        branches, loops, returns and exceptions
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            List[int]: Identifiers of the blocks that can run next
+        """
+        return self._flow_successors.get(identifier, [])
+
+    def block_graph(self) -> BlockGraph:
+        """Get the edges of the graph indexed by block position
+
+        Returns:
+            BlockGraph: Directed graph shared by the analyses of the CFG
+        """
+        return self._analysis("block_graph", lambda: BlockGraph(self))
+
+    def dominators(self, post: bool = False) -> DominatorTree:
+        """Get the dominator tree of the graph, computed once until the
+        graph changes
+
+        Args:
+            post (bool): Get the post-dominator tree instead
+
+        Returns:
+            DominatorTree: Immediate dominator of every block
+        """
+        return self._analysis(
+            "post_dominators" if post else "dominators",
+            lambda: DominatorTree(self.block_graph(), post),
+        )
+
+    def components(self) -> StronglyConnectedComponents:
+        """Get the strongly connected components of the graph, computed
+        once until the graph changes
+
+        Returns:
+            StronglyConnectedComponents: Blocks grouped by mutual reachability
+        """
+        return self._analysis(
+            "components",
+            lambda: StronglyConnectedComponents(self.block_graph()),
+        )
+
+    def loops(self) -> LoopForest:
+        """Get the loop-nesting forest of the graph, computed once until
+        the graph changes
+
+        Returns:
+            LoopForest: Loops with their headers, back edges and nesting
+        """
+        return self._analysis(
+            "loops",
+            lambda: LoopForest(
+                self.block_graph(), list(self._loop_blocks.values())
+            ),
+        )
+
+    def liveness(self) -> Liveness:
+        """Get the variables live at the start and end of each block,
+        computed once until the graph changes
+
+        Returns:
+            Liveness: Solution of the backward liveness problem
+        """
+        return self._analysis(
+            "liveness",
+            lambda: Liveness(self.block_graph(), self.basic_blocks),
+        )
+
+    def reaching_definitions(self) -> ReachingDefinitions:
+        """Get the bindings of variables reaching the start and end of each
+        block, computed once until the graph changes
+
+        Returns:
+            ReachingDefinitions: Solution of the forward reaching
+            definitions problem
+        """
+        return self._analysis(
+            "reaching_definitions",
+            lambda: ReachingDefinitions(self.block_graph(), self.basic_blocks),
+        )
+
+    def merkle_tree(self) -> MerkleTree:
+        """Get the Merkle hash of the module and of every function and
+        class, computed once until the graph changes. Every deferred scope
+        is built first, including shadowed definitions
+
+        Returns:
+            MerkleTree: Hash of each scope by qualified name
+        """
+        self.materialize_all()
+        return self._analysis(
+            "merkle_tree",
+            lambda: MerkleTree(
+                self.block_graph(), self.basic_blocks, self._scope_ranges()
+            ),
+        )
+
+    def _scope_ranges(self) -> Dict[str, Tuple[int, int]]:
+        """Get the positions of the first block of every function and class
+        and just past its last block, by qualified name
+        """
+        graph = self.block_graph()
+        ranges: Dict[str, Tuple[int, int]] = {}
+        for name, key in self.scopes.keys_by_name.items():
+            link = self._scope_links.get(key)
+            if link is None or link.count == 0:
+                continue
+            start = graph.index(link.first_block.identifier)
+            ranges[name] = (start, start + link.count)
+        return ranges
+
+    def diff(self, other: "CFG") -> CFGDiff:
+        """Find the blocks and edges that differ in another graph, such as
+        the graph of a later version of the same program. Only the scopes
+        whose Merkle hashes differ are compared
+
+        Args:
+            other (CFG): Graph to compare against
+
+        Returns:
+            CFGDiff: Blocks and edges added to, removed from or changed in
+            other, with added blocks and edges from other and removed ones
+            from this graph
+        """
+        return CFGDiff(self.merkle_tree(), other.merkle_tree())
+
+    def reachability(
+        self, max_closure_bytes: Optional[int] = 64 * 1024 * 1024
+    ) -> ReachabilityIndex:
+        """Get an index of which blocks can reach which, built once until
+        the graph changes
+
+        Args:
+            max_closure_bytes (Optional[int]): Largest transitive closure
+            to store before falling back to searching on each query. None
+            always stores it, and 0 never does
+
+        Returns:
+            ReachabilityIndex: Index answering directed reachability queries
+        """
+        return self._analysis(
+            f"reachability:{max_closure_bytes}",
+            lambda: ReachabilityIndex(
+                self.block_graph(), self.components(), max_closure_bytes
+            ),
+        )
 
     @staticmethod
     def _validate_block_attribute(node: AST, attribute: str,) -> bool:
@@ -48,7 +673,26 @@ class CFG:
             of the AST Node. Example: try/except/finally will return
             [[try_body], [except_body], [finally_body]]
         """
-        new_blocks: List[List[stmt]] = []
+        return [
+            nodes for _, nodes in CFG._extract_branches(exit_or_entrance)
+        ]
+
+    @staticmethod
+    def _extract_branches(
+        exit_or_entrance: AST,
+    ) -> List[Tuple[str, List[stmt]]]:
+        """Pull the bodies out of an AST node along with the attribute
+        each of them is found under
+
+        Args:
+            exit_or_entrance (AST): AST node containing statements that
+            make up a new basic block
+
+        Returns:
+            List[Tuple[str, List[stmt]]]: The attribute name and statements
+            of each branch of the AST node, in the order they are built
+        """
+        new_blocks: List[Tuple[str, List[stmt]]] = []
         block_attributes = [
             "body",
             "orelse",
@@ -58,7 +702,7 @@ class CFG:
 
         for attr in block_attributes:
             if CFG._validate_block_attribute(exit_or_entrance, attr,):
-                new_blocks.append(getattr(exit_or_entrance, attr,))
+                new_blocks.append((attr, getattr(exit_or_entrance, attr,)))
         return new_blocks
 
     def _connect_if_disconnected(
@@ -82,26 +726,25 @@ class CFG:
             )
 
     def _link_try_except_finally(
-        self, source_idx: int, nested_blocks: List[BasicBlock]
+        self, source_idx: int, nested_identifiers: Sequence[int]
     ):
         """Link try/except/finally bodies together as
         try -> except, try -> finally, except -> finally
 
         Args:
             source_idx (int): Index of the source block to link
-            nested_blocks (List[BasicBlock]): List of all blocks in
+            nested_identifiers (Sequence[int]): Identifiers of all blocks in
             the Try
         """
-        for i in range(source_idx + 1, len(nested_blocks)):
+        for i in range(source_idx + 1, len(nested_identifiers)):
             self._connect_if_disconnected(
-                nested_blocks[source_idx].identifier,
-                nested_blocks[i].identifier,
+                nested_identifiers[source_idx], nested_identifiers[i],
             )
 
     def _link_nested_blocks(
         self,
         previous_block: BasicBlock,
-        nested_blocks: List[BasicBlock],
+        nested_identifiers: Sequence[int],
         next_blocks: List[BasicBlock],
         ast_node: AST,
     ):
@@ -111,67 +754,1113 @@ class CFG:
         Args:
             previous_block (BasicBlock): Block that nested control flow
             transitions from
-            nested_blocks (List[BasicBlock]): Blocks that are part of nested
-            control flow (if/else bodies, etc)
+            nested_identifiers (Sequence[int]): Identifiers of the blocks that
+            are part of nested control flow (if/else bodies, etc)
             next_blocks (List[BasicBlock]): The next blocks that are part of
             the same nesting level as previous_block
             ast_node (AST): The AST entrance node that was responsible for
             the nested blocks (If, Try, etc.)
         """
-        for i, nested_block in enumerate(nested_blocks):
+        for i, nested_identifier in enumerate(nested_identifiers):
             self._connect_if_disconnected(
-                previous_block.identifier, nested_block.identifier,
+                previous_block.identifier, nested_identifier,
             )
             if len(next_blocks) > 0:
                 self._connect_if_disconnected(
-                    next_blocks[0].identifier, nested_block.identifier,
+                    next_blocks[0].identifier, nested_identifier,
                 )
             if isinstance(ast_node, Try):
-                self._link_try_except_finally(i, nested_blocks)
+                self._link_try_except_finally(i, nested_identifiers)
 
-    def _build_nested_blocks(self, entrance_node: AST) -> List[BasicBlock]:
-        """Build the basic blocks nested below the given entrance node
+    def _resolve_nested_link(
+        self,
+        link: "_NestedLink",
+        next_block: Optional[BasicBlock],
+        basic_blocks: Optional[List[BasicBlock]],
+    ):
+        """Link the blocks nested below a compound statement once the
+        first block following it is known
 
         Args:
-            entrance_node (AST): AST node that signifies the start
-            of a new basic block
-
-        Returns:
-            List[BasicBlock]: The basic blocks representing the statements
-            embedded within the body attributes of entrance_node
+            link (_NestedLink): Pending link of the compound statement
+            next_block (Optional[BasicBlock]): First block after the compound
+            statement at the same nesting level, or None if there is none
+            basic_blocks (Optional[List[BasicBlock]]): All blocks built so
+            far, only needed when the link is kept for update
         """
-        nested_nodes = CFG._extract_new_ast_nodes(entrance_node)
-        nested_blocks: List[BasicBlock] = []
-        for nested_block_nodes in nested_nodes:
-            nested_blocks += self._build_all_basic_blocks(nested_block_nodes)
-        return nested_blocks
+        # Blocks are numbered in the order they are built, so the nested
+        # blocks are the ones numbered since the compound statement
+        nested_identifiers = range(link.start, link.end)
+        self._link_nested_blocks(
+            link.previous_block,
+            nested_identifiers,
+            [next_block] if next_block is not None else [],
+            link.entrance_node,
+        )
+        if link.key is not None:
+            link.count = len(nested_identifiers)
+            link.first_block = (
+                basic_blocks[
+                    len(basic_blocks) - self._next_identifier + link.start
+                ]
+                if link.count > 0
+                else None
+            )
+            link.next_block = next_block
+            self._scope_links[link.key] = link
 
     def _build_all_basic_blocks(
-        self, ast_nodes: List[AST],
+        self, ast_nodes: List[AST], key: Optional[Tuple[int, ...]] = (),
     ) -> List[BasicBlock]:
         """Parse all basic blocks out of the list of nodes
 
         Args:
             ast_nodes (List[AST]): AST nodes containing statements
             that make up basic blocks
+            key (Optional[Tuple[int, ...]]): Path of statement indices from
+            the module to the scope owning ast_nodes, or None if they are not
+            the body of a module, function or class. Links of compound
+            statements in scope bodies are kept for update
 
         Returns:
             List[BasicBlock]: All of the basic blocks that are
             formed by the given nodes
         """
         basic_blocks: List[BasicBlock] = []
-        new_block, remaining_nodes = BasicBlock.build_first_from_ast(ast_nodes)
+        for _ in self._iter_all_basic_blocks(ast_nodes, key, basic_blocks):
+            pass
+        return basic_blocks
 
-        if len(new_block.body) > 0:
-            basic_blocks.append(new_block)
-            self.equivalence_classes.add(new_block.identifier)
-        if len(remaining_nodes) == 0:
-            return basic_blocks
+    def _iter_all_basic_blocks(
+        self,
+        ast_nodes: List[AST],
+        key: Optional[Tuple[int, ...]] = (),
+        basic_blocks: Optional[List[BasicBlock]] = None,
+    ) -> Iterator[BasicBlock]:
+        """Parse the basic blocks out of the list of nodes one at a time
 
-        # Entering new basic block
-        nested_blocks = self._build_nested_blocks(remaining_nodes[0])
-        unnested_blocks = self._build_all_basic_blocks(remaining_nodes[1:])
-        self._link_nested_blocks(
-            new_block, nested_blocks, unnested_blocks, remaining_nodes[0]
+        Statement lists are walked with index cursors kept on an explicit
+        stack, so the blocks are built in a single pass without recursion
+        or copying the remaining nodes. A compound statement is linked as
+        soon as the first block after it is found, or its list runs out.
+        The successors each block can run to are recorded along the way.
+
+        Args:
+            ast_nodes (List[AST]): AST nodes containing statements
+            that make up basic blocks
+            key (Optional[Tuple[int, ...]]): Path of statement indices from
+            the module to the scope owning ast_nodes, or None if no links are
+            kept for update
+            basic_blocks (Optional[List[BasicBlock]]): List the blocks are
+            appended to, which is required when key is not None
+
+        Returns:
+            Iterator[BasicBlock]: Each block as soon as it is built, before
+            the compound statements preceding it are linked to it
+        """
+        pending_links: List[_NestedLink] = []
+        if basic_blocks is not None:
+            flow = _ControlFlow(self._flow_successors, self._loop_blocks)
+        else:
+            flow = _ControlFlow(None, None)
+        # (statements, cursor, nesting depth, link of preceding compound, key,
+        # control flow along the statements)
+        cursors = [
+            (ast_nodes, 0, 0, None, key, _Branch(None, "", None, None))
+        ]
+
+        while len(cursors) > 0:
+            nodes, start, depth, link, key, branch = cursors.pop()
+            flow.resume(branch)
+            if link is not None:
+                link.end = self._next_identifier
+                pending_links.append(link)
+
+            new_block, end = self._build_block(
+                nodes,
+                start,
+                self._zero_copy,
+                self._next_identifier,
+                self._summarize,
+            )
+            if len(new_block.body) > 0:
+                self._next_identifier += 1
+                if basic_blocks is not None:
+                    basic_blocks.append(new_block)
+                self.equivalence_classes.add(new_block.identifier)
+                flow.add_block(branch, new_block.identifier)
+                yield new_block
+                while len(pending_links) > 0:
+                    self._resolve_nested_link(
+                        pending_links.pop(), new_block, basic_blocks
+                    )
+            else:
+                # Empty blocks are never added, so they must not share the
+                # identifier handed to the next block
+                new_block.identifier = -1
+            if end == len(nodes):
+                while (
+                    len(pending_links) > 0 and pending_links[-1].depth == depth
+                ):
+                    self._resolve_nested_link(
+                        pending_links.pop(), None, basic_blocks
+                    )
+                flow.finish(branch)
+                continue
+
+            # Entering new basic block
+            entrance_node = nodes[end]
+            link = _NestedLink(
+                new_block,
+                entrance_node,
+                self._next_identifier,
+                depth,
+                key + (end,) if key is not None else None,
+            )
+            compound = flow.enter(branch, entrance_node)
+            cursors.append((nodes, end + 1, depth, link, key, branch))
+            nested_key = (
+                link.key if type(entrance_node) in CFG.scope_types else None
+            )
+            if nested_key is not None and self._defers(nested_key):
+                link.deferred = True
+                continue
+            for attribute, nested_nodes in reversed(
+                CFG._extract_branches(entrance_node)
+            ):
+                cursors.append(
+                    (
+                        nested_nodes,
+                        0,
+                        depth + 1,
+                        None,
+                        nested_key,
+                        _Branch(
+                            compound, attribute, branch.guard, branch.loop
+                        ),
+                    )
+                )
+        flow.close()
+
+    def _defers(self, key: Tuple[int, ...]) -> bool:
+        """Check whether the blocks of a function or class are left
+        unbuilt until it is looked up
+
+        Args:
+            key (Tuple[int, ...]): Key of the function or class
+
+        Returns:
+            bool: True if the scope is not built along with its parent
+        """
+        return (
+            self._lazy
+            and not self._built_with_nested_scopes(key)
+            and not any(
+                eager_key[: len(key)] == key
+                for eager_key in self._eager_scopes
+            )
+        )
+
+    def _built_with_nested_scopes(self, key: Tuple[int, ...]) -> bool:
+        """Check whether a function or class is built along with every
+        scope nested in it
+        """
+        return not self._lazy or any(
+            key[:depth] in self._eager_scopes
+            for depth in range(1, len(key) + 1)
+        )
+
+    def _materialize(self, key: Tuple[int, ...]):
+        """Build the blocks of a function or class, the scopes enclosing
+        it and every scope nested in it, if they were deferred
+
+        Args:
+            key (Tuple[int, ...]): Key of the function or class
+        """
+        if self._built_with_nested_scopes(key):
+            return
+        self._eager_scopes.add(key)
+        links = self._scope_links
+        targets: List[Tuple[int, ...]] = []
+        for depth in range(1, len(key) + 1):
+            if links[key[:depth]].deferred:
+                # Building the outermost deferred scope builds the rest
+                targets.append(key[:depth])
+                break
+        if len(targets) == 0:
+            targets = [
+                nested_key
+                for nested_key, link in links.items()
+                if link.deferred and nested_key[: len(key)] == key
+            ]
+        for target in targets:
+            link = links[target]
+            link.deferred = False
+            if not self._replace_scope(target, link.entrance_node, 0):
+                # Build every scope still deferred in the same rebuild, so
+                # later lookups do not rebuild the graph again
+                self._eager_scopes.update(
+                    deferred_key
+                    for deferred_key, deferred_link in links.items()
+                    if deferred_link.deferred
+                )
+                self._build()
+                return
+
+    def _scope_blocks(self, key: Tuple[int, ...]) -> List[BasicBlock]:
+        """Get the blocks of a function or class, building them if needed
+
+        Args:
+            key (Tuple[int, ...]): Key of the function or class
+
+        Returns:
+            List[BasicBlock]: Blocks of the scope and every scope nested in it
+        """
+        self._materialize(key)
+        link = self._scope_links[key]
+        if link.count == 0:
+            return []
+        start = self.basic_blocks.index(link.first_block)
+        return self.basic_blocks[start : start + link.count]
+
+    @staticmethod
+    def _find_changed_lines(
+        old_source: str, new_source: str
+    ) -> Tuple[Optional[Tuple[int, int]], int]:
+        """Find the lines of the new source that differ from the old source
+
+        Args:
+            old_source (str): Source the graph was built from
+            new_source (str): Edited source
+
+        Returns:
+            Tuple[Optional[Tuple[int, int]], int]: First and last changed
+            line of the new source, or None if nothing changed, and the
+            number of lines added. When lines were only removed, the lines
+            on either side of the removal are returned
+        """
+        old_lines = old_source.splitlines()
+        new_lines = new_source.splitlines()
+        shortest = min(len(old_lines), len(new_lines))
+        prefix = 0
+        while prefix < shortest and old_lines[prefix] == new_lines[prefix]:
+            prefix += 1
+        line_delta = len(new_lines) - len(old_lines)
+        if prefix == shortest and line_delta == 0:
+            return None, 0
+
+        suffix = 0
+        while (
+            suffix < shortest - prefix
+            and old_lines[-1 - suffix] == new_lines[-1 - suffix]
+        ):
+            suffix += 1
+        first, last = prefix + 1, len(new_lines) - suffix
+        if last < first:
+            first, last = prefix, prefix + 1
+        return (first, last), line_delta
+
+    @staticmethod
+    def _find_enclosing_scope(
+        nodes: List[AST], first: int, last: int
+    ) -> Optional[int]:
+        """Find the function or class spanning a range of lines
+
+        Args:
+            nodes (List[AST]): Statements ordered by line
+            first (int): First line of the range
+            last (int): Last line of the range
+
+        Returns:
+            Optional[int]: Index of the statement, or None if no
+            function or class spans the range
+        """
+        low, high = 0, len(nodes)
+        while low < high:
+            middle = (low + high) // 2
+            if nodes[middle].lineno <= first:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return None
+        node = nodes[low - 1]
+        if type(node) in CFG.scope_types and node.end_lineno >= last:
+            return low - 1
+        return None
+
+    def _find_changed_scope(
+        self,
+        new_nodes: List[AST],
+        changed_lines: Tuple[int, int],
+        line_delta: Optional[int],
+    ) -> Optional[Tuple[Tuple[int, ...], AST, int]]:
+        """Find the innermost function or class that contains every edit
+
+        Args:
+            new_nodes (List[AST]): Statements of the edited module
+            changed_lines (Tuple[int, int]): Range of edited lines
+            line_delta (Optional[int]): Number of lines added, if known
+
+        Returns:
+            Optional[Tuple[Tuple[int, ...], AST, int]]: Key of the scope, its
+            edited AST node and the number of lines it grew by, or None if
+            the edit is not confined to a function or class
+        """
+        first, last = changed_lines
+        old_nodes = self.ast_nodes
+        key: Tuple[int, ...] = ()
+        scope = None
+        while len(old_nodes) == len(new_nodes):
+            i = CFG._find_enclosing_scope(new_nodes, first, last)
+            if i is None:
+                break
+            old_node, new_node = old_nodes[i], new_nodes[i]
+            shift = new_node.end_lineno - old_node.end_lineno
+            if (
+                type(old_node) is not type(new_node)
+                or old_node.lineno != new_node.lineno
+                or (line_delta is not None and shift != line_delta)
+                or (
+                    i + 1 < len(new_nodes)
+                    and new_nodes[i + 1].lineno
+                    != old_nodes[i + 1].lineno + shift
+                )
+            ):
+                break
+            key += (i,)
+            if key not in self._scope_links:
+                break
+            scope = key, new_node, shift
+            old_nodes, new_nodes = old_node.body, new_node.body
+        return scope
+
+    def _preceding_links(
+        self, key: Tuple[int, ...]
+    ) -> Iterator["_NestedLink"]:
+        """Iterate backwards over the links of the compound statements
+        directly preceding a scope, stopping at the first simple statement
+
+        Args:
+            key (Tuple[int, ...]): Key of the scope
+
+        Returns:
+            Iterator[_NestedLink]: Links of the preceding compound statements
+        """
+        for i in range(key[-1] - 1, -1, -1):
+            link = self._scope_links.get(key[:-1] + (i,))
+            if link is None:
+                return
+            yield link
+
+    def _nested_link_edges(
+        self,
+        link: "_NestedLink",
+        nested_blocks: List[BasicBlock],
+        rewiring: "_Rewiring",
+    ) -> Set[Tuple[int, int]]:
+        """Work out the edges a full build would add when linking the blocks
+        nested below a compound statement to the blocks around it
+
+        At link time the previous block is on its own, and the next block
+        is not yet connected to any nested block, so the edges only depend
+        on how the nested blocks are connected to each other.
+
+        Args:
+            link (_NestedLink): Link of a compound statement other than Try
+            nested_blocks (List[BasicBlock]): Current blocks nested below it
+            rewiring (_Rewiring): Edge changes not yet applied
+
+        Returns:
+            Set[Tuple[int, int]]: Source and destination of each edge
+        """
+        roots: Dict[int, int] = {}
+
+        def find(identifier: int) -> int:
+            root = identifier
+            while roots.get(root, root) != root:
+                root = roots[root]
+            roots[identifier] = root
+            return root
+
+        nested = {nested_block.identifier for nested_block in nested_blocks}
+        for identifier in nested:
+            node = self.equivalence_classes.get_node(identifier)
+            for destination in node.destinations:
+                edge = (identifier, destination.identifier)
+                if edge[1] in nested and edge not in rewiring.removed_edges:
+                    roots[find(edge[0])] = find(edge[1])
+        for source, destination in rewiring.added_edges:
+            if source in nested and destination in nested:
+                roots[find(source)] = find(destination)
+
+        edges: Set[Tuple[int, int]] = set()
+        neighbors = []
+        if len(link.previous_block.body) > 0:
+            neighbors.append(link.previous_block.identifier)
+        if link.next_block is not None:
+            neighbors.append(link.next_block.identifier)
+        for nested_block in nested_blocks:
+            for neighbor in neighbors:
+                if find(neighbor) != find(nested_block.identifier):
+                    edges.add((neighbor, nested_block.identifier))
+                    roots[find(neighbor)] = find(nested_block.identifier)
+        return edges
+
+    def _relink(
+        self,
+        link: "_NestedLink",
+        old_next_block: Optional[BasicBlock],
+        rewiring: "_Rewiring",
+    ):
+        """Replace the edges between the blocks nested below a compound
+        statement and the blocks around it
+
+        Args:
+            link (_NestedLink): Link of the compound statement
+            old_next_block (Optional[BasicBlock]): Next block the nested
+            blocks were previously linked to
+            rewiring (_Rewiring): Edge changes not yet applied
+        """
+        nested_blocks: List[BasicBlock] = []
+        if link.count > 0:
+            start = self.basic_blocks.index(link.first_block)
+            nested_blocks = self.basic_blocks[start : start + link.count]
+        nested = {nested_block.identifier for nested_block in nested_blocks}
+
+        for neighbor in (link.previous_block, old_next_block):
+            if (
+                neighbor is None
+                or neighbor.identifier not in self.equivalence_classes
+                or neighbor.identifier in rewiring.removed_identifiers
+            ):
+                continue
+            node = self.equivalence_classes.get_node(neighbor.identifier)
+            for destination in node.destinations:
+                if destination.identifier in nested:
+                    rewiring.remove(
+                        neighbor.identifier, destination.identifier
+                    )
+        for source, destination in self._nested_link_edges(
+            link, nested_blocks, rewiring
+        ):
+            rewiring.add(source, destination)
+
+    def _relink_preceding(
+        self,
+        key: Tuple[int, ...],
+        old_first_block: Optional[BasicBlock],
+        new_first_block: Optional[BasicBlock],
+        rewiring: "_Rewiring",
+    ):
+        """Point the compound statements directly preceding a scope at
+        the new first block of the scope and relink them
+
+        Args:
+            key (Tuple[int, ...]): Key of the scope
+            old_first_block (Optional[BasicBlock]): First block at or
+            after the scope before it was rebuilt
+            new_first_block (Optional[BasicBlock]): First block at or
+            after the scope after it was rebuilt
+            rewiring (_Rewiring): Edge changes not yet applied
+        """
+        if old_first_block is new_first_block:
+            return
+        for link in self._preceding_links(key):
+            if link.next_block is not old_first_block:
+                return
+            link.next_block = new_first_block
+            if link.count > 0:
+                self._relink(link, old_first_block, rewiring)
+                return
+
+    @staticmethod
+    def _first_block_at(link: "_NestedLink") -> Optional[BasicBlock]:
+        """Get the first block at or after a compound statement within
+        its statement list
+        """
+        if link.count > 0:
+            return link.first_block
+        return link.next_block
+
+    @staticmethod
+    def _scope_link_keys(
+        node: AST, key: Tuple[int, ...]
+    ) -> Iterator[Tuple[int, ...]]:
+        """Iterate over the keys of the compound statements nested in
+        the body of a function or class and its nested scopes
+
+        Args:
+            node (AST): Function or class
+            key (Tuple[int, ...]): Key of the function or class
+
+        Returns:
+            Iterator[Tuple[int, ...]]: Keys of the nested compound statements
+        """
+        scopes = [(node, key)]
+        while len(scopes) > 0:
+            node, key = scopes.pop()
+            for i, ast_node in enumerate(node.body):
+                if type(ast_node) in BasicBlock.invalid_ast_nodes:
+                    yield key + (i,)
+                if type(ast_node) in CFG.scope_types:
+                    scopes.append((ast_node, key + (i,)))
+
+    def _replace_scope(
+        self, key: Tuple[int, ...], new_node: AST, shift: int
+    ) -> bool:
+        """Rebuild the blocks of a single function or class and relink
+        the edges at its boundaries
+
+        Args:
+            key (Tuple[int, ...]): Key of the function or class
+            new_node (AST): Edited function or class
+            shift (int): Number of lines the function or class grew by
+
+        Returns:
+            bool: False if the scope cannot be replaced in place
+        """
+        links = self._scope_links
+        link = links[key]
+        ancestors = [links[key[:depth]] for depth in range(1, len(key))]
+        if shift != 0:
+            self._forget_summaries(link.entrance_node.end_lineno)
+        if link.deferred:
+            link.entrance_node = new_node
+            self._patch_ast(key, ancestors, new_node, shift)
+            return True
+        for depth in range(1, len(key) + 1):
+            for preceding_link in self._preceding_links(key[:depth]):
+                if isinstance(preceding_link.entrance_node, Try):
+                    return False
+                if preceding_link.count > 0:
+                    break
+
+        if link.count > 0:
+            start = self.basic_blocks.index(link.first_block)
+        else:
+            start = len(self.basic_blocks)
+            for outer in [link] + ancestors[::-1]:
+                if outer.next_block is not None:
+                    start = self.basic_blocks.index(outer.next_block)
+                    break
+        ancestor_starts = [
+            self.basic_blocks.index(outer.first_block)
+            if outer.count > 0
+            else start
+            for outer in ancestors
+        ]
+        old_blocks = self.basic_blocks[start : start + link.count]
+
+        for nested_key in CFG._scope_link_keys(link.entrance_node, key):
+            links.pop(nested_key, None)
+        new_blocks = self._build_all_basic_blocks(new_node.body, key)
+        self.basic_blocks[start : start + link.count] = new_blocks
+
+        rewiring = _Rewiring(
+            {old_block.identifier for old_block in old_blocks}
+        )
+        old_first_block = old_blocks[0] if old_blocks else link.next_block
+        link.entrance_node = new_node
+        link.first_block = new_blocks[0] if new_blocks else None
+        link.count = len(new_blocks)
+        self._relink(link, link.next_block, rewiring)
+        self._relink_preceding(
+            key, old_first_block, CFG._first_block_at(link), rewiring
+        )
+
+        for depth in reversed(range(len(ancestors))):
+            outer = ancestors[depth]
+            old_first_block = CFG._first_block_at(outer)
+            outer.count += len(new_blocks) - len(old_blocks)
+            outer.first_block = (
+                self.basic_blocks[ancestor_starts[depth]]
+                if outer.count > 0
+                else None
+            )
+            self._relink(outer, outer.next_block, rewiring)
+            self._relink_preceding(
+                key[: depth + 1],
+                old_first_block,
+                CFG._first_block_at(outer),
+                rewiring,
+            )
+
+        for identifier in rewiring.removed_identifiers:
+            self._loop_blocks.pop(identifier, None)
+            self._flow_successors.pop(identifier, None)
+        self.equivalence_classes.rewire(
+            rewiring.removed_identifiers,
+            rewiring.removed_edges,
+            rewiring.added_edges,
         )
-        return basic_blocks + nested_blocks + unnested_blocks
+        self._patch_ast(key, ancestors, new_node, shift)
+        return True
+
+    def _forget_summaries(self, line: int):
+        """Drop the summaries collected for the blocks after a line, as
+        they record the lines of calls that are about to move
+
+        Args:
+            line (int): Last line that keeps its position
+        """
+        for basic_block in self.basic_blocks:
+            body = basic_block.body
+            if len(body) > 0 and basic_block.line_range[0] > line:
+                basic_block._function_calls = None
+                basic_block._summary = None
+
+    def _patch_ast(
+        self,
+        key: Tuple[int, ...],
+        ancestors: List["_NestedLink"],
+        new_node: AST,
+        shift: int,
+    ):
+        """Put an edited function or class in place of the old one in the
+        AST kept by the graph, and move the statements after it
+
+        Args:
+            key (Tuple[int, ...]): Key of the function or class
+            ancestors (List[_NestedLink]): Links of the enclosing scopes
+            new_node (AST): Edited function or class
+            shift (int): Number of lines the function or class grew by
+        """
+        siblings = self.ast_nodes
+        for outer in ancestors:
+            outer.entrance_node.end_lineno += shift
+            siblings = outer.entrance_node.body
+        siblings[key[-1]] = new_node
+        for depth in range(len(key) if shift != 0 else 0):
+            siblings = (
+                self.ast_nodes
+                if depth == 0
+                else ancestors[depth - 1].entrance_node.body
+            )
+            for sibling in siblings[key[depth] + 1 :]:
+                increment_lineno(sibling, shift)
+
+
+class _NestedLink:
+    """Blocks nested below a compound statement and the blocks around
+    them that they are linked to
+    """
+
+    __slots__ = (
+        "previous_block",
+        "entrance_node",
+        "start",
+        "end",
+        "depth",
+        "key",
+        "first_block",
+        "count",
+        "next_block",
+        "deferred",
+    )
+
+    def __init__(
+        self,
+        previous_block: BasicBlock,
+        entrance_node: AST,
+        start: int,
+        depth: int,
+        key: Optional[Tuple[int, ...]],
+    ):
+        self.previous_block = previous_block
+        self.entrance_node = entrance_node
+        self.start = start
+        self.end = start
+        self.depth = depth
+        self.key = key
+        self.first_block: Optional[BasicBlock] = None
+        self.count = 0
+        self.next_block: Optional[BasicBlock] = None
+        self.deferred = False
+
+
+class _Junction:
+    """Point control flow passes through without a block of its own, such
+    as the test of a loop, which its body returns to
+    """
+
+    __slots__ = ("sources", "targets", "closed")
+
+    def __init__(self):
+        self.sources: List[Union[int, _Junction]] = []
+        self.targets: List[Union[int, _Junction]] = []
+        self.closed = False
+
+
+class _Compound:
+    """Control flow through a compound statement, collected while the
+    statement lists below it are built
+    """
+
+    __slots__ = (
+        "node",
+        "entries",
+        "enclosing",
+        "guard",
+        "exits",
+        "junction",
+        "guarded",
+        "handler_exits",
+        "final_exits",
+        "loop",
+        "blocks",
+    )
+
+    def __init__(
+        self,
+        node: AST,
+        entries: List[Union[int, _Junction]],
+        enclosing: Optional["_Compound"],
+        guard: Optional["_Compound"],
+        loop: Optional["_Compound"],
+    ):
+        self.node = node
+        # Blocks control reaches the statement from
+        self.entries = entries
+        self.enclosing = enclosing
+        # Try whose body the statement is in
+        self.guard = guard
+        # Blocks control leaves the branches from normally
+        self.exits: List[Union[int, _Junction]] = []
+        self.junction: Optional[_Junction] = None
+        # Blocks of a try body, which may raise into its handlers
+        self.guarded: List[int] = []
+        self.handler_exits: List[Union[int, _Junction]] = []
+        self.final_exits: List[Union[int, _Junction]] = []
+        # Loop whose body the statement is in
+        self.loop = loop
+        # Blocks of a loop body, including the bodies of nested loops
+        self.blocks: List[int] = []
+
+
+class _Branch:
+    """Control flow along one statement list while its blocks are built"""
+
+    __slots__ = (
+        "compound",
+        "attribute",
+        "frontier",
+        "pending",
+        "guard",
+        "loop",
+    )
+
+    def __init__(
+        self,
+        compound: Optional[_Compound],
+        attribute: str,
+        guard: Optional[_Compound],
+        loop: Optional[_Compound],
+    ):
+        self.compound = compound
+        self.attribute = attribute
+        # Blocks whose last statement runs right before the next block
+        self.frontier: Optional[List[Union[int, _Junction]]] = None
+        # Compound statement whose branches are being built
+        self.pending: Optional[_Compound] = None
+        if compound is None or type(compound.node) in CFG.scope_types:
+            guard = loop = None
+        elif isinstance(compound.node, Try) and attribute == "body":
+            guard = compound
+        elif type(compound.node) in CFG.loop_types and attribute == "body":
+            loop = compound
+        self.guard = guard
+        self.loop = loop
+
+
+class _ControlFlow:
+    """Successors of the blocks built from one list of statements, in the
+    order control runs through them. Function and class bodies are flows
+    of their own, return statements end the flow, and the blocks of a try
+    body may raise into every handler. Loop tests have no block, so they
+    are kept as junctions and bypassed once every block is built
+    """
+
+    def __init__(
+        self,
+        successors: Optional[Dict[int, List[int]]],
+        loops: Optional[Dict[int, List[int]]],
+    ):
+        """
+        Args:
+            successors (Optional[Dict[int, List[int]]]): Successors of each
+            block the edges are recorded in, or None to drop them
+            loops (Optional[Dict[int, List[int]]]): Blocks of the body of
+            each loop by its first block, or None to drop them
+        """
+        self.successors = successors
+        self.loops = loops
+        self.junctions: List[_Junction] = []
+
+    def link(
+        self,
+        source: Union[int, _Junction],
+        destination: Union[int, _Junction],
+    ):
+        """Record that control can flow from one block or junction to
+        another
+        """
+        if isinstance(source, _Junction):
+            source.targets.append(destination)
+        if isinstance(destination, _Junction):
+            destination.sources.append(source)
+        elif self.successors is not None and isinstance(source, int):
+            successors = self.successors.setdefault(source, [])
+            if destination not in successors:
+                successors.append(destination)
+
+    def resume(self, branch: _Branch):
+        """Find where control comes from before building the next block of
+        a statement list
+        """
+        if branch.frontier is None:
+            compound = branch.compound
+            branch.frontier = (
+                [] if compound is None else self._enter(compound, branch)
+            )
+        elif branch.pending is not None:
+            branch.frontier = self._leave(branch.pending)
+            branch.pending = None
+
+    def add_block(self, branch: _Branch, identifier: int):
+        """Link a block built from a statement list to the blocks before it
+        """
+        for source in branch.frontier:
+            self.link(source, identifier)
+        branch.frontier = [identifier]
+        if branch.guard is not None:
+            branch.guard.guarded.append(identifier)
+        if branch.loop is not None:
+            branch.loop.blocks.append(identifier)
+
+    def enter(self, branch: _Branch, node: AST) -> _Compound:
+        """Start the compound statement that follows the blocks built so far
+        in a statement list
+        """
+        compound = _Compound(
+            node, branch.frontier, branch.compound, branch.guard, branch.loop
+        )
+        branch.pending = compound
+        return compound
+
+    def finish(self, branch: _Branch):
+        """Hand the blocks control leaves a statement list from to the
+        compound statement the list belongs to
+        """
+        compound = branch.compound
+        if compound is None:
+            return
+        node, frontier = compound.node, branch.frontier
+        if type(node) in CFG.loop_types:
+            if branch.attribute == "body":
+                # Back edges to the loop test
+                for source in frontier:
+                    self.link(source, compound.junction)
+                blocks = compound.blocks
+                if len(blocks) > 0 and self.loops is not None:
+                    self.loops[blocks[0]] = blocks
+                if compound.loop is not None:
+                    compound.loop.blocks.extend(blocks)
+            else:
+                compound.exits = frontier
+        elif isinstance(node, Try):
+            if branch.attribute == "finalbody":
+                compound.final_exits = frontier
+            elif branch.attribute != "handlers":
+                compound.exits = frontier
+            if branch.attribute == "body" and compound.guard is not None:
+                # Exceptions not handled here reach the enclosing handlers
+                compound.guard.guarded.extend(compound.guarded)
+        elif isinstance(node, ExceptHandler):
+            compound.enclosing.handler_exits.extend(frontier)
+        elif type(node) not in CFG.scope_types:
+            compound.exits.extend(frontier)
+
+    def _enter(
+        self, compound: _Compound, branch: _Branch
+    ) -> List[Union[int, _Junction]]:
+        """Get the blocks control enters a branch of a compound statement
+        from
+        """
+        node, attribute = compound.node, branch.attribute
+        if type(node) in CFG.scope_types:
+            return []
+        if type(node) in CFG.loop_types:
+            if compound.junction is None:
+                compound.junction = _Junction()
+                self.junctions.append(compound.junction)
+                for source in compound.entries:
+                    self.link(source, compound.junction)
+            return [compound.junction]
+        if isinstance(node, Try):
+            if attribute == "handlers":
+                return compound.entries + compound.guarded
+            if attribute == "orelse":
+                return list(compound.exits)
+            if attribute == "finalbody":
+                return compound.exits + compound.handler_exits
+        return list(compound.entries)
+
+    def _leave(self, compound: _Compound) -> List[Union[int, _Junction]]:
+        """Get the blocks control leaves a compound statement from once
+        all of its branches are built
+        """
+        node = compound.node
+        if isinstance(node, Return):
+            return []
+        if type(node) in CFG.loop_types:
+            if len(node.orelse) > 0:
+                return compound.exits
+            return [compound.junction]
+        if isinstance(node, If):
+            if len(node.orelse) > 0:
+                return compound.exits
+            return compound.exits + compound.entries
+        if isinstance(node, Try):
+            if len(node.finalbody) > 0:
+                return compound.final_exits
+            return compound.exits + compound.handler_exits
+        return compound.entries
+
+    def close(self):
+        """Bypass every junction, linking the blocks flowing into it to the
+        blocks it flows to
+        """
+        for junction in self.junctions:
+            junction.closed = True
+            for source in junction.sources:
+                if isinstance(source, _Junction) and source.closed:
+                    continue
+                for target in junction.targets:
+                    if isinstance(target, _Junction) and target.closed:
+                        continue
+                    self.link(source, target)
+        self.junctions = []
+
+
+class _Scopes(Mapping):
+    """Blocks of every function and class of a graph by qualified name.
+    Scopes the graph defers are built the first time they are looked up.
+    Names follow __qualname__, and a name defined twice refers to the
+    last definition, as it does at runtime
+    """
+
+    def __init__(self, cfg: CFG):
+        self._cfg = cfg
+        self._keys: Optional[Dict[str, Tuple[int, ...]]] = None
+
+    def clear(self):
+        """Forget the names found in the AST after it was edited"""
+        self._keys = None
+
+    @property
+    def keys_by_name(self) -> Dict[str, Tuple[int, ...]]:
+        """Key of every function and class in a module, function or
+        class body by qualified name
+        """
+        if self._keys is None:
+            self._keys = {}
+            bodies = deque([(self._cfg.ast_nodes, (), "")])
+            while len(bodies) > 0:
+                nodes, key, prefix = bodies.popleft()
+                for i, node in enumerate(nodes):
+                    if type(node) not in CFG.scope_types:
+                        continue
+                    name = prefix + node.name
+                    self._keys[name] = key + (i,)
+                    if isinstance(node, ClassDef):
+                        bodies.append((node.body, key + (i,), name + "."))
+                    else:
+                        bodies.append(
+                            (node.body, key + (i,), name + ".<locals>.")
+                        )
+        return self._keys
+
+    def __getitem__(self, qualname: str) -> List[BasicBlock]:
+        return self._cfg._scope_blocks(self.keys_by_name[qualname])
+
+    def __contains__(self, qualname: object) -> bool:
+        return qualname in self.keys_by_name
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys_by_name)
+
+    def __len__(self) -> int:
+        return len(self.keys_by_name)
+
+
+class _EdgeStream:
+    """Equivalence classes of the blocks of a streamed graph. Blocks are
+    numbered densely from 0, so classes are kept in flat arrays, and edges
+    are queued for the consumer instead of being stored
+    """
+
+    def __init__(self):
+        self._roots = array("i")
+        self._sizes = array("i")
+        self.edges: List[Tuple[int, int]] = []
+
+    def add(self, identifier: int):
+        self._roots.append(identifier)
+        self._sizes.append(1)
+
+    def __contains__(self, identifier: int) -> bool:
+        return 0 <= identifier < len(self._roots)
+
+    def find(self, identifier: int) -> int:
+        roots = self._roots
+        while identifier != roots[identifier]:
+            roots[identifier] = roots[roots[identifier]]
+            identifier = roots[identifier]
+        return identifier
+
+    def connect(self, source: int, destination: int):
+        root_one, root_two = self.find(source), self.find(destination)
+        if root_one != root_two:
+            if self._sizes[root_one] < self._sizes[root_two]:
+                root_one, root_two = root_two, root_one
+            self._roots[root_two] = root_one
+            self._sizes[root_one] += self._sizes[root_two]
+        self.edges.append((source, destination))
+
+
+class _Rewiring:
+    """Edge changes collected while relinking the boundaries of a scope"""
+
+    def __init__(self, removed_identifiers: Set[int]):
+        self.removed_identifiers = removed_identifiers
+        self.removed_edges: Set[Tuple[int, int]] = set()
+        self.added_edges: Set[Tuple[int, int]] = set()
+
+    def add(self, source: int, destination: int):
+        edge = (source, destination)
+        if edge in self.removed_edges:
+            self.removed_edges.remove(edge)
+        else:
+            self.added_edges.add(edge)
+
+    def remove(self, source: int, destination: int):
+        edge = (source, destination)
+        if edge in self.added_edges:
+            self.added_edges.remove(edge)
+        else:
+            self.removed_edges.add(edge)
+
+
+def _build_compact(path: str) -> CompactCFG:
+    """Parse and build the graph of a single file in a worker process
+
+    Args:
+        path (str): Path of the Python file to build
+
+    Returns:
+        CompactCFG: Summary of the graph namespaced by path
+    """
+    with open(path, "rb") as source_file:
+        module = parse(source_file.read(), filename=path)
+    return CFG(module.body, zero_copy=True).to_compact(path)
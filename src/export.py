@@ -0,0 +1,192 @@
+import json
+from typing import TYPE_CHECKING, Iterator, Optional, Set, TextIO, Tuple
+from xml.sax.saxutils import escape, quoteattr
+from src.models.basic_block import BasicBlock
+
+if TYPE_CHECKING:
+    from src.cfg import CFG
+
+
+def _label(first_line: int, last_line: int) -> str:
+    """Describe the lines of a block"""
+    if first_line == last_line:
+        return f"line {first_line}"
+    return f"lines {first_line}-{last_line}"
+
+
+def _iter_graph(
+    cfg: "CFG", scope: Optional[str], component: Optional[int]
+) -> Iterator[Tuple[BasicBlock, Iterator[int]]]:
+    """Iterate over the selected blocks along with the identifiers of the
+    selected blocks their edges lead to
+
+    Args:
+        cfg (CFG): Graph to export
+        scope (Optional[str]): Qualified name of the only function or class
+        to export, along with the scopes nested in it
+        component (Optional[int]): Only export the blocks of this
+        equivalence class, as numbered by EquivalenceClasses.find
+
+    Returns:
+        Iterator[Tuple[BasicBlock, Iterator[int]]]: Each block with the
+        destinations of its edges, in order
+
+    Raises:
+        ValueError: If scope is not a function or class of the graph
+    """
+    equivalence_classes = cfg.equivalence_classes
+    basic_blocks = cfg.basic_blocks
+    scope_identifiers: Optional[Set[int]] = None
+    if scope is not None:
+        if scope not in cfg.scopes:
+            raise ValueError("Scope is not part of the graph")
+        basic_blocks = cfg.scopes[scope]
+        scope_identifiers = {
+            basic_block.identifier for basic_block in basic_blocks
+        }
+
+    def selected(identifier: int) -> bool:
+        return (
+            scope_identifiers is None or identifier in scope_identifiers
+        ) and (
+            component is None
+            or equivalence_classes.find(identifier) == component
+        )
+
+    for basic_block in basic_blocks:
+        if not selected(basic_block.identifier):
+            continue
+        destinations = sorted(
+            equivalence_classes.successors(basic_block.identifier)
+        )
+        yield basic_block, filter(selected, destinations)
+
+
+def write_dot(
+    cfg: "CFG",
+    output: TextIO,
+    scope: Optional[str] = None,
+    component: Optional[int] = None,
+):
+    """Write a graph in the DOT language of Graphviz, one line at a time
+
+    Args:
+        cfg (CFG): Graph to export
+        output (TextIO): File-like object to write to
+        scope (Optional[str]): Qualified name of the only function or class
+        to export, along with the scopes nested in it
+        component (Optional[int]): Only export the blocks of this
+        equivalence class, as numbered by EquivalenceClasses.find
+
+    Raises:
+        ValueError: If scope is not a function or class of the graph
+    """
+    output.write("digraph CFG {\n    node [shape=box];\n")
+    for basic_block, destinations in _iter_graph(cfg, scope, component):
+        identifier = basic_block.identifier
+        label = _label(*basic_block.line_range)
+        output.write(f'    {identifier} [label="{label}"];\n')
+        for destination in destinations:
+            output.write(f"    {identifier} -> {destination};\n")
+    output.write("}\n")
+
+
+def write_graphml(
+    cfg: "CFG",
+    output: TextIO,
+    scope: Optional[str] = None,
+    component: Optional[int] = None,
+):
+    """Write a graph as GraphML, one element at a time
+
+    Args:
+        cfg (CFG): Graph to export
+        output (TextIO): File-like object to write to
+        scope (Optional[str]): Qualified name of the only function or class
+        to export, along with the scopes nested in it
+        component (Optional[int]): Only export the blocks of this
+        equivalence class, as numbered by EquivalenceClasses.find
+
+    Raises:
+        ValueError: If scope is not a function or class of the graph
+    """
+    output.write(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+        '  <key id="label" for="node" attr.name="label"'
+        ' attr.type="string"/>\n'
+        '  <key id="first_line" for="node" attr.name="first_line"'
+        ' attr.type="int"/>\n'
+        '  <key id="last_line" for="node" attr.name="last_line"'
+        ' attr.type="int"/>\n'
+        '  <graph id="CFG" edgedefault="directed">\n'
+    )
+    for basic_block, destinations in _iter_graph(cfg, scope, component):
+        identifier = quoteattr(str(basic_block.identifier))
+        first_line, last_line = basic_block.line_range
+        label = escape(_label(first_line, last_line))
+        output.write(
+            f"    <node id={identifier}>"
+            f'<data key="label">{label}</data>'
+            f'<data key="first_line">{first_line}</data>'
+            f'<data key="last_line">{last_line}</data>'
+            "</node>\n"
+        )
+        for destination in destinations:
+            target = quoteattr(str(destination))
+            output.write(
+                f"    <edge source={identifier} target={target}/>\n"
+            )
+    output.write("  </graph>\n</graphml>\n")
+
+
+def write_json_lines(
+    cfg: "CFG",
+    output: TextIO,
+    scope: Optional[str] = None,
+    component: Optional[int] = None,
+):
+    """Write a graph as JSON lines: one object per block, followed by one
+    object per edge leaving it
+
+    Blocks are written as {"type": "block", "id", "first_line",
+    "last_line", "label"} and edges as {"type": "edge", "source",
+    "destination"}
+
+    Args:
+        cfg (CFG): Graph to export
+        output (TextIO): File-like object to write to
+        scope (Optional[str]): Qualified name of the only function or class
+        to export, along with the scopes nested in it
+        component (Optional[int]): Only export the blocks of this
+        equivalence class, as numbered by EquivalenceClasses.find
+
+    Raises:
+        ValueError: If scope is not a function or class of the graph
+    """
+    for basic_block, destinations in _iter_graph(cfg, scope, component):
+        identifier = basic_block.identifier
+        first_line, last_line = basic_block.line_range
+        output.write(
+            json.dumps(
+                {
+                    "type": "block",
+                    "id": identifier,
+                    "first_line": first_line,
+                    "last_line": last_line,
+                    "label": _label(first_line, last_line),
+                }
+            )
+        )
+        output.write("\n")
+        for destination in destinations:
+            output.write(
+                json.dumps(
+                    {
+                        "type": "edge",
+                        "source": identifier,
+                        "destination": destination,
+                    }
+                )
+            )
+            output.write("\n")
@@ -1,7 +1,10 @@
-from typing import List, Tuple
+from hashlib import blake2b
+from threading import Lock
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple, Union
 from ast import (
     AST,
     Call,
+    dump,
     Expr,
     AsyncFunctionDef,
     ClassDef,
@@ -13,12 +16,26 @@ from ast import (
     Try,
     ExceptHandler,
 )
-from lazy import lazy
+from .block_body import BlockBody
+from .block_summary import BlockSummary
+from .source_body import SourceBody
+
+if TYPE_CHECKING:
+    from .block_interner import InternedBlock
 
 
 class BasicBlock:
     """A BasicBlock encapsulates a straight line code sequence"""
 
+    __slots__ = (
+        "identifier",
+        "body",
+        "_function_calls",
+        "_summary",
+        "_structural_hash",
+        "_interned",
+    )
+
     invalid_ast_nodes = {
         FunctionDef,
         AsyncFunctionDef,
@@ -31,28 +48,117 @@ class BasicBlock:
         ExceptHandler,
     }
     _next_id = 0
+    _next_id_lock = Lock()
 
     def __init__(
-        self, body: List[AST] = None,
+        self, body: Sequence[AST] = None, identifier: Optional[int] = None,
     ):
-        self.identifier = BasicBlock._next_id
-        BasicBlock._next_id += 1
+        """Instantiate basic block
+
+        Args:
+            body (Sequence[AST]): Statements of the block
+            identifier (Optional[int]): Identifier of the block. Allocated
+            from a process-wide counter when omitted
+        """
+        if identifier is None:
+            with BasicBlock._next_id_lock:
+                identifier = BasicBlock._next_id
+                BasicBlock._next_id += 1
+        self.identifier = identifier
         self.body = body if body is not None else list()
+        self._function_calls = None
+        self._summary: Optional[BlockSummary] = None
+        self._structural_hash: Optional[bytes] = None
+        self._interned: Optional["InternedBlock"] = None
 
     def __hash__(self):
         return self.identifier
 
-    @lazy
+    @property
     def function_calls(self) -> List[Call]:
         """All of the function calls which are a part of the body
 
         Returns:
             (List[Call]): Calls which are a prt of the body
         """
-        return list(
-            filter(lambda ast_node: isinstance(ast_node, Call), self.body)
+        if self._function_calls is None:
+            self._function_calls = list(
+                filter(lambda ast_node: isinstance(ast_node, Call), self.body)
+            )
+        return self._function_calls
+
+    @property
+    def structural_hash(self) -> bytes:
+        """Hash of the statements of the body, leaving out their positions,
+        computed on first access. Blocks with the same statements hash the
+        same in every process running the same Python version
+
+        Returns:
+            (bytes): 16 byte digest of the body
+        """
+        if self._structural_hash is None:
+            digest = blake2b(digest_size=16)
+            for statement in self.body:
+                digest.update(dump(statement).encode())
+                digest.update(b"\n")
+            self._structural_hash = digest.digest()
+        return self._structural_hash
+
+    @property
+    def line_range(self) -> Tuple[int, int]:
+        """First and last line of the body, read without parsing the
+        statements again when the AST was dropped
+
+        Returns:
+            (Tuple[int, int]): First and last line, or 0 when unknown
+        """
+        if isinstance(self.body, SourceBody):
+            return self.body.line_range
+        return (
+            getattr(self.body[0], "lineno", 0),
+            getattr(self.body[-1], "end_lineno", 0),
         )
 
+    @property
+    def statement_kinds(self) -> List[str]:
+        """Node type name of each statement of the body
+
+        Returns:
+            (List[str]): Type names, in order
+        """
+        if isinstance(self.body, SourceBody):
+            return list(self.body.kinds)
+        return [type(statement).__name__ for statement in self.body]
+
+    @property
+    def summary(self) -> BlockSummary:
+        """Names, calls and attributes of the body, collected on first
+        access unless the block was built with summarize set or an
+        identical interned block collected it
+
+        Returns:
+            (BlockSummary): Summary of the body
+        """
+        if self._summary is None:
+            interned = self._interned
+            if interned is None:
+                self._summary = BlockSummary.build_from_body(self.body)
+            else:
+                # Identical blocks collect the same summary, so keep one
+                # with lines counted from the first line of the block
+                first_line = self.line_range[0]
+                if interned.summary is None:
+                    summary = BlockSummary.build_from_body(self.body)
+                    interned.summary = summary.moved(-first_line)
+                self._summary = interned.summary.moved(first_line)
+        return self._summary
+
+    def _summarized(self, summarize: bool) -> "BasicBlock":
+        """Collect the summary of the block right away if requested"""
+        if summarize:
+            self._summary = BlockSummary.build_from_body(self.body)
+        return self
+
     @staticmethod
     def _validate_ast_node(ast: List[any]) -> List[AST]:
         """Ensure that ast_node is an instance of AST"""
@@ -78,12 +184,14 @@ class BasicBlock:
 
     @staticmethod
     def build_first_from_ast(
-        ast: List[AST],
+        ast: List[AST], summarize: bool = False,
     ) -> Tuple["BasicBlock", List[AST]]:
         """Builds the first block from its AST
 
         Args:
             ast (List[AST]): List of AST nodes to parse first basic block from
+            summarize (bool): Collect the summary of the block while its
+            statements are at hand instead of on first access
 
         Returns:
             Tuple[BasicBlock, List[AST]]: The new basic block and the
@@ -96,4 +204,69 @@ class BasicBlock:
         ast = BasicBlock._validate_ast_node(ast)
         body, remaining_nodes = BasicBlock._build_body(ast)
 
-        return BasicBlock(body=body), remaining_nodes
+        return BasicBlock(body=body)._summarized(summarize), remaining_nodes
+
+    @staticmethod
+    def build_from_ast_range(
+        ast: List[AST],
+        start: int = 0,
+        zero_copy: bool = False,
+        identifier: Optional[int] = None,
+        summarize: bool = False,
+    ) -> Tuple["BasicBlock", int]:
+        """Builds the block beginning at index start without copying
+        the remaining nodes
+
+        Args:
+            ast (List[AST]): List of AST nodes to parse the basic block from
+            start (int): Index of the first node of the basic block
+            zero_copy (bool): Give the block a BlockBody view over ast
+            instead of copying its statements into a new list
+            identifier (Optional[int]): Identifier to give the block.
+            Allocated from a process-wide counter when omitted
+            summarize (bool): Collect the summary of the block while its
+            statements are at hand instead of on first access
+
+        Returns:
+            Tuple[BasicBlock, int]: The new basic block and the index of the
+            entrance or exit node that ended it, or len(ast) if the block
+            runs to the end of the list
+
+        Raises:
+            ValueError: If attempting to parse an object that is not
+            an instance of AST
+        """
+        end = BasicBlock._validate_ast_range(ast, start)
+        body = BasicBlock._build_body_range(ast, start, end, zero_copy)
+        return BasicBlock(body, identifier)._summarized(summarize), end
+
+    @staticmethod
+    def _validate_ast_range(ast: List[any], start: int) -> int:
+        """Ensure that the nodes of the block beginning at index start are
+        instances of AST, and find the node ending the block
+
+        Returns:
+            int: Index of the entrance or exit node that ends the block, or
+            len(ast) if the block runs to the end of the list
+        """
+        for i in range(start, len(ast)):
+            ast_node = ast[i]
+            if not isinstance(ast_node, AST):
+                raise ValueError("Invalid AST node provided")
+            if type(ast_node) in BasicBlock.invalid_ast_nodes:
+                return i
+        return len(ast)
+
+    @staticmethod
+    def _build_body_range(
+        ast: List[AST], start: int, end: int, zero_copy: bool
+    ) -> Union[List[AST], BlockBody]:
+        """Build the body of the block made of the nodes from start to end,
+        unwrapping expressions from their Expr nodes
+        """
+        if zero_copy:
+            return BlockBody(ast, start, end)
+        return [
+            ast_node.value if isinstance(ast_node, Expr) else ast_node
+            for ast_node in ast[start:end]
+        ]
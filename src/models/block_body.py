@@ -0,0 +1,68 @@
+from ast import AST, Expr
+from typing import Iterator, List, Sequence, Union
+
+
+class BlockBody(Sequence):
+    """BlockBody is a read-only view of the statements of a basic block
+    that lives inside the statement list of its parent. Statements are
+    unwrapped from Expr nodes on access, exactly like the copied body of a
+    BasicBlock, so the view can be used anywhere a body list is read.
+
+    The view holds on to the parent list, so it reflects any later changes
+    made to that list.
+    """
+
+    __slots__ = ("_parent", "_start", "_end")
+
+    def __init__(self, parent: List[AST], start: int, end: int):
+        """Instantiate view over part of a statement list
+
+        Args:
+            parent (List[AST]): Statement list the block was built from
+            start (int): Index of the first statement of the block
+            end (int): Index just past the last statement of the block
+        """
+        self._parent = parent
+        self._start = start
+        self._end = end
+
+    @property
+    def statements(self) -> List[AST]:
+        """Statements of the block as they are in the parent list, still
+        wrapped in their Expr nodes
+        """
+        return self._parent[self._start : self._end]
+
+    @staticmethod
+    def _unwrap(ast_node: AST) -> AST:
+        return ast_node.value if isinstance(ast_node, Expr) else ast_node
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[AST, List[AST]]:
+        if isinstance(index, slice):
+            return [
+                self[i] for i in range(*index.indices(self._end - self._start))
+            ]
+        if index < 0:
+            index += self._end - self._start
+        if not 0 <= index < self._end - self._start:
+            raise IndexError("BlockBody index out of range")
+        return BlockBody._unwrap(self._parent[self._start + index])
+
+    def __iter__(self) -> Iterator[AST]:
+        parent = self._parent
+        for i in range(self._start, self._end):
+            yield BlockBody._unwrap(parent[i])
+
+    def __eq__(self, value):
+        if not isinstance(value, (BlockBody, list)):
+            return False
+        return len(self) == len(value) and all(
+            node is other_node or node == other_node
+            for node, other_node in zip(self, value)
+        )
+
+    def __repr__(self):
+        return f"BlockBody({list(self)!r})"
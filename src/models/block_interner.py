@@ -0,0 +1,176 @@
+from array import array
+from typing import Any, Callable, Dict, Iterable, Optional
+from weakref import WeakValueDictionary
+from .basic_block import BasicBlock
+from .block_summary import BlockSummary
+from .source_body import SourceBody
+
+
+class _Results(dict):
+    """Per-block analysis results by name, shared by every block with the
+    same statements. Unlike dict, it can be weakly referenced
+    """
+
+
+class InternedBlock:
+    """InternedBlock is what every block with the same statements laid out
+    the same way shares wherever they are: the body when it holds no AST,
+    the summary once collected, and the results memoized for the
+    statements. Lines are counted from the first line of the block, which
+    each block keeps for itself
+    """
+
+    __slots__ = ("body", "summary", "results", "__weakref__")
+
+    def __init__(self, body: Optional[SourceBody], results: Dict[str, Any]):
+        """Instantiate shared contents
+
+        Args:
+            body (Optional[SourceBody]): Standalone body to share, holding
+            only the lines of its statements, if the block holds no AST
+            results (Dict[str, Any]): Results shared with the blocks
+            that only differ in layout
+        """
+        self.body = body
+        self.summary: Optional[BlockSummary] = None
+        self.results = results
+
+
+class BlockInterner:
+    """BlockInterner stores the contents of identical basic blocks once for
+    every graph in a process, such as the blocks of vendored copies of a
+    module or of generated code.
+
+    Blocks are keyed by their structural hash, the kinds of their
+    statements and the positions of the statements relative to the first
+    line of the block, so moved blocks are still found. Blocks keep their
+    own identifiers, edges and first line, and only share bodies built
+    without the AST, since the AST of a graph is patched in place on
+    update. Shared bodies only hold the lines of their own statements
+    rather than the source they were read from. Entries are held weakly,
+    so they are evicted once no block refers to them.
+    """
+
+    def __init__(self):
+        """Instantiate empty table"""
+        self._blocks: WeakValueDictionary = WeakValueDictionary()
+        self._results: WeakValueDictionary = WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    @staticmethod
+    def key(basic_block: BasicBlock) -> bytes:
+        """Get the key of a block in the table
+
+        Args:
+            basic_block (BasicBlock): Block to key
+
+        Returns:
+            bytes: Structural hash of the block, the kinds of its statements,
+            and the line relative to the first line of the block, column,
+            end line and end column of each statement
+        """
+        body = basic_block.body
+        first_line = basic_block.line_range[0]
+        positions = array("i")
+        if isinstance(body, SourceBody):
+            for i in range(len(body)):
+                positions.extend(body.position(i))
+        else:
+            for statement in body:
+                positions.extend(
+                    (
+                        getattr(statement, "lineno", 0),
+                        getattr(statement, "col_offset", 0),
+                        getattr(statement, "end_lineno", 0) or 0,
+                        getattr(statement, "end_col_offset", 0) or 0,
+                    )
+                )
+        for i in range(0, len(positions), 2):
+            positions[i] -= first_line
+        kinds = " ".join(basic_block.statement_kinds).encode()
+        return (
+            basic_block.structural_hash + kinds + b"\0" + positions.tobytes()
+        )
+
+    def intern(self, basic_block: BasicBlock) -> InternedBlock:
+        """Share the contents of a block with the identical blocks interned
+        before it. A block is only interned once
+
+        Args:
+            basic_block (BasicBlock): Block to intern
+
+        Returns:
+            InternedBlock: Contents the block now shares
+        """
+        if basic_block._interned is not None:
+            return basic_block._interned
+        key = BlockInterner.key(basic_block)
+        interned = self._blocks.get(key)
+        body = basic_block.body
+        first_line = basic_block.line_range[0]
+        if interned is None:
+            self.misses += 1
+            structural_hash = basic_block.structural_hash
+            results = self._results.get(structural_hash)
+            if results is None:
+                results = _Results()
+                self._results[structural_hash] = results
+            interned = InternedBlock(
+                body.standalone() if isinstance(body, SourceBody) else None,
+                results,
+            )
+            self._blocks[key] = interned
+        else:
+            self.hits += 1
+        if interned.body is not None and isinstance(body, SourceBody):
+            basic_block.body = interned.body.moved_to(first_line)
+        if basic_block._summary is not None:
+            if interned.summary is None:
+                interned.summary = basic_block._summary.moved(-first_line)
+            basic_block._summary = interned.summary.moved(first_line)
+        basic_block._interned = interned
+        return interned
+
+    def intern_all(self, basic_blocks: Iterable[BasicBlock]) -> int:
+        """Intern every block of a graph, or of any list of blocks
+
+        Args:
+            basic_blocks (Iterable[BasicBlock]): Blocks to intern
+
+        Returns:
+            int: Number of blocks that were found in the table
+        """
+        hits = self.hits
+        for basic_block in basic_blocks:
+            self.intern(basic_block)
+        return self.hits - hits
+
+    def memoize(
+        self,
+        basic_block: BasicBlock,
+        name: str,
+        compute: Callable[[BasicBlock], Any],
+    ) -> Any:
+        """Get a result of a block, computed once for all blocks with the
+        same statements, wherever and however they are laid out. The result
+        must not depend on the positions of the statements or the edges of
+        the block
+
+        Args:
+            basic_block (BasicBlock): Block to get the result of, interned
+            if it is not yet
+            name (str): Name of the result
+            compute (Callable[[BasicBlock], Any]): Computes the result from
+            the first block it is requested for
+
+        Returns:
+            Any: Result shared by the structurally identical blocks
+        """
+        results = self.intern(basic_block).results
+        if name not in results:
+            results[name] = compute(basic_block)
+        return results[name]
@@ -0,0 +1,237 @@
+from sys import intern
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+from ast import (
+    AST,
+    AnnAssign,
+    Assign,
+    AsyncFor,
+    AsyncFunctionDef,
+    Attribute,
+    AugAssign,
+    Call,
+    ClassDef,
+    DictComp,
+    For,
+    FunctionDef,
+    GeneratorExp,
+    Import,
+    ImportFrom,
+    Lambda,
+    ListComp,
+    Load,
+    Name,
+    NamedExpr,
+    SetComp,
+    iter_child_nodes,
+    walk,
+)
+
+
+class BlockSummary:
+    """A BlockSummary holds the names, calls and attributes of the
+    statements of a basic block, collected in a single walk over them so
+    that analyses never need to walk the AST again.
+
+    Names are those of the scope the block belongs to: names local to
+    nested functions, classes, lambdas and comprehensions are left out.
+    Every string is interned, so summaries of many blocks share them.
+    """
+
+    __slots__ = (
+        "calls",
+        "used",
+        "exposed",
+        "defined",
+        "definitions",
+        "attributes",
+    )
+
+    def __init__(
+        self,
+        calls: Tuple[Tuple[str, int], ...] = (),
+        used: Tuple[str, ...] = (),
+        exposed: Tuple[str, ...] = (),
+        defined: Tuple[str, ...] = (),
+        definitions: Tuple[Tuple[int, str], ...] = (),
+        attributes: Tuple[str, ...] = (),
+    ):
+        """Instantiate summary
+
+        Args:
+            calls (Tuple[Tuple[str, int], ...]): Dotted name of the function
+            and line of every call, including nested ones. The name is
+            empty if the function is not a name or attribute of a name
+            used (Tuple[str, ...]): Names read, in the order first read
+            exposed (Tuple[str, ...]): Names read before the block binds
+            them, in the order first read
+            defined (Tuple[str, ...]): Names bound, in the order first bound
+            definitions (Tuple[Tuple[int, str], ...]): Index of the
+            statement and name of every binding, in order
+            attributes (Tuple[str, ...]): Attribute names accessed, in the
+            order first accessed
+        """
+        self.calls = calls
+        self.used = used
+        self.exposed = exposed
+        self.defined = defined
+        self.definitions = definitions
+        self.attributes = attributes
+
+    def __eq__(self, value):
+        if not isinstance(value, BlockSummary):
+            return False
+        return all(
+            getattr(self, slot) == getattr(value, slot)
+            for slot in BlockSummary.__slots__
+        )
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{slot}={getattr(self, slot)!r}"
+            for slot in BlockSummary.__slots__
+        )
+        return f"BlockSummary({fields})"
+
+    def moved(self, line_delta: int) -> "BlockSummary":
+        """Get the summary of the same statements moved by a number of lines
+
+        Args:
+            line_delta (int): Number of lines to add to the line of each call
+
+        Returns:
+            BlockSummary: Summary sharing every field but calls
+        """
+        if line_delta == 0:
+            return self
+        return BlockSummary(
+            tuple((name, line + line_delta) for name, line in self.calls),
+            self.used,
+            self.exposed,
+            self.defined,
+            self.definitions,
+            self.attributes,
+        )
+
+    @staticmethod
+    def build_from_body(body: Iterable[AST]) -> "BlockSummary":
+        """Summarize the statements of a basic block
+
+        Args:
+            body (Iterable[AST]): Statements of the block, unwrapped from
+            Expr nodes
+
+        Returns:
+            BlockSummary: Summary of the statements
+        """
+        calls: List[Tuple[str, int]] = []
+        used: Dict[str, None] = {}
+        exposed: Dict[str, None] = {}
+        defined: Dict[str, None] = {}
+        definitions: List[Tuple[int, str]] = []
+        attributes: Dict[str, None] = {}
+
+        for i, statement in enumerate(body):
+            # (node, names bound by the comprehensions around it)
+            stack: List[Tuple[AST, FrozenSet[str]]] = [
+                (statement, frozenset())
+            ]
+            while len(stack) > 0:
+                node, local = stack.pop()
+                node_type = type(node)
+                if node_type is Name:
+                    name = node.id
+                    if name in local:
+                        continue
+                    name = intern(name)
+                    if isinstance(node.ctx, Load):
+                        used[name] = None
+                        if name not in defined:
+                            exposed[name] = None
+                    else:
+                        defined[name] = None
+                        definitions.append((i, name))
+                    continue
+                if node_type in _scope_types:
+                    name = intern(node.name)
+                    defined[name] = None
+                    definitions.append((i, name))
+                    continue
+                if node_type is Lambda:
+                    continue
+                if node_type is Import or node_type is ImportFrom:
+                    for alias in node.names:
+                        if alias.name == "*":
+                            continue
+                        name = alias.asname or alias.name.split(".")[0]
+                        name = intern(name)
+                        defined[name] = None
+                        definitions.append((i, name))
+                    continue
+                if node_type is Call:
+                    calls.append((_callee_name(node.func), node.lineno))
+                elif node_type is Attribute:
+                    attributes[intern(node.attr)] = None
+                elif node_type is AugAssign:
+                    target = node.target
+                    if type(target) is Name and target.id not in local:
+                        name = intern(target.id)
+                        used[name] = None
+                        if name not in defined:
+                            exposed[name] = None
+                elif node_type in _comprehension_types:
+                    local = local.union(
+                        target.id
+                        for generator in node.generators
+                        for target in walk(generator.target)
+                        if type(target) is Name
+                    )
+
+                fields = _evaluation_order.get(node_type)
+                if fields is None:
+                    children = list(iter_child_nodes(node))
+                else:
+                    children = []
+                    for field in fields:
+                        value = getattr(node, field)
+                        if isinstance(value, list):
+                            children.extend(value)
+                        elif value is not None:
+                            children.append(value)
+                children.reverse()
+                stack.extend((child, local) for child in children)
+
+        return BlockSummary(
+            tuple(calls),
+            tuple(used),
+            tuple(exposed),
+            tuple(defined),
+            tuple(definitions),
+            tuple(attributes),
+        )
+
+
+_scope_types = {FunctionDef, AsyncFunctionDef, ClassDef}
+_comprehension_types = {ListComp, SetComp, DictComp, GeneratorExp}
+# Fields of the nodes whose children are not evaluated in field order
+_evaluation_order = {
+    Assign: ("value", "targets"),
+    AugAssign: ("value", "target"),
+    AnnAssign: ("value", "annotation", "target"),
+    NamedExpr: ("value", "target"),
+    For: ("iter", "target", "body", "orelse"),
+    AsyncFor: ("iter", "target", "body", "orelse"),
+}
+
+
+def _callee_name(func: AST) -> str:
+    """Get the dotted name of a called function, or an empty string if it
+    is not a name or a chain of attributes of a name"""
+    parts: List[str] = []
+    while type(func) is Attribute:
+        parts.append(func.attr)
+        func = func.value
+    if type(func) is not Name:
+        return ""
+    parts.append(func.id)
+    parts.reverse()
+    return intern(".".join(parts))
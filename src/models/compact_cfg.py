@@ -0,0 +1,84 @@
+from array import array
+from typing import Iterator, Tuple
+
+
+class CompactCFG:
+    """CompactCFG is a flat, picklable summary of the control-flow graph of
+    a single file. Blocks are numbered from 0 in the order they were built,
+    and are namespaced by the file they were built from so that summaries
+    from different processes never collide.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        line_ranges: array,
+        edges: array,
+        component_count: int,
+    ):
+        """Instantiate summary from flat arrays
+
+        Args:
+            namespace (str): Name of the file the graph was built from
+            line_ranges (array): First and last line of each block,
+            stored as consecutive pairs
+            edges (array): Source and destination of each edge,
+            stored as consecutive pairs of block numbers
+            component_count (int): Number of equivalence classes
+        """
+        self.namespace = namespace
+        self.line_ranges = line_ranges
+        self.edges = edges
+        self.component_count = component_count
+
+    def __eq__(self, value):
+        if not isinstance(value, CompactCFG):
+            return False
+        return (
+            self.namespace == value.namespace
+            and self.line_ranges == value.line_ranges
+            and self.edges == value.edges
+            and self.component_count == value.component_count
+        )
+
+    @property
+    def block_count(self) -> int:
+        """Number of basic blocks in the graph"""
+        return len(self.line_ranges) // 2
+
+    @property
+    def edge_count(self) -> int:
+        """Number of edges in the graph"""
+        return len(self.edges) // 2
+
+    def identifier(self, block: int) -> Tuple[str, int]:
+        """Get the project-wide identifier of a block
+
+        Args:
+            block (int): Number of the block within this file
+
+        Returns:
+            Tuple[str, int]: The namespace and number of the block
+        """
+        return self.namespace, block
+
+    def lines(self, block: int) -> Tuple[int, int]:
+        """Get the line range covered by a block
+
+        Args:
+            block (int): Number of the block within this file
+
+        Returns:
+            Tuple[int, int]: First and last line of the block
+        """
+        return self.line_ranges[2 * block], self.line_ranges[2 * block + 1]
+
+    def iter_edges(self) -> Iterator[Tuple[int, int]]:
+        """Iterate over the edges of the graph
+
+        Returns:
+            Iterator[Tuple[int, int]]: Source and destination block numbers
+        """
+        edges = self.edges
+        for i in range(0, len(edges), 2):
+            yield edges[i], edges[i + 1]
@@ -0,0 +1,107 @@
+from array import array
+from typing import Dict, FrozenSet, List, Optional
+from .node import Node
+
+
+class CompactGraph:
+    """CompactGraph stores the edges of frozen equivalence classes in
+    contiguous arrays, CSR style. The successors and predecessors of the
+    item at index i are the identifiers between offsets[i] and
+    offsets[i + 1] of the corresponding array.
+    """
+
+    def __init__(
+        self, nodes: List[Optional[Node]], identifiers: Dict[int, int],
+    ):
+        """Instantiate compact graph from per-node edge sets
+
+        Args:
+            nodes (List[Optional[Node]]): Nodes indexed like the items of the
+            equivalence classes, with None for items that were removed
+            identifiers (Dict[int, int]): Index of each integer identifier
+
+        Raises:
+            ValueError: If an identifier does not fit in a C int
+        """
+        self._identifiers = identifiers
+        self._successor_offsets = array("i", [0])
+        self._successors = array("i")
+        self._predecessor_offsets = array("i", [0])
+        self._predecessors = array("i")
+        try:
+            for node in nodes:
+                if node is not None:
+                    self._successors.extend(
+                        sorted(
+                            destination.identifier
+                            for destination in node.destinations
+                        )
+                    )
+                    self._predecessors.extend(
+                        sorted(source.identifier for source in node.sources)
+                    )
+                self._successor_offsets.append(len(self._successors))
+                self._predecessor_offsets.append(len(self._predecessors))
+        except (TypeError, OverflowError):
+            raise ValueError("Compact graphs require C int identifiers")
+
+    @property
+    def edge_count(self) -> int:
+        """Number of edges in the graph"""
+        return len(self._successors)
+
+    def successors(self, identifier: int) -> memoryview:
+        """Get the destinations of every edge leaving an item
+
+        Args:
+            identifier (int): Identifier of the item
+
+        Returns:
+            memoryview: Identifiers of the destinations, without copying
+        """
+        item_idx = self._identifiers[identifier]
+        return memoryview(self._successors)[
+            self._successor_offsets[item_idx] : self._successor_offsets[
+                item_idx + 1
+            ]
+        ]
+
+    def predecessors(self, identifier: int) -> memoryview:
+        """Get the sources of every edge entering an item
+
+        Args:
+            identifier (int): Identifier of the item
+
+        Returns:
+            memoryview: Identifiers of the sources, without copying
+        """
+        item_idx = self._identifiers[identifier]
+        return memoryview(self._predecessors)[
+            self._predecessor_offsets[item_idx] : self._predecessor_offsets[
+                item_idx + 1
+            ]
+        ]
+
+
+class CompactNode(Node):
+    """Read-only Node view over a CompactGraph. Sources and destinations
+    are materialized from the graph arrays on access.
+    """
+
+    def __init__(self, identifier: int, graph: CompactGraph):
+        self.identifier = identifier
+        self._graph = graph
+
+    @property
+    def sources(self) -> FrozenSet["CompactNode"]:
+        return frozenset(
+            CompactNode(source, self._graph)
+            for source in self._graph.predecessors(self.identifier)
+        )
+
+    @property
+    def destinations(self) -> FrozenSet["CompactNode"]:
+        return frozenset(
+            CompactNode(destination, self._graph)
+            for destination in self._graph.successors(self.identifier)
+        )
@@ -1,4 +1,6 @@
-from typing import List, Dict
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from .compact_graph import CompactGraph, CompactNode
 from .node import Node
 
 
@@ -14,6 +16,8 @@ class EquivalenceClasses:
         self._identifiers: Dict[any, int] = {}
         self._sizes = []
         self._count = 0
+        self._graph: Optional[CompactGraph] = None
+        self._version = 0
 
     def __contains__(self, identifier: any):
         return identifier in self._identifiers
@@ -23,6 +27,35 @@ class EquivalenceClasses:
         """Number of unique equivalence classes currently tracked"""
         return self._count
 
+    @property
+    def version(self) -> int:
+        """Number of times identifiers or edges were added or removed, so
+        results computed from the edges can tell when they are stale
+        """
+        return self._version
+
+    @property
+    def frozen(self) -> bool:
+        """Whether the edges have been frozen into a CompactGraph"""
+        return self._graph is not None
+
+    def _check_not_frozen(self):
+        if self._graph is not None:
+            raise ValueError("Frozen equivalence classes cannot be changed")
+
+    def freeze(self):
+        """Move every edge into a CompactGraph and drop the per-node sets.
+        Identifiers and edges can no longer be added or removed afterwards,
+        but classes can still be found and unioned
+
+        Raises:
+            ValueError: If any identifier is not an integer
+        """
+        if self._graph is not None:
+            return
+        self._graph = CompactGraph(self._nodes, self._identifiers)
+        self._nodes = None
+
     def _find_root(self, item_idx: int) -> int:
         """Get the root representing the equivalence class of an item
 
@@ -49,8 +82,9 @@ class EquivalenceClasses:
 
         Raises:
             ValueError: If identifier is already tracked
-            within the equivalence classes
+            within the equivalence classes, or they are frozen
         """
+        self._check_not_frozen()
         if identifier in self._identifiers:
             raise ValueError("Item already exists within EquivalenceClasses")
 
@@ -60,6 +94,7 @@ class EquivalenceClasses:
         self._sizes.append(1)
         self._identifiers[identifier] = new_item_index
         self._count += 1
+        self._version += 1
 
     def find(self, identifier: any) -> int:
         """Get the equivalence class of the given identifier
@@ -74,6 +109,79 @@ class EquivalenceClasses:
         """
         return self._find_root(self._identifiers[identifier])
 
+    def find_many(self, identifiers: Iterable[any]) -> List[int]:
+        """Get the equivalence class of many identifiers at once
+
+        Args:
+            identifiers (Iterable[any]): Identifiers previously added to
+            the equivalence classes. NumPy arrays are accepted
+
+        Returns:
+            List[int]: Number corresponding to the equivalence
+            class of each identifier
+        """
+        if hasattr(identifiers, "tolist"):
+            identifiers = identifiers.tolist()
+        items = self._identifiers
+        roots = self._roots
+        found: List[int] = []
+        for identifier in identifiers:
+            item_idx = items[identifier]
+            while item_idx != roots[item_idx]:
+                roots[item_idx] = roots[roots[item_idx]]
+                item_idx = roots[item_idx]
+            found.append(item_idx)
+        return found
+
+    def union_many(self, pairs: Iterable[Tuple[any, any]]):
+        """Union the equivalence classes of many pairs of items at once.
+        Equivalent to calling union on each pair, without the per-call
+        overhead
+
+        Args:
+            pairs (Iterable[Tuple[any, any]]): Pairs of identifiers tracked
+            by equivalence classes. NumPy arrays of shape (n, 2) are accepted
+
+        Raises:
+            ValueError: If any identifier passed has not been added, or any
+            pair does not hold exactly two identifiers, in which case no
+            pairs are unioned
+        """
+        if hasattr(pairs, "tolist"):
+            pairs = pairs.tolist()
+        index = self._identifiers.__getitem__
+        try:
+            indices = [
+                (index(identifier_one), index(identifier_two))
+                for identifier_one, identifier_two in pairs
+            ]
+        except KeyError:
+            raise ValueError(
+                "Both union identifiers must already exist within"
+                " an equivalence class"
+            )
+        except (TypeError, ValueError):
+            raise ValueError("Each pair must hold exactly two identifiers")
+        roots = self._roots
+        sizes = self._sizes
+        merged = 0
+        for root_one, root_two in indices:
+            while root_one != roots[root_one]:
+                roots[root_one] = roots[roots[root_one]]
+                root_one = roots[root_one]
+            while root_two != roots[root_two]:
+                roots[root_two] = roots[roots[root_two]]
+                root_two = roots[root_two]
+
+            if root_one == root_two:
+                continue
+            if sizes[root_one] < sizes[root_two]:
+                root_one, root_two = root_two, root_one
+            roots[root_two] = root_one
+            sizes[root_one] += sizes[root_two]
+            merged += 1
+        self._count -= merged
+
     def union(self, identifier_one: any, identifier_two: any):
         """Union the equivalence classes containing two items
 
@@ -92,8 +200,18 @@ class EquivalenceClasses:
                 "Both union identifiers must already exist within"
                 " an equivalence class"
             )
-        item_one_idx = self._identifiers[identifier_one]
-        item_two_idx = self._identifiers[identifier_two]
+        self._union_indices(
+            self._identifiers[identifier_one],
+            self._identifiers[identifier_two],
+        )
+
+    def _union_indices(self, item_one_idx: int, item_two_idx: int):
+        """Union the equivalence classes containing two item indices
+
+        Args:
+            item_one_idx (int): Index of the first item
+            item_two_idx (int): Index of the second item
+        """
         root_one = self._find_root(item_one_idx)
         root_two = self._find_root(item_two_idx)
 
@@ -117,13 +235,16 @@ class EquivalenceClasses:
             destination (any): Destination of valid transition
 
         Raises:
-            ValueError: If either identifier passed has not been added
+            ValueError: If either identifier passed has not been added,
+            or the equivalence classes are frozen
         """
+        self._check_not_frozen()
         self.union(source, destination)
         source_node = self.get_node(source)
         destination_node = self.get_node(destination)
         source_node.destinations.add(destination_node)
         destination_node.sources.add(source_node)
+        self._version += 1
 
     def get_node(self, identifier: any) -> Node:
         """Get CFG node
@@ -139,4 +260,127 @@ class EquivalenceClasses:
         """
         if identifier not in self._identifiers:
             raise ValueError("Identifier not tracked by equivalence classes")
+        if self._graph is not None:
+            return CompactNode(identifier, self._graph)
         return self._nodes[self._identifiers[identifier]]
+
+    def successors(self, identifier: any) -> Sequence[any]:
+        """Get the destinations of every edge leaving an identifier
+
+        Args:
+            identifier (any): Identifier of the source
+
+        Raises:
+            ValueError: If identifier is not tracked by EquivalenceClasses
+
+        Returns:
+            Sequence[any]: Identifiers of the destinations. A slice of the
+            compact graph when frozen
+        """
+        if identifier not in self._identifiers:
+            raise ValueError("Identifier not tracked by equivalence classes")
+        if self._graph is not None:
+            return self._graph.successors(identifier)
+        node = self._nodes[self._identifiers[identifier]]
+        return [destination.identifier for destination in node.destinations]
+
+    def predecessors(self, identifier: any) -> Sequence[any]:
+        """Get the sources of every edge entering an identifier
+
+        Args:
+            identifier (any): Identifier of the destination
+
+        Raises:
+            ValueError: If identifier is not tracked by EquivalenceClasses
+
+        Returns:
+            Sequence[any]: Identifiers of the sources. A slice of the
+            compact graph when frozen
+        """
+        if identifier not in self._identifiers:
+            raise ValueError("Identifier not tracked by equivalence classes")
+        if self._graph is not None:
+            return self._graph.predecessors(identifier)
+        node = self._nodes[self._identifiers[identifier]]
+        return [source.identifier for source in node.sources]
+
+    def rewire(
+        self,
+        removed_identifiers: Iterable[any],
+        removed_edges: Iterable[Tuple[any, any]],
+        added_edges: Iterable[Tuple[any, any]],
+    ):
+        """Remove identifiers and edges, then add edges, recomputing only
+        the equivalence classes that were touched. Classes are rebuilt from
+        the edges, so this assumes items were only ever merged by connect
+
+        Args:
+            removed_identifiers (Iterable[any]): Identifiers to stop tracking,
+            along with every edge to or from them
+            removed_edges (Iterable[Tuple[any, any]]): Source and destination
+            of each edge to remove
+            added_edges (Iterable[Tuple[any, any]]): Source and destination
+            of each edge to add
+
+        Raises:
+            ValueError: If any identifier passed has not been added,
+            or the equivalence classes are frozen
+        """
+        self._check_not_frozen()
+        removed_edges = list(removed_edges)
+        added_edges = list(added_edges)
+        try:
+            removed = {self._identifiers[item] for item in removed_identifiers}
+            edges = [
+                (self._identifiers[source], self._identifiers[destination])
+                for source, destination in chain(removed_edges, added_edges)
+            ]
+        except KeyError:
+            raise ValueError("Identifier not tracked by equivalence classes")
+        self._version += 1
+
+        seeds: Set[int] = set(chain.from_iterable(edges))
+        for item_idx in removed:
+            node = self._nodes[item_idx]
+            for neighbor in chain(node.sources, node.destinations):
+                seeds.add(self._identifiers[neighbor.identifier])
+        old_roots = {self._find_root(item_idx) for item_idx in seeds | removed}
+
+        for item_idx in removed:
+            node = self._nodes[item_idx]
+            for neighbor in node.destinations:
+                neighbor.sources.discard(node)
+            for neighbor in node.sources:
+                neighbor.destinations.discard(node)
+            del self._identifiers[node.identifier]
+            self._nodes[item_idx] = None
+        for source, destination in removed_edges:
+            source_node = self.get_node(source)
+            destination_node = self.get_node(destination)
+            source_node.destinations.discard(destination_node)
+            destination_node.sources.discard(source_node)
+        for source, destination in added_edges:
+            source_node = self.get_node(source)
+            destination_node = self.get_node(destination)
+            source_node.destinations.add(destination_node)
+            destination_node.sources.add(source_node)
+
+        members = seeds - removed
+        unvisited = list(members)
+        while len(unvisited) > 0:
+            node = self._nodes[unvisited.pop()]
+            for neighbor in chain(node.sources, node.destinations):
+                neighbor_idx = self._identifiers[neighbor.identifier]
+                if neighbor_idx not in members:
+                    members.add(neighbor_idx)
+                    unvisited.append(neighbor_idx)
+
+        for item_idx in members:
+            self._roots[item_idx] = item_idx
+            self._sizes[item_idx] = 1
+        self._count += len(members) - len(old_roots)
+        for item_idx in members:
+            for neighbor in self._nodes[item_idx].destinations:
+                self._union_indices(
+                    item_idx, self._identifiers[neighbor.identifier]
+                )
@@ -0,0 +1,261 @@
+from array import array
+from ast import AST, Expr, If, increment_lineno, parse
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+
+class SourceText:
+    """SourceText is the source of a program shared by the bodies of its
+    blocks, with the offset of each line found on first use
+    """
+
+    __slots__ = ("text", "_line_starts")
+
+    def __init__(self, text: str):
+        """Instantiate shared source
+
+        Args:
+            text (str): Source of the program
+        """
+        self.text = text
+        self._line_starts: Optional[array] = None
+
+    def lines(self, first_line: int, last_line: int) -> List[str]:
+        """Get a range of lines along with their line endings
+
+        Args:
+            first_line (int): Number of the first line, starting at 1
+            last_line (int): Number of the last line
+
+        Returns:
+            List[str]: Text of each line in the range
+        """
+        if self._line_starts is None:
+            self._line_starts = array("l", [0])
+            for line in self.text.splitlines(keepends=True):
+                self._line_starts.append(self._line_starts[-1] + len(line))
+        starts = self._line_starts
+        last_line = min(last_line, len(starts) - 1)
+        return [
+            self.text[starts[line - 1] : starts[line]]
+            for line in range(first_line, last_line + 1)
+        ]
+
+
+class SourceBody(Sequence):
+    """SourceBody stands in for the statements of a basic block once the
+    AST of the program was dropped. Only the position and kind of each
+    statement are kept, and the statements are parsed again from the
+    source whenever they are read, unwrapped from Expr nodes like the body
+    of any other BasicBlock.
+
+    Every access to the statements parses them anew, so read them once
+    with nodes when several are needed. Bodies may share their source and
+    positions with a standalone body holding the same statements elsewhere,
+    from which they only differ by the number of lines they are moved by.
+    """
+
+    __slots__ = ("_source", "_positions", "kinds", "_line_offset")
+
+    def __init__(
+        self,
+        source: SourceText,
+        positions: array,
+        kinds: Tuple[str, ...],
+        line_offset: int = 0,
+    ):
+        """Instantiate body from the positions of its statements
+
+        Args:
+            source (SourceText): Source of the program
+            positions (array): Line, column, end line and end column of
+            the whole statement list, followed by those of each statement
+            as read from the body
+            kinds (Tuple[str, ...]): Node type name of each statement as
+            read from the body
+            line_offset (int): Number of lines the statements are moved by
+            from where positions puts them in source
+        """
+        self._source = source
+        self._positions = positions
+        self.kinds = kinds
+        self._line_offset = line_offset
+
+    @staticmethod
+    def from_statements(
+        statements: Sequence[AST], source: SourceText
+    ) -> "SourceBody":
+        """Record the positions and kinds of the statements of a block
+
+        Args:
+            statements (Sequence[AST]): Statements of the block as parsed,
+            still wrapped in their Expr nodes
+            source (SourceText): Source the statements were parsed from
+
+        Returns:
+            SourceBody: Body holding no reference to the statements
+        """
+        positions = array("i")
+        if len(statements) > 0:
+            positions.extend(
+                (
+                    statements[0].lineno,
+                    statements[0].col_offset,
+                    statements[-1].end_lineno,
+                    statements[-1].end_col_offset,
+                )
+            )
+        kinds: List[str] = []
+        for statement in statements:
+            node = SourceBody._unwrap(statement)
+            positions.extend(
+                (
+                    node.lineno,
+                    node.col_offset,
+                    node.end_lineno,
+                    node.end_col_offset,
+                )
+            )
+            kinds.append(type(node).__name__)
+        return SourceBody(source, positions, tuple(kinds))
+
+    @staticmethod
+    def _unwrap(ast_node: AST) -> AST:
+        return ast_node.value if isinstance(ast_node, Expr) else ast_node
+
+    def standalone(self) -> "SourceBody":
+        """Copy the body along with only the lines of the source holding
+        its statements, so that it no longer keeps the whole source
+
+        Returns:
+            SourceBody: Body whose source starts at its first line
+        """
+        if len(self.kinds) == 0:
+            return SourceBody(SourceText(""), array("i"), self.kinds)
+        line, _, end_line, _ = self._positions[:4]
+        text = "".join(self._source.lines(line, end_line))
+        positions = array("i", self._positions)
+        for i in range(0, len(positions), 2):
+            positions[i] -= line - 1
+        line_offset = line - 1 + self._line_offset
+        return SourceBody(SourceText(text), positions, self.kinds, line_offset)
+
+    def moved_to(self, line: int) -> "SourceBody":
+        """Get a body sharing the source and positions of this one, with
+        its statements moved
+
+        Args:
+            line (int): Line to move the first statement to
+
+        Returns:
+            SourceBody: Body differing only by its line offset
+        """
+        if len(self.kinds) == 0:
+            return self
+        return SourceBody(
+            self._source,
+            self._positions,
+            self.kinds,
+            line - self._positions[4],
+        )
+
+    @property
+    def line_range(self) -> Tuple[int, int]:
+        """First and last line of the statements, without parsing them"""
+        if len(self.kinds) == 0:
+            return 0, 0
+        return (
+            self._positions[4] + self._line_offset,
+            self._positions[-2] + self._line_offset,
+        )
+
+    def position(self, index: int) -> Tuple[int, int, int, int]:
+        """Get where a statement is in the source, without parsing it
+
+        Args:
+            index (int): Index of the statement in the body
+
+        Returns:
+            Tuple[int, int, int, int]: Line, column, end line and end column
+            of the statement, with columns as UTF-8 byte offsets
+
+        Raises:
+            IndexError: If there is no statement at index
+        """
+        if index < 0:
+            index += len(self.kinds)
+        if not 0 <= index < len(self.kinds):
+            raise IndexError("SourceBody index out of range")
+        offset = 4 * (index + 1)
+        line, column, end_line, end_column = self._positions[
+            offset : offset + 4
+        ]
+        return (
+            line + self._line_offset,
+            column,
+            end_line + self._line_offset,
+            end_column,
+        )
+
+    def nodes(self) -> List[AST]:
+        """Parse the statements again from the source
+
+        Returns:
+            List[AST]: Statements of the block, unwrapped from Expr nodes,
+            with the line numbers and columns they have in the source
+
+        Raises:
+            ValueError: If the source no longer holds the statements
+        """
+        if len(self.kinds) == 0:
+            return []
+        line, column, end_line, end_column = self._positions[:4]
+        lines = [
+            text.encode() for text in self._source.lines(line, end_line)
+        ]
+        if len(lines) != end_line - line + 1:
+            raise ValueError("Source does not hold the statements")
+        lines[-1] = lines[-1][:end_column]
+        # The statements may follow the header of their compound statement
+        # on its line, whose text must not be parsed along with them
+        indent = lines[0][:column]
+        if indent.strip():
+            indent = b" " * column
+        lines[0] = indent + lines[0][column:]
+        text = b"".join(lines)
+        try:
+            if column > 0:
+                # Indented statements only parse inside a block of their own
+                wrapper = parse(b"if 1:\n" + text).body[0]
+                statements = wrapper.body if isinstance(wrapper, If) else []
+                line_offset = line - 2
+            else:
+                statements = parse(text).body
+                line_offset = line - 1
+        except SyntaxError:
+            raise ValueError("Source does not hold the statements")
+        if len(statements) != len(self.kinds):
+            raise ValueError("Source does not hold the statements")
+        nodes = []
+        line_offset += self._line_offset
+        for statement in statements:
+            increment_lineno(statement, line_offset)
+            nodes.append(SourceBody._unwrap(statement))
+        return nodes
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[AST, List[AST]]:
+        if isinstance(index, slice):
+            return self.nodes()[index]
+        if index < 0:
+            index += len(self.kinds)
+        if not 0 <= index < len(self.kinds):
+            raise IndexError("SourceBody index out of range")
+        return self.nodes()[index]
+
+    def __iter__(self) -> Iterator[AST]:
+        return iter(self.nodes())
+
+    def __repr__(self):
+        return f"SourceBody({list(self.kinds)!r})"
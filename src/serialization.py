@@ -0,0 +1,374 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from tempfile import mkstemp
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from src.cfg import CFG
+
+# Magic, format version, flags, block count, edge count, class count,
+# statement count and size of the statement kind names
+_header = struct.Struct("<4s7I")
+_magic = b"PCFG"
+format_version = 1
+# Block identifiers are their positions, so no lookup table is needed
+_dense_identifiers = 1
+
+
+def write_cfg(cfg: "CFG", path: str):
+    """Write a graph to a file in the binary format read by MappedCFG,
+    atomically
+
+    The file starts with a header of little-endian unsigned ints, followed
+    by flat sections of little-endian C ints: block identifiers, first and
+    last line of each block, offsets of each block into the statement
+    kinds, successor offsets and successors, predecessor offsets and
+    predecessors, and the equivalence class of each block. Edges refer to
+    blocks by position. The newline separated statement kind names and
+    one byte per statement indexing them come last.
+
+    Args:
+        cfg (CFG): Graph to write
+        path (str): Path of the file to write
+
+    Raises:
+        ValueError: If an identifier does not fit in a C int
+    """
+    basic_blocks = cfg.basic_blocks
+    equivalence_classes = cfg.equivalence_classes
+    positions = {
+        basic_block.identifier: i for i, basic_block in enumerate(basic_blocks)
+    }
+    try:
+        identifiers = array("i", positions)
+    except OverflowError:
+        raise ValueError("Serialized graphs require C int identifiers")
+    line_ranges = array("i")
+    kind_offsets = array("i", [0])
+    kinds = array("B")
+    kind_numbers: Dict[str, int] = {}
+    successor_offsets = array("i", [0])
+    successors = array("i")
+    predecessor_offsets = array("i", [0])
+    predecessors = array("i")
+    classes = array("i")
+    # Position of the first block of each equivalence class, by root
+    first_positions: Dict[int, int] = {}
+
+    for i, basic_block in enumerate(basic_blocks):
+        identifier = basic_block.identifier
+        line_ranges.extend(basic_block.line_range)
+        for kind in basic_block.statement_kinds:
+            if kind not in kind_numbers:
+                kind_numbers[kind] = len(kind_numbers)
+            kinds.append(kind_numbers[kind])
+        kind_offsets.append(len(kinds))
+        successors.extend(
+            sorted(
+                positions[destination]
+                for destination in equivalence_classes.successors(identifier)
+            )
+        )
+        successor_offsets.append(len(successors))
+        predecessors.extend(
+            sorted(
+                positions[source]
+                for source in equivalence_classes.predecessors(identifier)
+            )
+        )
+        predecessor_offsets.append(len(predecessors))
+        root = equivalence_classes.find(identifier)
+        classes.append(first_positions.setdefault(root, i))
+
+    kind_names = "\n".join(kind_numbers).encode()
+    flags = 0
+    if all(identifier == i for i, identifier in enumerate(identifiers)):
+        flags |= _dense_identifiers
+    sections = [
+        identifiers,
+        line_ranges,
+        kind_offsets,
+        successor_offsets,
+        successors,
+        predecessor_offsets,
+        predecessors,
+        classes,
+    ]
+    if sys.byteorder != "little":
+        for section in sections:
+            section.byteswap()
+
+    descriptor, temporary_path = mkstemp(
+        dir=os.path.dirname(os.path.abspath(path))
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as cfg_file:
+            cfg_file.write(
+                _header.pack(
+                    _magic,
+                    format_version,
+                    flags,
+                    len(basic_blocks),
+                    len(successors),
+                    len(first_positions),
+                    len(kinds),
+                    len(kind_names),
+                )
+            )
+            for section in sections:
+                section.tofile(cfg_file)
+            cfg_file.write(kind_names)
+            kinds.tofile(cfg_file)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+class MappedCFG:
+    """MappedCFG serves a graph written by write_cfg straight from a
+    memory-mapped file. Opening it only reads the header: edges, classes
+    and block metadata are read from the mapping when asked for, so many
+    graphs can be opened at once without deserializing any of them.
+    """
+
+    def __init__(self, path: str):
+        """Open a serialized graph
+
+        Args:
+            path (str): Path of the file written by write_cfg
+
+        Raises:
+            ValueError: If the file is not a serialized graph, was written
+            with another format version, or is truncated
+        """
+        with open(path, "rb") as cfg_file:
+            try:
+                self._mapping = mmap.mmap(
+                    cfg_file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            except ValueError:
+                raise ValueError("File is not a serialized CFG")
+        try:
+            self._open()
+        except BaseException:
+            self._mapping.close()
+            raise
+
+    def _open(self):
+        """Read the header and locate the sections"""
+        if len(self._mapping) < _header.size:
+            raise ValueError("File is not a serialized CFG")
+        (
+            magic,
+            version,
+            flags,
+            self.block_count,
+            self.edge_count,
+            self.component_count,
+            statement_count,
+            kind_names_size,
+        ) = _header.unpack_from(self._mapping)
+        if magic != _magic:
+            raise ValueError("File is not a serialized CFG")
+        if version != format_version:
+            raise ValueError(f"Unsupported CFG format version {version}")
+
+        blocks = self.block_count
+        offset = _header.size
+        sizes = [
+            blocks,
+            2 * blocks,
+            blocks + 1,
+            blocks + 1,
+            self.edge_count,
+            blocks + 1,
+            self.edge_count,
+            blocks,
+        ]
+        end = offset + 4 * sum(sizes) + kind_names_size + statement_count
+        if len(self._mapping) != end:
+            raise ValueError("Serialized CFG is truncated")
+        self._view = view = memoryview(self._mapping)
+        sections: List[Sequence[int]] = []
+        for size in sizes:
+            sections.append(MappedCFG._ints(view[offset : offset + 4 * size]))
+            offset += 4 * size
+        (
+            self.identifiers,
+            self._line_ranges,
+            self._kind_offsets,
+            self._successor_offsets,
+            self._successors,
+            self._predecessor_offsets,
+            self._predecessors,
+            self._classes,
+        ) = sections
+        kind_names = bytes(view[offset : offset + kind_names_size])
+        self._kind_names = kind_names.decode().split("\n")
+        self._kinds = view[offset + kind_names_size : end]
+        self._dense = bool(flags & _dense_identifiers)
+        # Built on first lookup when identifiers are not positions
+        self._positions: Optional[Dict[int, int]] = None
+
+    @staticmethod
+    def _ints(view: memoryview) -> Sequence[int]:
+        """Read a section of little-endian C ints without copying it where
+        the byte order allows"""
+        if sys.byteorder == "little":
+            return view.cast("i")
+        ints = array("i", view)
+        ints.byteswap()
+        return ints
+
+    def __enter__(self) -> "MappedCFG":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Release the mapping. Sequences returned earlier must not be used
+        afterwards
+        """
+        for name in (
+            "identifiers",
+            "_line_ranges",
+            "_kind_offsets",
+            "_successor_offsets",
+            "_successors",
+            "_predecessor_offsets",
+            "_predecessors",
+            "_classes",
+            "_kinds",
+            "_view",
+        ):
+            section = getattr(self, name, None)
+            if isinstance(section, memoryview):
+                section.release()
+        self._mapping.close()
+
+    def _position(self, identifier: int) -> int:
+        """Get the position of a block from its identifier"""
+        if not self._dense:
+            if self._positions is None:
+                self._positions = {
+                    block_identifier: i
+                    for i, block_identifier in enumerate(self.identifiers)
+                }
+            position = self._positions.get(identifier)
+        elif isinstance(identifier, int) and 0 <= identifier < len(
+            self.identifiers
+        ):
+            position = identifier
+        else:
+            position = None
+        if position is None:
+            raise ValueError("Identifier not tracked by serialized CFG")
+        return position
+
+    def successors(self, identifier: int) -> List[int]:
+        """Get the destinations of every edge leaving a block
+
+        Args:
+            identifier (int): Identifier of the source
+
+        Returns:
+            List[int]: Identifiers of the destinations
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        position = self._position(identifier)
+        identifiers = self.identifiers
+        return [
+            identifiers[destination]
+            for destination in self._successors[
+                self._successor_offsets[position] : self._successor_offsets[
+                    position + 1
+                ]
+            ]
+        ]
+
+    def predecessors(self, identifier: int) -> List[int]:
+        """Get the sources of every edge entering a block
+
+        Args:
+            identifier (int): Identifier of the destination
+
+        Returns:
+            List[int]: Identifiers of the sources
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        position = self._position(identifier)
+        identifiers = self.identifiers
+        return [
+            identifiers[source]
+            for source in self._predecessors[
+                self._predecessor_offsets[
+                    position
+                ] : self._predecessor_offsets[position + 1]
+            ]
+        ]
+
+    def find(self, identifier: int) -> int:
+        """Get the equivalence class of a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            int: Number of the class, which is the position of its first
+            block
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        return self._classes[self._position(identifier)]
+
+    def line_range(self, identifier: int) -> Tuple[int, int]:
+        """Get the lines a block spans
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            Tuple[int, int]: First and last line of the block
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        position = self._position(identifier)
+        return (
+            self._line_ranges[2 * position],
+            self._line_ranges[2 * position + 1],
+        )
+
+    def statement_kinds(self, identifier: int) -> List[str]:
+        """Get the kinds of the statements of a block
+
+        Args:
+            identifier (int): Identifier of the block
+
+        Returns:
+            List[str]: AST class name of each statement, unwrapped from
+            Expr nodes like the statements of a BasicBlock
+
+        Raises:
+            ValueError: If the block is not part of the graph
+        """
+        position = self._position(identifier)
+        names = self._kind_names
+        return [
+            names[kind]
+            for kind in self._kinds[
+                self._kind_offsets[position] : self._kind_offsets[
+                    position + 1
+                ]
+            ]
+        ]
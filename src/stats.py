@@ -0,0 +1,113 @@
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
+
+if TYPE_CHECKING:
+    from src.models.equivalence_classes import EquivalenceClasses
+
+
+class BuildStats:
+    """BuildStats records where the time of building a CFG went.
+
+    Phases are timed by wrapping the functions doing their work for the
+    duration of an instrumented build only, so builds without statistics
+    run the same code as before. The union_find phase is spent finding
+    the roots of equivalence classes, and overlaps the link phase that
+    does most of the finding. The build_blocks phase includes validate,
+    spent checking the statements of each block, and build_body, spent
+    gathering them.
+
+    Only full builds are recorded. Scopes rebuilt in place on update or
+    built when they are first looked up leave the statistics of the last
+    full build untouched.
+    """
+
+    def __init__(self):
+        """Instantiate empty statistics"""
+        self.total_seconds = 0.0
+        self.phase_seconds: Dict[str, float] = {}
+        self.phase_calls: Dict[str, int] = {}
+        self.block_count = 0
+        self.edge_count = 0
+        self.component_count = 0
+        self.max_depth = 0
+        self.find_path_total = 0
+        self.find_path_max = 0
+
+    @property
+    def find_path_mean(self) -> float:
+        """Mean number of links followed to find the root of a class"""
+        calls = self.phase_calls.get("union_find", 0)
+        return self.find_path_total / calls if calls > 0 else 0.0
+
+    def timed(self, phase: str, function: Callable) -> Callable:
+        """Wrap a function so that its calls count towards a phase
+
+        Args:
+            phase (str): Name of the phase
+            function (Callable): Function doing the work of the phase
+
+        Returns:
+            Callable: Function recording its calls and wall time
+        """
+        self.phase_seconds.setdefault(phase, 0.0)
+        self.phase_calls.setdefault(phase, 0)
+        phase_seconds = self.phase_seconds
+        phase_calls = self.phase_calls
+
+        def timed_function(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                phase_seconds[phase] += perf_counter() - start
+                phase_calls[phase] += 1
+
+        return timed_function
+
+    def counted_find_root(
+        self, equivalence_classes: "EquivalenceClasses"
+    ) -> Callable[[int], int]:
+        """Wrap the root lookup of equivalence classes so that it counts
+        towards the union_find phase along with its path length
+
+        Args:
+            equivalence_classes (EquivalenceClasses): Classes to measure
+
+        Returns:
+            Callable[[int], int]: Root lookup to install on the classes
+        """
+        find_root = self.timed("union_find", equivalence_classes._find_root)
+        roots: List[int] = equivalence_classes._roots
+
+        def counted(item_idx: int) -> int:
+            length = 0
+            current = item_idx
+            while current != roots[current]:
+                current = roots[current]
+                length += 1
+            self.find_path_total += length
+            if length > self.find_path_max:
+                self.find_path_max = length
+            return find_root(item_idx)
+
+        return counted
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the statistics as plain values, ready to be forwarded to
+        a metrics system or serialized
+
+        Returns:
+            Dict[str, Any]: Every statistic by name
+        """
+        return {
+            "total_seconds": self.total_seconds,
+            "phase_seconds": dict(self.phase_seconds),
+            "phase_calls": dict(self.phase_calls),
+            "block_count": self.block_count,
+            "edge_count": self.edge_count,
+            "component_count": self.component_count,
+            "max_depth": self.max_depth,
+            "find_path_total": self.find_path_total,
+            "find_path_max": self.find_path_max,
+            "find_path_mean": self.find_path_mean,
+        }
@@ -0,0 +1,38 @@
+import unittest
+from src.cfg import CFG
+
+
+class TestBlockGraph(unittest.TestCase):
+    def setUp(self):
+        sample_code = "print('Test')\n"
+        sample_code += "if True:\n"
+        sample_code += "    x = 1\n"
+        sample_code += "else:\n"
+        sample_code += "    x = 2\n"
+        sample_code += "print('Test')\n"
+        self.cfg = CFG.from_source(sample_code)
+        self.graph = self.cfg.block_graph()
+
+    def test_blocks_are_indexed_by_position(self):
+        self.assertEqual(4, len(self.graph))
+        for i, basic_block in enumerate(self.cfg.basic_blocks):
+            self.assertEqual(i, self.graph.index(basic_block.identifier))
+
+    def test_edges_follow_control_flow(self):
+        self.assertEqual([[1, 2], [3], [3], []], self.graph.successors)
+        self.assertEqual([[], [0], [0], [1, 2]], self.graph.predecessors)
+
+    def test_index_errors_if_untracked(self):
+        with self.assertRaises(ValueError):
+            self.graph.index(-1)
+
+    def test_reverse_postorder_covers_cycles(self):
+        sample_code = "while True:\n"
+        sample_code += "    x = 1\n"
+        sample_code += "print('Test')\n"
+        graph = CFG.from_source(sample_code).block_graph()
+        # The loop body only has its own back edge as a predecessor
+        order, roots = graph.depth_first_order()
+        self.assertEqual([0, 1], order)
+        self.assertEqual([0], roots)
+        self.assertEqual([1, 0], graph.reverse_postorder(reverse=True))
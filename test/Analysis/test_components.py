@@ -0,0 +1,45 @@
+import unittest
+from src.cfg import CFG
+
+
+class TestStronglyConnectedComponents(unittest.TestCase):
+    def setUp(self):
+        sample_code = "x = 1\n"
+        sample_code += "while x:\n"
+        sample_code += "    y = 2\n"
+        sample_code += "    while y:\n"
+        sample_code += "        z = 3\n"
+        sample_code += "    w = 4\n"
+        sample_code += "print(x)\n"
+        self.cfg = CFG.from_source(sample_code)
+
+    def test_cycle_forms_one_component(self):
+        components = self.cfg.components()
+        self.assertEqual(3, len(components))
+        cycle = components.component_of(1)
+        self.assertEqual(cycle, components.component_of(2))
+        self.assertEqual(cycle, components.component_of(3))
+        self.assertTrue(components.is_cyclic(cycle))
+        self.assertFalse(components.is_cyclic(components.component_of(0)))
+
+    def test_components_are_reverse_topological(self):
+        components = self.cfg.components()
+        cycle = components.component_of(1)
+        entry = components.component_of(0)
+        exit = components.component_of(4)
+        self.assertLess(cycle, entry)
+        self.assertLess(exit, cycle)
+        condensed = components.condensation()
+        self.assertEqual(sorted([cycle, exit]), sorted(condensed[entry]))
+        self.assertEqual([exit], condensed[cycle])
+
+    def test_untracked_block_errors(self):
+        with self.assertRaises(ValueError):
+            self.cfg.components().component_of(-1)
+
+    def test_long_cycles_do_not_recurse(self):
+        cfg = CFG.from_source(
+            "while x:\n" + "    x = 1\n    if x:\n        y = 2\n" * 2000
+        )
+        self.assertEqual(4000, len(cfg.basic_blocks))
+        self.assertEqual(1, len(cfg.components()))
@@ -0,0 +1,144 @@
+import unittest
+from src.analysis.dataflow import BitVectorDataflow
+from src.cfg import CFG
+
+
+class TestBitVectorDataflow(unittest.TestCase):
+    def setUp(self):
+        sample_code = "a = 1\n"
+        sample_code += "while a:\n"
+        sample_code += "    b = 2\n"
+        sample_code += "c = 3\n"
+        self.cfg = CFG.from_source(sample_code)
+        # Edges are 0 -> 1, 0 -> 2, 1 -> 2 and the back edge 1 -> 1
+        self.graph = self.cfg.block_graph()
+
+    def test_forward_union(self):
+        dataflow = BitVectorDataflow(
+            self.graph, [0b001, 0b010, 0b100], [0] * 3
+        )
+        self.assertEqual([0, 0b011, 0b011], dataflow.entry)
+        self.assertEqual([0b001, 0b011, 0b111], dataflow.exit)
+
+    def test_kill_removes_facts(self):
+        dataflow = BitVectorDataflow(
+            self.graph, [0b001, 0b010, 0b100], [0, 0b001, 0]
+        )
+        self.assertEqual(0b011, dataflow.at_entry(1))
+        self.assertEqual(0b010, dataflow.at_exit(1))
+
+    def test_backward_union(self):
+        dataflow = BitVectorDataflow(
+            self.graph, [0b001, 0b010, 0b100], [0] * 3, forward=False
+        )
+        self.assertEqual([0b111, 0b110, 0b100], dataflow.entry)
+        self.assertEqual([0b110, 0b110, 0], dataflow.exit)
+
+    def test_forward_intersection(self):
+        dataflow = BitVectorDataflow(
+            self.graph,
+            [0b011, 0b100, 0b001],
+            [0] * 3,
+            intersect=True,
+            universe=0b111,
+        )
+        # Facts from 0 survive the back edge into 1
+        self.assertEqual(0b011, dataflow.at_entry(1))
+        self.assertEqual(0b111, dataflow.at_exit(1))
+        self.assertEqual(0b011, dataflow.at_entry(2))
+
+    def test_unknown_block(self):
+        dataflow = BitVectorDataflow(self.graph, [0] * 3, [0] * 3)
+        self.assertRaises(ValueError, dataflow.at_entry, 7)
+
+
+class TestLiveness(unittest.TestCase):
+    def setUp(self):
+        sample_code = "x = 1\n"
+        sample_code += "if x:\n"
+        sample_code += "    y = x + z\n"
+        sample_code += "    z = 2\n"
+        sample_code += "print(y)\n"
+        self.cfg = CFG.from_source(sample_code)
+        # Edges are 0 -> 1, 0 -> 2 and 1 -> 2
+        self.liveness = self.cfg.liveness()
+
+    def test_live_variables(self):
+        self.assertEqual(["print", "y", "z"], self.liveness.live_in(0))
+        self.assertEqual(["print", "x", "y", "z"], self.liveness.live_out(0))
+        self.assertEqual(["print", "x", "z"], self.liveness.live_in(1))
+        # y is bound in the branch and read after it
+        self.assertEqual(["print", "y"], self.liveness.live_out(1))
+        self.assertEqual(["print", "y"], self.liveness.live_in(2))
+        self.assertEqual([], self.liveness.live_out(2))
+
+    def test_variables_stay_live_around_loops(self):
+        cfg = CFG.from_source("i = 0\nwhile i:\n    i = i - 1\nprint(i)\n")
+        liveness = cfg.liveness()
+        self.assertEqual(["i", "print"], liveness.live_out(0))
+        self.assertEqual(["i", "print"], liveness.live_in(1))
+        self.assertEqual(["i", "print"], liveness.live_out(1))
+
+    def test_nested_scopes_are_ignored(self):
+        cfg = CFG.from_source(
+            "with open(f) as g:\n"
+            "    total = sum(v for v in g)\n"
+            "    key = lambda w: w\n"
+        )
+        liveness = cfg.liveness()
+        self.assertEqual(["f", "open", "sum"], liveness.live_in(0))
+
+    def test_augmented_assignment_reads_target(self):
+        cfg = CFG.from_source("n += 1\n")
+        self.assertEqual(["n"], cfg.liveness().live_in(0))
+
+    def test_reads_before_binds_within_statement(self):
+        cfg = CFG.from_source("x = x + 1\n")
+        self.assertEqual(["x"], cfg.liveness().live_in(0))
+
+    def test_liveness_is_memoized(self):
+        self.assertIs(self.liveness, self.cfg.liveness())
+
+
+class TestReachingDefinitions(unittest.TestCase):
+    def setUp(self):
+        sample_code = "x = 1\n"
+        sample_code += "import os.path\n"
+        sample_code += "if x:\n"
+        sample_code += "    x = 2\n"
+        sample_code += "    x = 3\n"
+        sample_code += "print(x)\n"
+        self.cfg = CFG.from_source(sample_code)
+        # Edges are 0 -> 1, 0 -> 2 and 1 -> 2
+        self.reaching = self.cfg.reaching_definitions()
+
+    def test_definitions(self):
+        self.assertEqual(
+            [(0, 0, "x"), (0, 1, "os"), (1, 0, "x"), (1, 1, "x")],
+            self.reaching.definitions,
+        )
+
+    def test_reaching_definitions(self):
+        self.assertEqual([], self.reaching.reach_in(0))
+        self.assertEqual(
+            [(0, 0, "x"), (0, 1, "os")], self.reaching.reach_in(1)
+        )
+        # Only the last definition of x in the block survives it
+        self.assertEqual(
+            [(0, 1, "os"), (1, 1, "x")], self.reaching.reach_out(1)
+        )
+        # Both branches join after the if
+        self.assertEqual(
+            [(0, 0, "x"), (0, 1, "os"), (1, 1, "x")],
+            self.reaching.reach_in(2),
+        )
+        self.assertEqual(self.reaching.reach_in(2), self.reaching.reach_out(2))
+
+    def test_definitions_reach_around_loops(self):
+        cfg = CFG.from_source("i = 0\nwhile i:\n    i = i - 1\nprint(i)\n")
+        reaching = cfg.reaching_definitions()
+        self.assertEqual([(0, 0, "i"), (1, 0, "i")], reaching.reach_in(1))
+        self.assertEqual([(0, 0, "i"), (1, 0, "i")], reaching.reach_in(2))
+
+    def test_reaching_definitions_are_memoized(self):
+        self.assertIs(self.reaching, self.cfg.reaching_definitions())
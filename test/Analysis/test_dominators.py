@@ -0,0 +1,88 @@
+import unittest
+from src.cfg import CFG
+
+
+class TestDominatorTree(unittest.TestCase):
+    def setUp(self):
+        sample_code = "x = 1\n"
+        sample_code += "if x:\n"
+        sample_code += "    y = 2\n"
+        sample_code += "    while y:\n"
+        sample_code += "        z = 3\n"
+        sample_code += "    w = 4\n"
+        sample_code += "print(x)\n"
+        self.cfg = CFG.from_source(sample_code)
+
+    def test_entries_have_no_immediate_dominator(self):
+        dominators = self.cfg.dominators()
+        self.assertEqual(
+            [None, 0, 1, 1, 0],
+            [
+                dominators.immediate_dominator(identifier)
+                for identifier in range(5)
+            ],
+        )
+        self.assertEqual([0], dominators.children(None))
+
+    def test_single_predecessor_is_immediate_dominator(self):
+        sample_code = "print('Test')\n"
+        sample_code += "if True:\n"
+        sample_code += "    x = 1\n"
+        sample_code += "else:\n"
+        sample_code += "    x = 2\n"
+        sample_code += "print('Test')\n"
+        dominators = CFG.from_source(sample_code).dominators()
+        self.assertEqual(0, dominators.immediate_dominator(2))
+        self.assertEqual([1, 2, 3], sorted(dominators.children(0)))
+        self.assertTrue(dominators.dominates(0, 3))
+        self.assertFalse(dominators.dominates(1, 3))
+
+    def test_entry_dominates_block_after_if(self):
+        sample_code = "x = 1\n"
+        sample_code += "if x:\n"
+        sample_code += "    y = 2\n"
+        sample_code += "print(y)\n"
+        cfg = CFG.from_source(sample_code)
+        dominators = cfg.dominators()
+        self.assertEqual(0, dominators.immediate_dominator(2))
+        self.assertTrue(dominators.dominates(0, 2))
+        self.assertFalse(dominators.dominates(1, 2))
+        post_dominators = cfg.dominators(post=True)
+        self.assertEqual(2, post_dominators.immediate_dominator(0))
+
+    def test_post_dominators_follow_edges_backwards(self):
+        post_dominators = self.cfg.dominators(post=True)
+        self.assertTrue(post_dominators.post)
+        self.assertEqual(
+            [4, 3, 3, 4, None],
+            [
+                post_dominators.immediate_dominator(identifier)
+                for identifier in range(5)
+            ],
+        )
+        self.assertTrue(post_dominators.dominates(4, 0))
+        self.assertTrue(post_dominators.dominates(3, 2))
+        self.assertFalse(post_dominators.dominates(3, 0))
+
+    def test_blocks_dominate_themselves(self):
+        dominators = self.cfg.dominators()
+        for identifier in range(5):
+            self.assertTrue(dominators.dominates(identifier, identifier))
+
+    def test_untracked_block_errors(self):
+        with self.assertRaises(ValueError):
+            self.cfg.dominators().immediate_dominator(-1)
+
+    def test_large_graphs_do_not_recurse(self):
+        sample_code = "x = 1\nif x:\n    y = 2\n" * 5000
+        cfg = CFG.from_source(sample_code)
+        dominators = cfg.dominators()
+        post_dominators = cfg.dominators(post=True)
+        for identifier in range(2, 10000, 2):
+            self.assertEqual(
+                identifier - 2, dominators.immediate_dominator(identifier)
+            )
+            self.assertEqual(
+                identifier, post_dominators.immediate_dominator(identifier - 1)
+            )
+        self.assertIsNone(post_dominators.immediate_dominator(9999))
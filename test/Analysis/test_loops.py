@@ -0,0 +1,97 @@
+import unittest
+from src.cfg import CFG
+
+
+class TestLoopForest(unittest.TestCase):
+    def setUp(self):
+        sample_code = "x = 1\n"
+        sample_code += "while x:\n"
+        sample_code += "    y = 2\n"
+        sample_code += "    for z in y:\n"
+        sample_code += "        print(z)\n"
+        sample_code += "    w = 4\n"
+        sample_code += "print(x)\n"
+        self.sample_code = sample_code
+        self.cfg = CFG.from_source(sample_code)
+
+    def test_else_clauses_are_not_part_of_loops(self):
+        sample_code = "for x in y:\n"
+        sample_code += "    print(x)\n"
+        sample_code += "else:\n"
+        sample_code += "    z = 1\n"
+        sample_code += "print(z)\n"
+        loops = CFG.from_source(sample_code).loops()
+        (loop,) = loops.loops
+        self.assertEqual([0], loop.blocks)
+        self.assertEqual([(0, 0)], loop.back_edges)
+        self.assertEqual(0, loops.depth(1))
+
+    def test_loops_follow_update(self):
+        sample_code = "def f():\n"
+        sample_code += "    for x in y:\n"
+        sample_code += "        print(x)\n"
+        sample_code += "    z = 1\n"
+        cfg = CFG.from_source(sample_code)
+        cfg.update(sample_code.replace("z = 1", "while z:\n        z -= 1"))
+        loops = cfg.loops()
+        self.assertEqual(2, len(loops.roots))
+        depths = [loops.depth(block.identifier) for block in cfg.scopes["f"]]
+        self.assertEqual([1, 1], depths)
+
+    def test_functions_in_loops_are_not_part_of_them(self):
+        sample_code = "for i in x:\n"
+        sample_code += "    a = 1\n"
+        sample_code += "    def f():\n"
+        sample_code += "        b = 2\n"
+        sample_code += "        while b:\n"
+        sample_code += "            c = 3\n"
+        cfg = CFG.from_source(sample_code)
+        loops = cfg.loops()
+        self.assertEqual(2, len(loops.roots))
+        outer, inner = loops.roots
+        self.assertEqual([0], outer.blocks)
+        self.assertEqual([], outer.children)
+        self.assertIsNone(inner.parent)
+        self.assertEqual(
+            [1, 0, 1], [loops.depth(identifier) for identifier in range(3)]
+        )
+        edited_code = sample_code.replace("c = 3", "c = 3\n            d = 4")
+        cfg.update(edited_code)
+        loops = cfg.loops()
+        self.assertEqual(
+            [1, 0, 1],
+            [loops.depth(block.identifier) for block in cfg.basic_blocks],
+        )
+
+    def test_loops_are_nested(self):
+        loops = self.cfg.loops()
+        self.assertEqual(2, len(loops.loops))
+        (outer,) = loops.roots
+        (inner,) = outer.children
+        self.assertIs(outer, inner.parent)
+        self.assertEqual([1, 2, 3], outer.blocks)
+        self.assertEqual([2], inner.blocks)
+        self.assertEqual(2, inner.depth)
+
+    def test_headers_and_back_edges(self):
+        loops = self.cfg.loops()
+        (outer,) = loops.roots
+        (inner,) = outer.children
+        self.assertEqual([1], outer.headers)
+        self.assertEqual([(3, 1)], outer.back_edges)
+        self.assertEqual([2], inner.headers)
+        self.assertEqual([(2, 2)], inner.back_edges)
+        self.assertTrue(loops.is_header(2))
+        self.assertFalse(loops.is_header(3))
+        self.assertEqual([(3, 1), (2, 2)], loops.back_edges)
+
+    def test_depth_per_block(self):
+        loops = self.cfg.loops()
+        self.assertEqual(
+            [0, 1, 2, 1, 0],
+            [loops.depth(identifier) for identifier in range(5)],
+        )
+        self.assertIsNone(loops.loop_of(0))
+
+    def test_loops_are_memoized(self):
+        self.assertIs(self.cfg.loops(), self.cfg.loops())
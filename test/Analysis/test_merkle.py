@@ -0,0 +1,126 @@
+import unittest
+from src.cfg import CFG
+
+
+class TestMerkleTree(unittest.TestCase):
+    def setUp(self):
+        self.sample_code = "x = 1\n"
+        self.sample_code += "def test_func(a):\n"
+        self.sample_code += "    if a:\n"
+        self.sample_code += "        b = 1\n"
+        self.sample_code += "    print(a)\n"
+        self.sample_code += "class TestClass:\n"
+        self.sample_code += "    def test_method(self):\n"
+        self.sample_code += "        while True:\n"
+        self.sample_code += "            z = 3\n"
+        self.sample_code += "print(x)\n"
+        self.cfg = CFG.from_source(self.sample_code)
+
+    def test_structural_hash_ignores_positions(self):
+        cfg = CFG.from_source("y = f(1)\nif x:\n    y = f(1)\ny = f(2)\n")
+        moved, nested, changed = cfg.basic_blocks
+        self.assertEqual(nested.structural_hash, moved.structural_hash)
+        self.assertNotEqual(moved.structural_hash, changed.structural_hash)
+        self.assertEqual(16, len(changed.structural_hash))
+
+    def test_scopes_are_nested(self):
+        tree = self.cfg.merkle_tree()
+        self.assertEqual(["test_func", "TestClass"], tree.children[""])
+        self.assertEqual(
+            ["TestClass.test_method"], tree.children["TestClass"]
+        )
+        self.assertEqual([0, 4], tree.own_blocks(""))
+        self.assertEqual((1, 3), tree.ranges["test_func"])
+        self.assertIs(tree, self.cfg.merkle_tree())
+
+    def test_hashes_follow_changes(self):
+        tree = self.cfg.merkle_tree()
+        moved = CFG.from_source("\n\n" + self.sample_code).merkle_tree()
+        self.assertEqual(tree.hashes, moved.hashes)
+        edited = CFG.from_source(
+            self.sample_code.replace("z = 3", "z = 4")
+        ).merkle_tree()
+        self.assertEqual(tree.hashes["test_func"], edited.hashes["test_func"])
+        for name in ["TestClass.test_method", "TestClass", ""]:
+            self.assertNotEqual(tree.hashes[name], edited.hashes[name])
+
+    def test_renamed_scope_changes_parent(self):
+        renamed = CFG.from_source(
+            self.sample_code.replace("test_method", "other_method")
+        ).merkle_tree()
+        tree = self.cfg.merkle_tree()
+        self.assertNotEqual(
+            tree.hashes["TestClass"], renamed.hashes["TestClass"]
+        )
+
+
+class TestCFGDiff(unittest.TestCase):
+    def setUp(self):
+        self.sample_code = "x = 1\n"
+        self.sample_code += "def test_func(a):\n"
+        self.sample_code += "    if a:\n"
+        self.sample_code += "        b = 1\n"
+        self.sample_code += "    print(a)\n"
+        self.sample_code += "print(x)\n"
+        self.cfg = CFG.from_source(self.sample_code)
+
+    def test_same_graph_has_no_changes(self):
+        diff = self.cfg.diff(CFG.from_source("\n" + self.sample_code))
+        self.assertFalse(diff)
+        self.assertEqual([], diff.changed)
+
+    def test_changed_block(self):
+        other = CFG.from_source(self.sample_code.replace("b = 1", "b = 2"))
+        diff = self.cfg.diff(other)
+        self.assertEqual(
+            [(self.cfg.basic_blocks[1], other.basic_blocks[1])], diff.changed
+        )
+        self.assertEqual([], diff.added)
+        self.assertEqual([], diff.removed)
+        self.assertEqual([], diff.added_edges)
+        self.assertEqual([], diff.removed_edges)
+
+    def test_added_and_removed_blocks(self):
+        other = CFG.from_source(self.sample_code + "while x:\n    y = 3\n")
+        diff = self.cfg.diff(other)
+        self.assertEqual([], diff.changed)
+        self.assertEqual([other.basic_blocks[4]], diff.added)
+        self.assertEqual([(3, 4), (4, 4)], diff.added_edges)
+        reverse = other.diff(self.cfg)
+        self.assertEqual([other.basic_blocks[4]], reverse.removed)
+        self.assertEqual([(3, 4), (4, 4)], reverse.removed_edges)
+
+    def test_edges_are_compared(self):
+        # Blocks after the new one moved, but kept their edges
+        other = CFG.from_source("if x:\n    y = 2\n" + self.sample_code)
+        diff = self.cfg.diff(other)
+        self.assertEqual([other.basic_blocks[0]], diff.added)
+        self.assertEqual([(0, 1)], diff.added_edges)
+        self.assertEqual([], diff.removed_edges)
+
+    def test_added_scope(self):
+        other = CFG.from_source(
+            self.sample_code + "def other_func():\n    y = 2\n"
+        )
+        diff = self.cfg.diff(other)
+        self.assertEqual([], diff.changed)
+        self.assertEqual([other.basic_blocks[4]], diff.added)
+        # Function bodies are not entered from the module
+        self.assertEqual([], diff.added_edges)
+        self.assertEqual([], diff.removed_edges)
+
+    def test_lazy_graph_matches_eager_graph(self):
+        sample_code = "def f(x):\n    a = 1\n    return a\n"
+        sample_code += "def f(x, y):\n    b = 2\n    return b\n"
+        lazy_cfg = CFG.from_source(sample_code, lazy=True)
+        diff = CFG.from_source(sample_code).diff(lazy_cfg)
+        self.assertFalse(diff)
+        self.assertEqual(2, len(lazy_cfg.basic_blocks))
+
+    def test_graphs_without_ast(self):
+        edited_code = self.sample_code.replace("b = 1", "b = 2")
+        diff = CFG.from_source(self.sample_code, retain_ast=False).diff(
+            CFG.from_source(edited_code, retain_ast=False)
+        )
+        self.assertEqual(1, len(diff.changed))
+        self.assertEqual([], diff.added + diff.removed)
@@ -0,0 +1,78 @@
+import unittest
+from src.cfg import CFG
+
+
+class TestReachabilityIndex(unittest.TestCase):
+    def setUp(self):
+        sample_code = "x = 1\n"
+        sample_code += "if x:\n"
+        sample_code += "    y = 2\n"
+        sample_code += "    while y:\n"
+        sample_code += "        z = 3\n"
+        sample_code += "    w = 4\n"
+        sample_code += "print(x)\n"
+        self.cfg = CFG.from_source(sample_code)
+        # Edges are 0 -> 1, 0 -> 4, 1 -> 2, 1 -> 3, 2 -> 2, 2 -> 3 and 3 -> 4
+        self.reachable = {0: {0, 1, 2, 3, 4}, 1: {1, 2, 3, 4}}
+        self.reachable.update({2: {2, 3, 4}, 3: {3, 4}, 4: {4}})
+
+    def check(self, reachability):
+        for source in range(5):
+            for destination in range(5):
+                self.assertEqual(
+                    destination in self.reachable[source],
+                    reachability.can_reach(source, destination),
+                )
+            self.assertEqual(
+                sorted(self.reachable[source]),
+                reachability.reachable(source),
+            )
+
+    def test_closure_answers_queries(self):
+        reachability = self.cfg.reachability()
+        self.assertTrue(reachability.stores_closure)
+        self.check(reachability)
+
+    def test_search_answers_queries(self):
+        reachability = self.cfg.reachability(max_closure_bytes=0)
+        self.assertFalse(reachability.stores_closure)
+        self.check(reachability)
+
+    def test_bulk_queries(self):
+        pairs = [(0, 2), (2, 0), (2, 3), (4, 1)]
+        for max_closure_bytes in [None, 0]:
+            reachability = self.cfg.reachability(max_closure_bytes)
+            self.assertEqual(
+                [True, False, True, False],
+                reachability.can_reach_many(pairs),
+            )
+
+    def test_straight_line_successors_are_reachable(self):
+        sample_code = "x = 1\n"
+        sample_code += "if x:\n"
+        sample_code += "    y = 2\n"
+        sample_code += "print(y)\n"
+        cfg = CFG.from_source(sample_code)
+        for max_closure_bytes in [None, 0]:
+            reachability = cfg.reachability(max_closure_bytes)
+            self.assertTrue(reachability.can_reach(0, 2))
+            self.assertTrue(reachability.can_reach(1, 2))
+            self.assertFalse(reachability.can_reach(2, 1))
+            self.assertFalse(reachability.can_reach(2, 0))
+            self.assertEqual([0, 1, 2], reachability.reachable(0))
+
+    def test_cycles_reach_each_other(self):
+        sample_code = "while x:\n"
+        sample_code += "    y = 1\n"
+        sample_code += "    if y:\n"
+        sample_code += "        z = 2\n"
+        sample_code += "print(x)\n"
+        reachability = CFG.from_source(sample_code).reachability()
+        self.assertTrue(reachability.can_reach(0, 1))
+        self.assertTrue(reachability.can_reach(1, 0))
+        self.assertTrue(reachability.can_reach(1, 2))
+        self.assertFalse(reachability.can_reach(2, 0))
+
+    def test_untracked_block_errors(self):
+        with self.assertRaises(ValueError):
+            self.cfg.reachability().can_reach(0, -1)
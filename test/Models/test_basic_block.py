@@ -1,5 +1,6 @@
 import unittest
 from src.models.basic_block import BasicBlock
+from src.models.block_body import BlockBody
 from ast import Expr, parse, Call, Constant, While
 
 
@@ -10,6 +11,11 @@ class TestBasicBlockFromAst(unittest.TestCase):
         basic_block = BasicBlock()
         self.assertEqual(basic_block_id + 1, basic_block.identifier)
 
+    def test_given_identifier_does_not_advance_counter(self):
+        basic_block_id = BasicBlock().identifier
+        self.assertEqual(7, BasicBlock(identifier=7).identifier)
+        self.assertEqual(basic_block_id + 1, BasicBlock().identifier)
+
     def test_basic_blocks_are_hashable_by_identifier(self):
         test_set = set()
         basic_block = BasicBlock()
@@ -169,3 +175,52 @@ class TestBasicBlockIgnoresEntrancesAndExits(unittest.TestCase):
             module.body
         )
         self.assertIsInstance(remaining_nodes[0], While)
+
+
+class TestBasicBlockFromAstRange(unittest.TestCase):
+    def test_build_from_range_returns_end_index(self):
+        sample_code = "print('Test')\n"
+        sample_code += "while True:\n"
+        sample_code += "    print(i)\n"
+        sample_code += "print('Test')\n"
+
+        module = parse(sample_code)
+        (basic_block, end,) = BasicBlock.build_from_ast_range(module.body)
+        self.assertEqual(len(basic_block.body), 1)
+        self.assertEqual(end, 1)
+        self.assertIsInstance(module.body[end], While)
+
+    def test_build_from_range_starts_at_cursor(self):
+        sample_code = "print('Test')\n"
+        sample_code += "while True:\n"
+        sample_code += "    print(i)\n"
+        sample_code += "x = 1\n"
+        sample_code += "print('Test')\n"
+
+        module = parse(sample_code)
+        (basic_block, end,) = BasicBlock.build_from_ast_range(module.body, 2)
+        self.assertEqual(len(basic_block.body), 2)
+        self.assertEqual(end, len(module.body))
+
+    def test_build_from_range_errors_with_non_ast(self):
+        with self.assertRaises(ValueError):
+            BasicBlock.build_from_ast_range([Expr(Constant()), None])
+
+    def test_build_from_range_zero_copy(self):
+        sample_code = "print('Test')\n"
+        sample_code += "x = f(1)\n"
+        sample_code += "while True:\n"
+        sample_code += "    print(i)\n"
+
+        module = parse(sample_code)
+        (copied_block, copied_end,) = BasicBlock.build_from_ast_range(
+            module.body
+        )
+        (basic_block, end,) = BasicBlock.build_from_ast_range(
+            module.body, zero_copy=True
+        )
+        self.assertIsInstance(basic_block.body, BlockBody)
+        self.assertEqual(copied_end, end)
+        self.assertEqual(copied_block.body, basic_block.body)
+        self.assertEqual(len(basic_block.function_calls), 1)
+        self.assertIs(basic_block.function_calls[0], module.body[0].value)
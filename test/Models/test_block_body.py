@@ -0,0 +1,36 @@
+import unittest
+from ast import Call, parse
+from src.models.block_body import BlockBody
+
+
+class TestBlockBody(unittest.TestCase):
+    def setUp(self):
+        sample_code = "print('Test')\n"
+        sample_code += "x = 1\n"
+        sample_code += "print(x)\n"
+        sample_code += "y = 2\n"
+        self.statements = parse(sample_code).body
+        self.block_body = BlockBody(self.statements, 1, 3)
+
+    def test_view_covers_range(self):
+        self.assertEqual(len(self.block_body), 2)
+        self.assertIs(self.block_body[0], self.statements[1])
+        self.assertIs(self.block_body[-1], self.statements[2].value)
+
+    def test_view_unwraps_expressions(self):
+        self.assertIsInstance(self.block_body[1], Call)
+        self.assertEqual(
+            [self.statements[1], self.statements[2].value],
+            list(self.block_body),
+        )
+
+    def test_view_index_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.block_body[2]
+        self.assertEqual([], BlockBody(self.statements, 4, 4)[:])
+
+    def test_view_equals_copied_body(self):
+        copied_body = [self.statements[1], self.statements[2].value]
+        self.assertEqual(copied_body, self.block_body)
+        self.assertEqual(copied_body[1:], self.block_body[1:])
+        self.assertNotEqual(copied_body[:1], self.block_body)
@@ -0,0 +1,107 @@
+import gc
+import unittest
+from src.cfg import CFG
+from src.models.block_interner import BlockInterner
+
+
+class TestBlockInterner(unittest.TestCase):
+    def setUp(self):
+        self.sample_code = "x = 1\n"
+        self.sample_code += "def test_func(a):\n"
+        self.sample_code += "    if a:\n"
+        self.sample_code += "        print(a)\n"
+        self.sample_code += "    y = a\n"
+        self.sample_code += "print(x)\n"
+        self.interner = BlockInterner()
+
+    def test_identical_blocks_share_contents(self):
+        cfg = CFG.from_source(self.sample_code, retain_ast=False)
+        copy = CFG.from_source(self.sample_code, retain_ast=False)
+        self.assertEqual(0, self.interner.intern_all(cfg.basic_blocks))
+        self.assertEqual(4, self.interner.intern_all(copy.basic_blocks))
+        self.assertEqual(4, len(self.interner))
+        for basic_block, copied_block in zip(
+            cfg.basic_blocks, copy.basic_blocks
+        ):
+            self.assertIs(basic_block.body._source, copied_block.body._source)
+            self.assertIs(
+                basic_block.summary.used, copied_block.summary.used
+            )
+        self.assertEqual(
+            cfg.block_graph().successors, copy.block_graph().successors
+        )
+
+    def test_shared_bodies_only_hold_their_lines(self):
+        cfg = CFG.from_source(self.sample_code, retain_ast=False)
+        self.interner.intern_all(cfg.basic_blocks)
+        body = cfg.basic_blocks[1].body
+        self.assertEqual("        print(a)\n", body._source.text)
+        self.assertEqual((4, 4), body.line_range)
+        self.assertEqual(4, body[0].lineno)
+
+    def test_blocks_with_ast_only_share_summaries(self):
+        cfg = CFG.from_source(self.sample_code)
+        copy = CFG.from_source(self.sample_code, summarize=True)
+        self.interner.intern_all(cfg.basic_blocks)
+        self.interner.intern_all(copy.basic_blocks)
+        for basic_block, copied_block in zip(
+            cfg.basic_blocks, copy.basic_blocks
+        ):
+            self.assertIsNot(basic_block.body, copied_block.body)
+            self.assertEqual(basic_block.summary, copied_block.summary)
+            self.assertIs(
+                basic_block.summary.used, copied_block.summary.used
+            )
+
+    def test_moved_blocks_share_contents(self):
+        cfg = CFG.from_source(self.sample_code, retain_ast=False)
+        moved = CFG.from_source("\n" + self.sample_code, retain_ast=False)
+        self.interner.intern_all(cfg.basic_blocks)
+        self.assertEqual(4, self.interner.intern_all(moved.basic_blocks))
+        self.assertEqual((2, 2), moved.basic_blocks[0].line_range)
+        self.assertEqual(5, moved.basic_blocks[1].body[0].lineno)
+        self.assertEqual(
+            (("print", 5),), moved.basic_blocks[1].summary.calls
+        )
+        self.assertEqual((("print", 4),), cfg.basic_blocks[1].summary.calls)
+
+        computed = []
+
+        def kinds(basic_block):
+            computed.append(basic_block)
+            return basic_block.statement_kinds
+
+        for basic_block in cfg.basic_blocks + moved.basic_blocks:
+            self.interner.memoize(basic_block, "kinds", kinds)
+        self.assertEqual(cfg.basic_blocks, computed)
+        result = self.interner.memoize(moved.basic_blocks[1], "kinds", kinds)
+        self.assertEqual(["Call"], result)
+
+    def test_blocks_laid_out_differently_only_share_results(self):
+        cfg = CFG.from_source("print(\n    x)\n")
+        other = CFG.from_source("print(x)\n")
+        self.interner.intern_all(cfg.basic_blocks)
+        self.assertEqual(0, self.interner.intern_all(other.basic_blocks))
+        self.assertIs(
+            cfg.basic_blocks[0]._interned.results,
+            other.basic_blocks[0]._interned.results,
+        )
+
+    def test_interned_summaries_follow_update(self):
+        sample_code = "def f():\n    x = 1\ndef g():\n    h()\n"
+        cfg = CFG.from_source(sample_code)
+        self.interner.intern_all(cfg.basic_blocks)
+        cfg.basic_blocks[1].summary
+        cfg.update(sample_code.replace("x = 1", "x = 1\n    y = 2"))
+        self.assertEqual((("h", 5),), cfg.scopes["g"][0].summary.calls)
+        copy = CFG.from_source(sample_code)
+        self.assertEqual(1, self.interner.intern_all(copy.basic_blocks[1:]))
+        self.assertEqual((("h", 4),), copy.basic_blocks[1].summary.calls)
+
+    def test_unused_entries_are_evicted(self):
+        cfg = CFG.from_source(self.sample_code, retain_ast=False)
+        self.interner.intern_all(cfg.basic_blocks)
+        self.assertEqual(4, len(self.interner))
+        del cfg
+        gc.collect()
+        self.assertEqual(0, len(self.interner))
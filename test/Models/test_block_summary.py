@@ -0,0 +1,74 @@
+import unittest
+from ast import parse
+from src.models.basic_block import BasicBlock
+from src.models.block_summary import BlockSummary
+
+
+def summarize(source: str) -> BlockSummary:
+    basic_block, _ = BasicBlock.build_from_ast_range(parse(source).body)
+    return basic_block.summary
+
+
+class TestBlockSummary(unittest.TestCase):
+    def test_nested_calls_are_collected(self):
+        sample_code = "x = len(str(y))\n"
+        sample_code += "self.items.append(x)\n"
+        sample_code += "handlers[0]()\n"
+        summary = summarize(sample_code)
+        self.assertEqual(
+            (("len", 1), ("str", 1), ("self.items.append", 2), ("", 3)),
+            summary.calls,
+        )
+
+    def test_names_are_used_and_defined(self):
+        sample_code = "x = x + 1\n"
+        sample_code += "y = x\n"
+        sample_code += "import os.path as p, sys\n"
+        summary = summarize(sample_code)
+        self.assertEqual(("x",), summary.used)
+        self.assertEqual(("x",), summary.exposed)
+        self.assertEqual(("x", "y", "p", "sys"), summary.defined)
+        self.assertEqual(
+            ((0, "x"), (1, "y"), (2, "p"), (2, "sys")), summary.definitions
+        )
+
+    def test_names_read_after_binding_are_not_exposed(self):
+        sample_code = "with open(f) as g:\n"
+        sample_code += "    data = g.read()\n"
+        sample_code += "count += 1\n"
+        summary = summarize(sample_code)
+        self.assertEqual(("open", "f", "g", "count"), summary.used)
+        self.assertEqual(("open", "f", "count"), summary.exposed)
+        self.assertEqual(("read",), summary.attributes)
+
+    def test_nested_scopes_are_left_out(self):
+        sample_code = "squares = [v * v for v in values]\n"
+        sample_code += "key = lambda w: w.name\n"
+        summary = summarize(sample_code)
+        self.assertEqual(("values",), summary.used)
+        self.assertEqual(("squares", "key"), summary.defined)
+        self.assertEqual((), summary.attributes)
+
+    def test_strings_are_interned(self):
+        first = summarize("some_long_variable_name = 1\n")
+        second = summarize("print(some_long_variable_name)\n")
+        self.assertIs(first.defined[0], second.used[1])
+
+    def test_summary_is_collected_once(self):
+        basic_block, _ = BasicBlock.build_from_ast_range(
+            parse("f(x)\n").body
+        )
+        self.assertIs(basic_block.summary, basic_block.summary)
+
+    def test_summarize_at_build_time(self):
+        module = parse("f(x)\nwhile x:\n    pass\n")
+        eager, end = BasicBlock.build_from_ast_range(
+            module.body, summarize=True
+        )
+        self.assertEqual(1, end)
+        self.assertIsNotNone(eager._summary)
+        lazy, _ = BasicBlock.build_from_ast_range(module.body, zero_copy=True)
+        self.assertIsNone(lazy._summary)
+        self.assertEqual(eager.summary, lazy.summary)
+        first, _ = BasicBlock.build_first_from_ast(module.body, True)
+        self.assertEqual(eager.summary, first._summary)
@@ -0,0 +1,29 @@
+import pickle
+import unittest
+from array import array
+from src.models.compact_cfg import CompactCFG
+
+
+class TestCompactCFG(unittest.TestCase):
+    def setUp(self):
+        self.compact = CompactCFG(
+            "sample.py", array("i", [1, 1, 3, 4]), array("i", [0, 1]), 1,
+        )
+
+    def test_counts_blocks_and_edges(self):
+        self.assertEqual(2, self.compact.block_count)
+        self.assertEqual(1, self.compact.edge_count)
+
+    def test_identifiers_are_namespaced(self):
+        self.assertEqual(("sample.py", 1), self.compact.identifier(1))
+
+    def test_lines_of_block(self):
+        self.assertEqual((3, 4), self.compact.lines(1))
+
+    def test_iter_edges(self):
+        self.assertEqual([(0, 1)], list(self.compact.iter_edges()))
+
+    def test_round_trips_through_pickle(self):
+        self.assertEqual(
+            self.compact, pickle.loads(pickle.dumps(self.compact))
+        )
@@ -0,0 +1,39 @@
+import unittest
+from src.models.compact_graph import CompactGraph, CompactNode
+from src.models.node import Node
+
+
+class TestCompactGraph(unittest.TestCase):
+    def setUp(self):
+        nodes = [Node(10), Node(20), Node(30)]
+        for source, destination in ((0, 1), (0, 2), (2, 1)):
+            nodes[source].destinations.add(nodes[destination])
+            nodes[destination].sources.add(nodes[source])
+        self.graph = CompactGraph(nodes, {10: 0, 20: 1, 30: 2})
+
+    def test_successors(self):
+        self.assertEqual([20, 30], list(self.graph.successors(10)))
+        self.assertEqual([], list(self.graph.successors(20)))
+
+    def test_predecessors(self):
+        self.assertEqual([10, 30], list(self.graph.predecessors(20)))
+
+    def test_counts_edges(self):
+        self.assertEqual(3, self.graph.edge_count)
+
+    def test_removed_nodes_have_no_edges(self):
+        graph = CompactGraph([None, Node(1)], {1: 1})
+        self.assertEqual([], list(graph.successors(1)))
+
+    def test_requires_c_int_identifiers(self):
+        nodes = [Node(1), Node(2 ** 40)]
+        nodes[0].destinations.add(nodes[1])
+        nodes[1].sources.add(nodes[0])
+        with self.assertRaises(ValueError):
+            CompactGraph(nodes, {1: 0, 2 ** 40: 1})
+
+    def test_nodes_compare_with_nodes(self):
+        node = CompactNode(10, self.graph)
+        self.assertEqual(Node(10), node)
+        self.assertIn(Node(30), node.destinations)
+        self.assertIn(CompactNode(10, self.graph), {Node(10)})
@@ -87,3 +87,107 @@ class TestEquivalenceClasses(unittest.TestCase):
         self.assertIn(Node(2), source_node.destinations)
         destination_node = self.equivalence_classes.get_node(2)
         self.assertIn(Node(1), destination_node.sources)
+
+    def test_rewire_removes_identifiers(self):
+        for identifier in range(1, 4):
+            self.equivalence_classes.add(identifier)
+        self.equivalence_classes.connect(1, 2)
+        self.equivalence_classes.connect(2, 3)
+        self.equivalence_classes.rewire([2], [], [])
+        self.assertNotIn(2, self.equivalence_classes)
+        self.assertEqual(2, self.equivalence_classes.count)
+        self.assertNotEqual(
+            self.equivalence_classes.find(1), self.equivalence_classes.find(3),
+        )
+        source_node = self.equivalence_classes.get_node(1)
+        self.assertEqual(0, len(source_node.destinations))
+
+    def test_rewire_moves_edges(self):
+        for identifier in range(1, 4):
+            self.equivalence_classes.add(identifier)
+        self.equivalence_classes.connect(1, 2)
+        self.equivalence_classes.rewire([], [(1, 2)], [(2, 3)])
+        self.assertEqual(2, self.equivalence_classes.count)
+        self.assertEqual(
+            self.equivalence_classes.find(2), self.equivalence_classes.find(3),
+        )
+        source_node = self.equivalence_classes.get_node(2)
+        self.assertIn(Node(3), source_node.destinations)
+        source_node = self.equivalence_classes.get_node(1)
+        self.assertNotIn(Node(2), source_node.destinations)
+
+    def test_rewire_errors_with_untracked_identifier(self):
+        self.equivalence_classes.add(1)
+        with self.assertRaises(ValueError):
+            self.equivalence_classes.rewire([2], [], [])
+
+    def test_successors_and_predecessors(self):
+        self.equivalence_classes.add(1)
+        self.equivalence_classes.add(2)
+        self.equivalence_classes.connect(1, 2)
+        self.assertEqual([2], list(self.equivalence_classes.successors(1)))
+        self.assertEqual([1], list(self.equivalence_classes.predecessors(2)))
+        self.equivalence_classes.freeze()
+        self.assertEqual([2], list(self.equivalence_classes.successors(1)))
+        self.assertEqual([1], list(self.equivalence_classes.predecessors(2)))
+
+    def test_frozen_get_node_keeps_links(self):
+        self.equivalence_classes.add(1)
+        self.equivalence_classes.add(2)
+        self.equivalence_classes.connect(1, 2)
+        self.equivalence_classes.freeze()
+        self.assertTrue(self.equivalence_classes.frozen)
+        source_node = self.equivalence_classes.get_node(1)
+        self.assertIn(Node(2), source_node.destinations)
+        destination_node = self.equivalence_classes.get_node(2)
+        self.assertIn(Node(1), destination_node.sources)
+
+    def test_frozen_cannot_change_edges(self):
+        self.equivalence_classes.add(1)
+        self.equivalence_classes.add(2)
+        self.equivalence_classes.freeze()
+        with self.assertRaises(ValueError):
+            self.equivalence_classes.add(3)
+        with self.assertRaises(ValueError):
+            self.equivalence_classes.connect(1, 2)
+        self.equivalence_classes.union(1, 2)
+        self.assertEqual(1, self.equivalence_classes.count)
+
+    def test_union_many_matches_union(self):
+        pairs = [(0, 1), (2, 3), (1, 3), (4, 4), (5, 6)]
+        single = EquivalenceClasses()
+        for identifier in range(8):
+            single.add(identifier)
+            self.equivalence_classes.add(identifier)
+        for identifier_one, identifier_two in pairs:
+            single.union(identifier_one, identifier_two)
+        self.equivalence_classes.union_many(pairs)
+        self.assertEqual(single.count, self.equivalence_classes.count)
+        self.assertEqual(
+            [single.find(identifier) for identifier in range(8)],
+            self.equivalence_classes.find_many(range(8)),
+        )
+
+    def test_union_many_errors_without_partial_union(self):
+        self.equivalence_classes.add(1)
+        self.equivalence_classes.add(2)
+        with self.assertRaises(ValueError):
+            self.equivalence_classes.union_many([[1, 2], [2, 3]])
+        self.assertEqual(2, self.equivalence_classes.count)
+
+    def test_union_many_rejects_malformed_pairs(self):
+        for identifier in range(5):
+            self.equivalence_classes.add(identifier)
+        for pairs in [[(0, 1, 2), (3, 4)], [(0,), (1, 2)], [0, 1]]:
+            with self.assertRaises(ValueError):
+                self.equivalence_classes.union_many(pairs)
+        self.assertEqual(5, self.equivalence_classes.count)
+
+    def test_version_changes_with_edges(self):
+        self.equivalence_classes.add(1)
+        self.equivalence_classes.add(2)
+        version = self.equivalence_classes.version
+        self.equivalence_classes.union(1, 2)
+        self.assertEqual(version, self.equivalence_classes.version)
+        self.equivalence_classes.connect(1, 2)
+        self.assertLess(version, self.equivalence_classes.version)
@@ -0,0 +1,68 @@
+import unittest
+from array import array
+from ast import Call, dump, parse
+from src.models.block_body import BlockBody
+from src.models.source_body import SourceBody, SourceText
+
+
+class TestSourceBody(unittest.TestCase):
+    def setUp(self):
+        self.sample_code = "print('Test')\n"
+        self.sample_code += "while True:\n"
+        self.sample_code += "    x = 1; print(x)\n"
+        self.sample_code += "    y = (\n"
+        self.sample_code += "        x)\n"
+        self.sample_code += "if x: z = 'é'; print(z)\n"
+        self.module = parse(self.sample_code).body
+        self.source = SourceText(self.sample_code)
+
+    def dumps(self, nodes):
+        return [dump(node, include_attributes=True) for node in nodes]
+
+    def test_source_lines(self):
+        self.assertEqual(
+            ["while True:\n", "    x = 1; print(x)\n"],
+            self.source.lines(2, 3),
+        )
+        self.assertEqual(
+            ["if x: z = 'é'; print(z)\n"], self.source.lines(6, 9)
+        )
+
+    def test_nodes_match_block_body(self):
+        for statements in (
+            self.module[:1],
+            self.module[1].body,
+            self.module[2].body,
+        ):
+            body = SourceBody.from_statements(statements, self.source)
+            block_body = BlockBody(statements, 0, len(statements))
+            self.assertEqual(len(block_body), len(body))
+            self.assertEqual(self.dumps(block_body), self.dumps(body))
+
+    def test_positions_and_kinds(self):
+        body = SourceBody.from_statements(self.module[1].body, self.source)
+        self.assertEqual(("Assign", "Call", "Assign"), body.kinds)
+        self.assertEqual((3, 5), body.line_range)
+        self.assertEqual((3, 11, 3, 19), body.position(1))
+        self.assertEqual((4, 4, 5, 10), body.position(-1))
+        with self.assertRaises(IndexError):
+            body.position(3)
+
+    def test_access_parses_statements(self):
+        body = SourceBody.from_statements(self.module[2].body, self.source)
+        self.assertIsInstance(body[1], Call)
+        self.assertIsNot(body[1], body[1])
+        self.assertEqual(self.dumps(body[-1:]), self.dumps(body.nodes()[1:]))
+        with self.assertRaises(IndexError):
+            body[2]
+
+    def test_empty_body(self):
+        body = SourceBody.from_statements([], self.source)
+        self.assertEqual([], body.nodes())
+        self.assertEqual((0, 0), body.line_range)
+
+    def test_mismatched_source(self):
+        positions = array("i", [1, 0, 1, 5] * 3)
+        body = SourceBody(SourceText("x = 1\n"), positions, ("Assign",) * 2)
+        with self.assertRaises(ValueError):
+            body.nodes()
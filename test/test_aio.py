@@ -0,0 +1,115 @@
+import asyncio
+import os
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from src.aio import abuild
+from src.cfg import CFG
+
+
+class _SlowExecutor(ThreadPoolExecutor):
+    """Single thread pool taking long to build one of the files"""
+
+    def __init__(self, slow_path):
+        super().__init__(max_workers=1)
+        self.slow_path = slow_path
+
+    def submit(self, fn, *args):
+        if args[0] != self.slow_path:
+            return super().submit(fn, *args)
+
+        def slow_build():
+            time.sleep(1.5)
+            return fn(*args)
+
+        return super().submit(slow_build)
+
+
+class TestAsyncBuild(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.paths = []
+        for i in range(40):
+            path = os.path.join(self.directory.name, f"module_{i}.py")
+            with open(path, "w") as source_file:
+                source_file.write(f"x = {i}\nif x:\n    print(x)\n")
+            self.paths.append(path)
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.directory.cleanup()
+
+    async def test_builds_every_file(self):
+        results = [result async for result in abuild(self.paths[:4], 2)]
+        self.assertEqual(
+            sorted(self.paths[:4]), sorted(result.path for result in results)
+        )
+        expected = dict(zip(self.paths[:4], CFG.build_many(self.paths[:4])))
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(expected[result.path], result.cfg)
+
+    async def test_errors_are_reported_per_file(self):
+        broken = os.path.join(self.directory.name, "broken.py")
+        with open(broken, "w") as source_file:
+            source_file.write("def f(:\n")
+        missing = os.path.join(self.directory.name, "missing.py")
+        paths = [broken, self.paths[0], missing]
+        results = {
+            result.path: result
+            async for result in abuild(paths, 2, executor=self.executor)
+        }
+        self.assertIsInstance(results[broken].error, SyntaxError)
+        self.assertIsInstance(results[missing].error, FileNotFoundError)
+        self.assertIsNone(results[missing].cfg)
+        self.assertIsNotNone(results[self.paths[0]].cfg)
+
+    async def test_timeout(self):
+        results = [
+            result
+            async for result in abuild(
+                self.paths[:3], 1, timeout=0, executor=self.executor
+            )
+        ]
+        self.assertEqual(3, len(results))
+        for result in results:
+            self.assertIsInstance(result.error, asyncio.TimeoutError)
+
+    async def test_timeout_starts_once_worker_is_free(self):
+        executor = _SlowExecutor(self.paths[0])
+        try:
+            results = {
+                result.path: result
+                async for result in abuild(
+                    self.paths[:4], 1, timeout=0.5, executor=executor
+                )
+            }
+        finally:
+            executor.shutdown()
+        slow = results[self.paths[0]]
+        self.assertIsInstance(slow.error, asyncio.TimeoutError)
+        for path in self.paths[1:4]:
+            self.assertIsNone(results[path].error)
+
+    async def test_reading_waits_for_consumer(self):
+        read = []
+
+        def paths():
+            for path in self.paths:
+                read.append(path)
+                yield path
+
+        results = abuild(paths(), 2, executor=self.executor)
+        await results.__anext__()
+        await asyncio.sleep(0.1)
+        self.assertLess(len(read), 12)
+        await results.aclose()
+        count = len(read)
+        await asyncio.sleep(0.05)
+        self.assertEqual(count, len(read))
+
+    async def test_concurrency_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            await abuild(self.paths, 0).__anext__()
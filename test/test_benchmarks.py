@@ -0,0 +1,67 @@
+import ast
+import unittest
+from benchmarks.generator import generate, shapes
+from benchmarks.suite import compare, platform_name, python_version
+
+
+class TestGenerator(unittest.TestCase):
+    def test_programs_are_deterministic(self):
+        for shape in shapes:
+            source = generate(shape, 30, seed=1)
+            self.assertEqual(source, generate(shape, 30, seed=1))
+            self.assertNotEqual(source, generate(shape, 30, seed=2))
+            ast.parse(source)
+
+
+class TestCompare(unittest.TestCase):
+    def setUp(self):
+        self.baseline = {
+            "format_version": 1,
+            "python": python_version(),
+            "platform": platform_name(),
+            "scale": 1.0,
+            "corpus": 100,
+            "results": {
+                "build/wide": {"seconds": 1.0, "peak_bytes": 1000},
+                "equivalence_classes/find": {
+                    "seconds": 1.0,
+                    "operations_per_second": 100.0,
+                },
+            },
+        }
+
+    def _current(self, seconds, peak_bytes, operations_per_second=100.0):
+        current = dict(self.baseline)
+        current["results"] = {
+            "build/wide": {"seconds": seconds, "peak_bytes": peak_bytes},
+            "equivalence_classes/find": {
+                "seconds": 1.0,
+                "operations_per_second": operations_per_second,
+            },
+        }
+        return current
+
+    def test_no_regression_within_tolerance(self):
+        current = self._current(1.2, 1100, operations_per_second=50.0)
+        self.assertEqual([], compare(current, self.baseline, 0.25))
+
+    def test_regressions_past_tolerance(self):
+        current = self._current(1.5, 2000)
+        self.assertEqual(
+            [
+                ("build/wide", "seconds", 1.0, 1.5),
+                ("build/wide", "peak_bytes", 1000, 2000),
+            ],
+            compare(current, self.baseline, 0.25),
+        )
+
+    def test_refuses_other_environment(self):
+        for setting, value in (
+            ("python", "CPython 2.7.18"),
+            ("platform", "win32-AMD64"),
+            ("scale", 0.5),
+        ):
+            current = self._current(1.0, 1000)
+            current[setting] = value
+            with self.assertRaises(ValueError):
+                compare(current, self.baseline, 0.25)
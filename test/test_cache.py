@@ -0,0 +1,138 @@
+import os
+import pickle
+import sys
+import unittest
+from ast import parse
+from tempfile import TemporaryDirectory
+from unittest import mock
+from src.cache import CFGCache
+from src.cfg import CFG
+
+
+class TestCFGCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.cache = CFGCache(os.path.join(self.directory.name, "cache"))
+        sample_code = "print('Test')\n"
+        sample_code += "while True:\n"
+        sample_code += "    x = 1\n"
+        sample_code += "print('Test')\n"
+        self.source = sample_code.encode()
+        self.path = os.path.join(self.directory.name, "sample.py")
+        with open(self.path, "wb") as source_file:
+            source_file.write(self.source)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _compact(self, source, namespace="sample.py"):
+        return CFG(parse(source).body).to_compact(namespace)
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get(self.source, "sample.py"))
+        self.cache.put(self.source, self._compact(self.source))
+        compact = self.cache.get(self.source, "sample.py")
+        self.assertEqual(self._compact(self.source), compact)
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+    def test_hits_take_requested_namespace(self):
+        self.cache.put(self.source, self._compact(self.source, "a.py"))
+        self.assertEqual("b.py", self.cache.get(self.source, "b.py").namespace)
+
+    def test_keys_depend_on_source(self):
+        self.assertNotEqual(
+            CFGCache.key(self.source), CFGCache.key(self.source + b"\n")
+        )
+
+    def test_keys_depend_on_python_version(self):
+        key = CFGCache.key(self.source)
+        with mock.patch.object(sys, "version_info", (2, 7, 18)):
+            self.assertNotEqual(key, CFGCache.key(self.source))
+
+    def test_unloadable_entries_are_misses(self):
+        path = self.cache._path(CFGCache.key(self.source))
+        self.cache.put(self.source, self._compact(self.source))
+        with open(path, "rb") as entry:
+            valid = entry.read()
+        other_version = valid[:4] + b"\x02" + valid[5:]
+        for data in (b"truncated", valid[:-1], valid + b"\0", other_version):
+            with open(path, "wb") as entry:
+                entry.write(data)
+            self.assertIsNone(self.cache.get(self.source, "sample.py"))
+            self.assertFalse(os.path.exists(path))
+        self.assertEqual(4, self.cache.misses)
+
+    def test_pickles_are_never_loaded(self):
+        path = self.cache._path(CFGCache.key(self.source))
+        with open(path, "wb") as entry:
+            entry.write(pickle.dumps(self._compact(self.source)))
+        with mock.patch.object(pickle, "loads") as loads:
+            self.assertIsNone(self.cache.get(self.source, "sample.py"))
+        loads.assert_not_called()
+        self.assertFalse(os.path.exists(path))
+
+    def test_entries_have_fixed_layout(self):
+        compact = self._compact(self.source)
+        self.cache.put(self.source, compact)
+        path = self.cache._path(CFGCache.key(self.source))
+        with open(path, "rb") as entry:
+            data = entry.read()
+        self.assertEqual(b"PCFC", data[:4])
+        self.assertEqual(
+            20 + 4 * (len(compact.line_ranges) + len(compact.edges)),
+            len(data),
+        )
+
+    def test_overwriting_keeps_size(self):
+        compact = self._compact(self.source)
+        self.cache.put(self.source, compact)
+        size = self.cache._size
+        self.cache.put(self.source, compact)
+        self.assertEqual(size, self.cache._size)
+
+    def test_evict_sweeps_stale_temporary_files(self):
+        stale = os.path.join(self.cache.directory, ".tmp-stale")
+        fresh = os.path.join(self.cache.directory, ".tmp-fresh")
+        for path in (stale, fresh):
+            with open(path, "wb") as temporary_file:
+                temporary_file.write(b"partial")
+        os.utime(stale, (0, 0))
+        self.cache.evict()
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(fresh))
+
+    def test_build_skips_parsing_on_hit(self):
+        first = self.cache.build(self.path)
+        second = self.cache.build(self.path)
+        self.assertEqual(first, second)
+        self.assertEqual(self.path, second.namespace)
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+    def test_entries_are_shared_between_instances(self):
+        self.cache.build(self.path)
+        other = CFGCache(self.cache.directory)
+        other.build(self.path)
+        self.assertEqual(1, other.hits)
+
+    def test_evicts_least_recently_used(self):
+        sources = [b"x = %d\n" % i for i in range(3)]
+        for i, source in enumerate(sources):
+            self.cache.put(source, self._compact(source))
+            path = self.cache._path(CFGCache.key(source))
+            os.utime(path, (i, i))
+        entry_size = os.path.getsize(path)
+        self.cache.get(sources[0], "sample.py")
+
+        self.cache.max_bytes = 2 * entry_size
+        self.cache.evict()
+        self.assertIsNotNone(self.cache.get(sources[0], "sample.py"))
+        self.assertIsNone(self.cache.get(sources[1], "sample.py"))
+        self.assertIsNotNone(self.cache.get(sources[2], "sample.py"))
+
+    def test_build_many_uses_cache(self):
+        CFG.build_many([self.path], cache=self.cache)
+        results = CFG.build_many([self.path, self.path], cache=self.cache)
+        self.assertEqual(2, self.cache.hits)
+        self.assertEqual(self._compact(self.source, self.path), results[0])
@@ -0,0 +1,86 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from src.call_index import CallIndex
+from src.cfg import CFG
+
+
+class TestCallIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = CallIndex()
+        sample_code = "x = load(path)\n"
+        sample_code += "while x:\n"
+        sample_code += "    self.load(x)\n"
+        sample_code += "print(os.path.join(x, 'y'))\n"
+        self.index.add("a.py", CFG.from_source(sample_code))
+        self.index.add("b.py", CFG.from_source("load()\n"))
+
+    def test_callers_by_name(self):
+        self.assertEqual(
+            [("a.py", 0, 1), ("b.py", 0, 1)], self.index.callers("load")
+        )
+        self.assertEqual(
+            [("a.py", 2, 4)], self.index.callers("os.path.join")
+        )
+        self.assertEqual([], self.index.callers("join"))
+
+    def test_callers_with_any_receiver(self):
+        self.assertEqual(
+            [("a.py", 0, 1), ("a.py", 1, 3), ("b.py", 0, 1)],
+            self.index.callers("load", any_receiver=True),
+        )
+        self.assertEqual(
+            [("a.py", 2, 4)], self.index.callers("join", any_receiver=True)
+        )
+
+    def test_add_replaces_postings_of_file(self):
+        self.index.add("a.py", CFG.from_source("y = 1\nload(y)\n"))
+        self.assertEqual(
+            [("b.py", 0, 1), ("a.py", 0, 2)], self.index.callers("load")
+        )
+        self.assertEqual([], self.index.callers("os.path.join"))
+        self.assertEqual(["b.py", "a.py"], self.index.files)
+
+    def test_remove(self):
+        self.index.remove("a.py")
+        self.assertNotIn("a.py", self.index)
+        self.assertEqual([("b.py", 0, 1)], self.index.callers("load"))
+        self.assertEqual([], self.index.callers("print"))
+        self.assertRaises(ValueError, self.index.remove, "a.py")
+
+    def test_remove_keeps_postings_of_other_files(self):
+        postings = self.index.callers("load")
+        kept = self.index._by_name["load"]["b.py"]
+        self.index.remove("a.py")
+        self.assertIs(kept, self.index._by_name["load"]["b.py"])
+        self.index.add("a.py", CFG.from_source("load()\n"))
+        self.assertIs(kept, self.index._by_name["load"]["b.py"])
+        self.assertEqual(postings[1:], self.index.callers("load")[:1])
+
+    def test_save_and_load(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "calls.index")
+            self.index.save(path)
+            loaded = CallIndex.load(path)
+        self.assertEqual(2, len(loaded))
+        self.assertEqual(self.index.callers("load"), loaded.callers("load"))
+        self.assertEqual(
+            self.index.callers("load", any_receiver=True),
+            loaded.callers("load", any_receiver=True),
+        )
+
+    def test_load_rejects_other_files(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "calls.index")
+            with open(path, "wb") as index_file:
+                index_file.write(b"not an index")
+            self.assertRaises(ValueError, CallIndex.load, path)
+
+    def test_build_from_files(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sample.py")
+            with open(path, "w") as source_file:
+                source_file.write("def f():\n    g(h())\n")
+            index = CallIndex.build([path])
+        self.assertEqual([(path, 0, 2)], index.callers("g"))
+        self.assertEqual([(path, 0, 2)], index.callers("h"))
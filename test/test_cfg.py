@@ -1,7 +1,14 @@
-from ast import parse
+import gc
+import os
+import tracemalloc
+from ast import dump, parse
 from src.cfg import CFG
+from src.models.basic_block import BasicBlock
 import unittest
 from _ast import Assign, Call
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from time import perf_counter
 
 
 class TestCFGBuildBasicBlocks(unittest.TestCase):
@@ -166,3 +173,712 @@ class TestParsedEquivalenceClasses(unittest.TestCase):
 
         self.assertEqual(5, len(cfg.basic_blocks))
         self.assertEqual(1, cfg.equivalence_classes.count)
+
+
+class TestCFGFlowSuccessors(unittest.TestCase):
+    @staticmethod
+    def _successors(sample_code):
+        cfg = CFG.from_source(sample_code)
+        return [
+            sorted(cfg.flow_successors(basic_block.identifier))
+            for basic_block in cfg.basic_blocks
+        ]
+
+    def test_branches_join_after_if(self):
+        sample_code = "x = 1\n"
+        sample_code += "if x:\n"
+        sample_code += "    y = 2\n"
+        sample_code += "print(y)\n"
+        self.assertEqual([[1, 2], [2], []], self._successors(sample_code))
+
+    def test_loops_return_to_their_test(self):
+        sample_code = "x = 1\n"
+        sample_code += "while x:\n"
+        sample_code += "    for i in x:\n"
+        sample_code += "        y = 2\n"
+        sample_code += "    z = 3\n"
+        sample_code += "print(x)\n"
+        self.assertEqual(
+            [[1, 2, 3], [1, 2], [1, 2, 3], []],
+            self._successors(sample_code),
+        )
+
+    def test_try_body_raises_into_handlers(self):
+        sample_code = "x = 1\n"
+        sample_code += "try:\n"
+        sample_code += "    y = 2\n"
+        sample_code += "except ValueError:\n"
+        sample_code += "    z = 3\n"
+        sample_code += "except KeyError:\n"
+        sample_code += "    z = 4\n"
+        sample_code += "else:\n"
+        sample_code += "    w = 5\n"
+        sample_code += "finally:\n"
+        sample_code += "    v = 6\n"
+        sample_code += "print(x)\n"
+        # The else clause is built before the handlers
+        self.assertEqual(
+            [[1, 3, 4], [2, 3, 4], [5], [5], [5], [6], []],
+            self._successors(sample_code),
+        )
+
+    def test_functions_and_returns_end_flow(self):
+        sample_code = "def f(x):\n"
+        sample_code += "    w = 0\n"
+        sample_code += "    if x:\n"
+        sample_code += "        return 1\n"
+        sample_code += "    y = 2\n"
+        sample_code += "x = 3\n"
+        sample_code += "print(x)\n"
+        self.assertEqual([[1], [], []], self._successors(sample_code))
+
+    def test_update_matches_full_build(self):
+        sample_code = "def f(x):\n"
+        sample_code += "    while x:\n"
+        sample_code += "        y = 1\n"
+        sample_code += "    return x\n"
+        sample_code += "print(f)\n"
+        edited_code = sample_code.replace("y = 1", "y = 1\n        z = 2")
+        cfg = CFG.from_source(sample_code)
+        cfg.update(edited_code)
+        self.assertEqual(
+            CFG.from_source(edited_code).block_graph().successors,
+            cfg.block_graph().successors,
+        )
+
+
+class TestCFGBuildScaling(unittest.TestCase):
+    @staticmethod
+    def _build_time(ast_nodes):
+        start = perf_counter()
+        CFG(ast_nodes)
+        return perf_counter() - start
+
+    def test_builds_long_modules_without_recursion(self):
+        sample_code = "print('Test')\n"
+        sample_code += "if True:\n"
+        sample_code += "    x = 1\n"
+
+        statements = parse(sample_code).body * 50000
+        cfg = CFG(statements)
+        self.assertEqual(100000, len(cfg.basic_blocks))
+        self.assertEqual(1, cfg.equivalence_classes.count)
+
+    def test_build_time_is_linear(self):
+        sample_code = "print('Test')\n"
+        sample_code += "while True:\n"
+        sample_code += "    x = 1\n"
+        sample_code += "    if x:\n"
+        sample_code += "        print('Test')\n"
+
+        chunk = parse(sample_code).body
+        small = self._build_time(chunk * 5000)
+        large = self._build_time(chunk * 50000)
+        # 10x the statements; a quadratic builder would take ~100x longer
+        self.assertLess(large / small, 30)
+
+
+class TestCFGBuildMany(unittest.TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.paths = []
+        for i in range(6):
+            sample_code = "print('Test')\n"
+            sample_code += "while True:\n"
+            sample_code += "    x = %d\n" % i
+            sample_code += "print('Test')\n" * i
+            path = os.path.join(self.directory.name, "file_%d.py" % i)
+            with open(path, "w") as source_file:
+                source_file.write(sample_code)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_compact_matches_cfg(self):
+        sample_code = "print('Test')\n"
+        sample_code += "if True:\n"
+        sample_code += "    x = 1\n"
+        sample_code += "print('Test')\n"
+
+        cfg = CFG(parse(sample_code).body)
+        compact = cfg.to_compact("sample.py")
+        self.assertEqual(3, compact.block_count)
+        self.assertEqual((1, 1), compact.lines(0))
+        self.assertEqual((3, 3), compact.lines(1))
+        self.assertEqual([(0, 1), (2, 1)], list(compact.iter_edges()))
+        self.assertEqual(1, compact.component_count)
+
+    def test_results_are_namespaced_per_file(self):
+        results = CFG.build_many(self.paths, workers=2, chunksize=2)
+        self.assertEqual(self.paths, [result.namespace for result in results])
+        identifiers = {
+            result.identifier(block)
+            for result in results
+            for block in range(result.block_count)
+        }
+        self.assertEqual(
+            sum(result.block_count for result in results), len(identifiers)
+        )
+
+    def test_parallel_matches_serial(self):
+        self.assertEqual(
+            CFG.build_many(self.paths, workers=1),
+            CFG.build_many(self.paths, workers=3),
+        )
+
+    def test_syntax_errors_are_raised(self):
+        path = os.path.join(self.directory.name, "broken.py")
+        with open(path, "w") as source_file:
+            source_file.write("while True print('Test')\n")
+        with self.assertRaises(SyntaxError):
+            CFG.build_many(self.paths + [path], workers=2)
+
+
+class TestCFGIterBasicBlocks(unittest.TestCase):
+    def setUp(self):
+        sample_code = "print('Test')\n"
+        sample_code += "try:\n"
+        sample_code += "    x = 1\n"
+        sample_code += "except ValueError:\n"
+        sample_code += "    x = 2\n"
+        sample_code += "finally:\n"
+        sample_code += "    print(x)\n"
+        sample_code += "def test_func():\n"
+        sample_code += "    while True:\n"
+        sample_code += "        if x:\n"
+        sample_code += "            y = 3\n"
+        sample_code += "print('Test')\n"
+        self.statements = parse(sample_code).body
+
+    def split(self, stream):
+        basic_blocks, edges = [], []
+        for item in stream:
+            if isinstance(item, BasicBlock):
+                basic_blocks.append(item)
+            else:
+                edges.append(item)
+        return basic_blocks, edges
+
+    def test_stream_matches_cfg(self):
+        cfg = CFG(self.statements)
+        basic_blocks, edges = self.split(
+            CFG.iter_basic_blocks(self.statements)
+        )
+        self.assertEqual(
+            [basic_block.identifier for basic_block in cfg.basic_blocks],
+            [basic_block.identifier for basic_block in basic_blocks],
+        )
+        self.assertEqual(
+            [basic_block.body for basic_block in cfg.basic_blocks],
+            [basic_block.body for basic_block in basic_blocks],
+        )
+        expected_edges = {
+            (basic_block.identifier, destination.identifier)
+            for basic_block in cfg.basic_blocks
+            for destination in cfg.equivalence_classes.get_node(
+                basic_block.identifier
+            ).destinations
+        }
+        self.assertEqual(len(expected_edges), len(edges))
+        self.assertEqual(expected_edges, set(edges))
+
+    def test_summarize_while_streaming(self):
+        cfg = CFG(self.statements)
+        basic_blocks, _ = self.split(
+            CFG.iter_basic_blocks(self.statements, summarize=True)
+        )
+        for basic_block, expected in zip(basic_blocks, cfg.basic_blocks):
+            self.assertIsNotNone(basic_block._summary)
+            self.assertEqual(expected.summary, basic_block.summary)
+
+    def test_edges_follow_their_blocks(self):
+        yielded = set()
+        for item in CFG.iter_basic_blocks(self.statements):
+            if isinstance(item, BasicBlock):
+                yielded.add(item.identifier)
+            else:
+                self.assertIn(item[0], yielded)
+                self.assertIn(item[1], yielded)
+
+    def test_stream_does_not_keep_blocks(self):
+        sample_code = "def test_func():\n"
+        sample_code += "    x = 1\n    if x:\n        y = 2\n" * 2000
+        statements = parse(sample_code).body
+        peaks = []
+        for build in [
+            lambda: CFG(statements),
+            lambda: sum(1 for _ in CFG.iter_basic_blocks(statements)),
+        ]:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                build()
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        built, streamed = peaks
+        self.assertLess(streamed * 10, built)
+
+
+class TestCFGIdentifiers(unittest.TestCase):
+    def setUp(self):
+        self.sample_code = "if True:\n"
+        self.sample_code += "    print('Test')\n"
+        self.sample_code += "else:\n"
+        self.sample_code += "    while True:\n"
+        self.sample_code += "        x = 1\n"
+        self.sample_code += "print('Test')\n"
+
+    def identifiers(self, source):
+        cfg = CFG.from_source(source)
+        return [basic_block.identifier for basic_block in cfg.basic_blocks]
+
+    def test_identifiers_are_dense_from_zero(self):
+        identifiers = self.identifiers(self.sample_code)
+        self.assertEqual(list(range(3)), identifiers)
+
+    def test_identifiers_do_not_depend_on_earlier_builds(self):
+        self.identifiers(self.sample_code * 3)
+        self.assertEqual(list(range(3)), self.identifiers(self.sample_code))
+
+    def test_concurrent_builds_match_serial(self):
+        sources = [self.sample_code * i for i in range(1, 33)]
+        expected = [self.identifiers(source) for source in sources]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            self.assertEqual(
+                expected, list(executor.map(self.identifiers, sources))
+            )
+
+
+class TestCFGUpdate(unittest.TestCase):
+    def setUp(self):
+        self.sample_code = "print('Test')\n"
+        self.sample_code += "def test_func():\n"
+        self.sample_code += "    x = 1\n"
+        self.sample_code += "    while x:\n"
+        self.sample_code += "        x -= 1\n"
+        self.sample_code += "class TestClass:\n"
+        self.sample_code += "    def test_method(self):\n"
+        self.sample_code += "        print('Test')\n"
+        self.sample_code += "print('Test')\n"
+        self.cfg = CFG.from_source(self.sample_code)
+
+    @staticmethod
+    def _snapshot(cfg):
+        positions = {
+            basic_block.identifier: i
+            for i, basic_block in enumerate(cfg.basic_blocks)
+        }
+        bodies = [
+            [dump(node, include_attributes=True) for node in block.body]
+            for block in cfg.basic_blocks
+        ]
+        edges = {
+            (positions[block.identifier], positions[destination.identifier])
+            for block in cfg.basic_blocks
+            for destination in cfg.equivalence_classes.get_node(
+                block.identifier
+            ).destinations
+        }
+        return bodies, edges, cfg.equivalence_classes.count
+
+    def test_update_matches_full_build(self):
+        edited_code = self.sample_code.replace(
+            "        x -= 1\n", "        if x:\n            break\n"
+        )
+        self.cfg.update(edited_code)
+        self.assertEqual(
+            self._snapshot(CFG.from_source(edited_code)),
+            self._snapshot(self.cfg),
+        )
+
+    def test_update_keeps_blocks_outside_scope(self):
+        unchanged = [self.cfg.basic_blocks[0], self.cfg.basic_blocks[-1]]
+        edited_code = self.sample_code.replace(
+            "        print('Test')\n", "        return 1\n"
+        )
+        self.cfg.update(edited_code)
+        self.assertIs(unchanged[0], self.cfg.basic_blocks[0])
+        self.assertIs(unchanged[1], self.cfg.basic_blocks[-1])
+        self.assertEqual(
+            self._snapshot(CFG.from_source(edited_code)),
+            self._snapshot(self.cfg),
+        )
+
+    def test_update_moves_calls_of_following_summaries(self):
+        sample_code = "def f():\n    x=1\n\ndef g():\n    y=h()\n"
+        cfg = CFG.from_source(sample_code, summarize=True)
+        edited_code = sample_code.replace(
+            "    x=1\n", "    x=1\n    x=2\n    x=3\n"
+        )
+        cfg.update(edited_code)
+        self.assertEqual((("h", 7),), cfg.scopes["g"][0].summary.calls)
+
+    def test_update_shifts_following_lines(self):
+        edited_code = self.sample_code.replace(
+            "    x = 1\n", "    x = 1\n    y = 2\n"
+        )
+        self.cfg.update(edited_code)
+        self.assertEqual(10, self.cfg.basic_blocks[-1].body[0].lineno)
+        self.assertEqual(
+            self._snapshot(CFG.from_source(edited_code)),
+            self._snapshot(self.cfg),
+        )
+
+    def test_update_with_changed_lines(self):
+        cfg = CFG(parse(self.sample_code).body)
+        edited_code = self.sample_code.replace("x = 1", "x = 2")
+        cfg.update(edited_code, changed_lines=(3, 3))
+        self.assertEqual(
+            self._snapshot(CFG.from_source(edited_code)),
+            self._snapshot(cfg),
+        )
+
+    def test_module_level_edit_rebuilds(self):
+        first_block = self.cfg.basic_blocks[0]
+        edited_code = "x = 1\n" + self.sample_code
+        self.cfg.update(edited_code)
+        self.assertIsNot(first_block, self.cfg.basic_blocks[0])
+        self.assertEqual(
+            self._snapshot(CFG.from_source(edited_code)),
+            self._snapshot(self.cfg),
+        )
+
+    def test_unchanged_source_is_kept(self):
+        basic_blocks = list(self.cfg.basic_blocks)
+        self.cfg.update(self.sample_code)
+        self.assertEqual(basic_blocks, self.cfg.basic_blocks)
+
+
+class TestCFGLazy(unittest.TestCase):
+    def setUp(self):
+        self.sample_code = "print('Test')\n"
+        self.sample_code += "def test_func():\n"
+        self.sample_code += "    x = 1\n"
+        self.sample_code += "    def inner():\n"
+        self.sample_code += "        y = 2\n"
+        self.sample_code += "    print(x)\n"
+        self.sample_code += "class TestClass:\n"
+        self.sample_code += "    def test_method(self):\n"
+        self.sample_code += "        while True:\n"
+        self.sample_code += "            z = 3\n"
+        self.sample_code += "print('Test')\n"
+
+    def bodies(self, basic_blocks):
+        return [
+            [dump(ast_node) for ast_node in basic_block.body]
+            for basic_block in basic_blocks
+        ]
+
+    def test_scopes_are_named_by_qualname(self):
+        cfg = CFG.from_source(self.sample_code, lazy=True)
+        self.assertEqual(
+            {
+                "test_func",
+                "test_func.<locals>.inner",
+                "TestClass",
+                "TestClass.test_method",
+            },
+            set(cfg.scopes),
+        )
+
+    def test_lazy_build_defers_scopes(self):
+        cfg = CFG.from_source(self.sample_code, lazy=True)
+        self.assertEqual(2, len(cfg.basic_blocks))
+
+    def test_scope_matches_eager_build(self):
+        cfg = CFG.from_source(self.sample_code)
+        lazy_cfg = CFG.from_source(self.sample_code, lazy=True)
+        for qualname in ["TestClass.test_method", "test_func", "TestClass"]:
+            self.assertEqual(
+                self.bodies(cfg.scopes[qualname]),
+                self.bodies(lazy_cfg.scopes[qualname]),
+            )
+        self.assertEqual(
+            cfg.to_compact("sample.py"), lazy_cfg.to_compact("sample.py")
+        )
+
+    def test_built_scopes_are_cached(self):
+        cfg = CFG.from_source(self.sample_code, lazy=True)
+        basic_blocks = cfg.scopes["test_func"]
+        self.assertEqual(3, len(basic_blocks))
+        self.assertEqual(5, len(cfg.basic_blocks))
+        for basic_block, cached_block in zip(
+            basic_blocks, cfg.scopes["test_func"]
+        ):
+            self.assertIs(basic_block, cached_block)
+
+    def test_lazy_graphs_cannot_be_frozen(self):
+        with self.assertRaises(ValueError):
+            CFG.from_source(self.sample_code, lazy=True, freeze=True)
+
+    def test_fallback_builds_every_deferred_scope_at_once(self):
+        handler = "try:\n    x = 1\nexcept ValueError:\n    x = 2\n"
+        sample_code = handler + "def first():\n    y = 1\n"
+        sample_code += handler + "def second():\n    z = 1\n"
+        cfg = CFG.from_source(sample_code, lazy=True)
+        builds = []
+        build = cfg._build
+        cfg._build = lambda: builds.append(build())
+        first = cfg.scopes["first"]
+        second = cfg.scopes["second"]
+        self.assertEqual(1, len(builds))
+        self.assertEqual([first[0], second[0]], cfg.basic_blocks[2::3])
+        eager_cfg = CFG.from_source(sample_code)
+        self.assertEqual(
+            self.bodies(eager_cfg.basic_blocks), self.bodies(cfg.basic_blocks)
+        )
+
+    def test_materialize_all_builds_shadowed_definitions(self):
+        sample_code = "def f(x):\n    a = 1\n    return a\n"
+        sample_code += "def f(x, y):\n    b = 2\n    return b\n"
+        eager_cfg = CFG.from_source(sample_code)
+        cfg = CFG.from_source(sample_code, lazy=True)
+        self.assertEqual(2, len(eager_cfg.basic_blocks))
+        self.assertEqual(1, len(cfg.scopes["f"]))
+        self.assertEqual(1, len(cfg.basic_blocks))
+        cfg.materialize_all()
+        self.assertEqual(
+            self.bodies(eager_cfg.basic_blocks), self.bodies(cfg.basic_blocks)
+        )
+        self.assertEqual(
+            eager_cfg.to_compact("sample.py"), cfg.to_compact("sample.py")
+        )
+
+    def test_update_keeps_scope_deferred(self):
+        edited_code = self.sample_code.replace(
+            "z = 3", "z = 4\n            w = 5"
+        )
+        cfg = CFG.from_source(self.sample_code, lazy=True)
+        cfg.update(edited_code)
+        self.assertEqual(2, len(cfg.basic_blocks))
+        self.assertEqual(
+            self.bodies(CFG.from_source(edited_code).scopes["TestClass"]),
+            self.bodies(cfg.scopes["TestClass"]),
+        )
+
+
+class TestCFGWithoutAST(unittest.TestCase):
+    def setUp(self):
+        self.sample_code = "print('Test')\n"
+        self.sample_code += "def test_func():\n"
+        self.sample_code += "    x = 1; (print(x))\n"
+        self.sample_code += "    if x: y = [\n"
+        self.sample_code += "  x]\n"
+        self.sample_code += "    return y\n"
+        self.sample_code += "class TestClass:\n"
+        self.sample_code += "    z = 3\n"
+        self.sample_code += "print('Test')\n"
+        self.cfg = CFG.from_source(self.sample_code)
+        self.lean_cfg = CFG.from_source(self.sample_code, retain_ast=False)
+
+    def bodies(self, basic_blocks):
+        return [
+            [dump(ast_node, include_attributes=True) for ast_node in body]
+            for body in (basic_block.body for basic_block in basic_blocks)
+        ]
+
+    def test_ast_is_released(self):
+        self.assertIsNone(self.lean_cfg.ast_nodes)
+        gc.collect()
+        self.assertFalse(
+            any(
+                isinstance(obj, Assign)
+                for obj in gc.get_referents(
+                    *(
+                        basic_block.body
+                        for basic_block in self.lean_cfg.basic_blocks
+                    )
+                )
+            )
+        )
+
+    def test_statements_are_parsed_again(self):
+        self.assertEqual(
+            self.bodies(self.cfg.basic_blocks),
+            self.bodies(self.lean_cfg.basic_blocks),
+        )
+
+    def test_positions_and_kinds_are_kept(self):
+        for basic_block, lean_block in zip(
+            self.cfg.basic_blocks, self.lean_cfg.basic_blocks
+        ):
+            self.assertEqual(basic_block.line_range, lean_block.line_range)
+            self.assertEqual(
+                basic_block.statement_kinds, lean_block.statement_kinds
+            )
+        self.assertEqual(
+            self.cfg.to_compact("sample.py"),
+            self.lean_cfg.to_compact("sample.py"),
+        )
+
+    def test_graph_is_unchanged(self):
+        self.assertEqual(
+            set(self.cfg.scopes), set(self.lean_cfg.scopes),
+        )
+        self.assertEqual(
+            self.bodies(self.cfg.scopes["test_func"]),
+            self.bodies(self.lean_cfg.scopes["test_func"]),
+        )
+        self.assertEqual(
+            self.cfg.liveness().live_in(2),
+            self.lean_cfg.liveness().live_in(2),
+        )
+
+    def test_update_drops_ast(self):
+        edited_code = self.sample_code.replace("z = 3", "z = 4\n    w = 5")
+        self.lean_cfg.update(edited_code)
+        self.assertIsNone(self.lean_cfg.ast_nodes)
+        self.assertEqual(
+            self.bodies(CFG.from_source(edited_code).basic_blocks),
+            self.bodies(self.lean_cfg.basic_blocks),
+        )
+
+    def test_lazy_graph_retains_ast(self):
+        with self.assertRaises(ValueError):
+            CFG.from_source(self.sample_code, retain_ast=False, lazy=True)
+
+
+class TestCFGAnalyses(unittest.TestCase):
+    def setUp(self):
+        self.sample_code = "def test_func():\n"
+        self.sample_code += "    print('Test')\n"
+        self.sample_code += "    if True:\n"
+        self.sample_code += "        x = 1\n"
+
+    def test_analyses_are_cached(self):
+        cfg = CFG.from_source(self.sample_code)
+        self.assertIs(cfg.block_graph(), cfg.block_graph())
+        self.assertIs(cfg.dominators(), cfg.dominators())
+        self.assertIsNot(cfg.dominators(), cfg.dominators(post=True))
+        self.assertIs(cfg.reachability(), cfg.reachability())
+        self.assertIsNot(cfg.reachability(), cfg.reachability(0))
+
+    def test_analyses_are_recomputed_after_update(self):
+        cfg = CFG.from_source(self.sample_code)
+        dominators = cfg.dominators()
+        self.assertEqual(2, len(cfg.block_graph()))
+        cfg.update(self.sample_code + "    y = 2\n")
+        self.assertIsNot(dominators, cfg.dominators())
+        self.assertEqual(3, len(cfg.block_graph()))
+
+
+class TestCFGFreeze(unittest.TestCase):
+    def setUp(self):
+        sample_code = "print('Test')\n"
+        sample_code += "if True:\n"
+        sample_code += "    x = 1\n"
+        sample_code += "else:\n"
+        sample_code += "    x = 2\n"
+        sample_code += "print('Test')\n"
+        self.statements = parse(sample_code).body
+
+    def test_frozen_graph_has_same_edges(self):
+        cfg = CFG(self.statements)
+        frozen_cfg = CFG(self.statements, freeze=True)
+        self.assertTrue(frozen_cfg.equivalence_classes.frozen)
+        self.assertEqual(
+            cfg.to_compact("sample.py"), frozen_cfg.to_compact("sample.py")
+        )
+
+    def test_frozen_graph_uses_less_memory(self):
+        statements = self.statements * 2000
+        gc.collect()
+        tracemalloc.start()
+        try:
+            cfg = CFG(statements)
+            gc.collect()
+            with_nodes = tracemalloc.get_traced_memory()[0]
+            cfg.equivalence_classes.freeze()
+            gc.collect()
+            compact = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        # The Node sets take several hundred bytes per block
+        saved = (with_nodes - compact) / len(cfg.basic_blocks)
+        self.assertGreater(saved, 200)
+
+    def test_zero_copy_graph_has_same_blocks(self):
+        cfg = CFG(self.statements)
+        zero_copy_cfg = CFG(self.statements, zero_copy=True)
+        self.assertEqual(
+            [basic_block.body for basic_block in cfg.basic_blocks],
+            [basic_block.body for basic_block in zero_copy_cfg.basic_blocks],
+        )
+        self.assertEqual(
+            cfg.to_compact("sample.py"), zero_copy_cfg.to_compact("sample.py")
+        )
+
+    def test_update_rebuilds_frozen_graph(self):
+        sample_code = "def test_func():\n"
+        sample_code += "    print('Test')\n"
+        cfg = CFG.from_source(sample_code, freeze=True)
+        cfg.update(sample_code + "    x = 1\n")
+        self.assertTrue(cfg.equivalence_classes.frozen)
+        self.assertEqual(1, len(cfg.basic_blocks))
+        self.assertEqual(2, len(cfg.basic_blocks[0].body))
+
+
+class TestCFGStats(unittest.TestCase):
+    def setUp(self):
+        sample_code = "x = 1\n"
+        sample_code += "if x:\n"
+        sample_code += "    while x:\n"
+        sample_code += "        y = 2\n"
+        sample_code += "print(x)\n"
+        self.sample_code = sample_code
+
+    def test_stats_are_off_by_default(self):
+        self.assertIsNone(CFG.from_source(self.sample_code).stats)
+
+    def test_stats_count_blocks_edges_and_depth(self):
+        cfg = CFG.from_source(self.sample_code, stats=True)
+        stats = cfg.stats
+        self.assertEqual(3, stats.block_count)
+        self.assertEqual(2, stats.edge_count)
+        self.assertEqual(cfg.equivalence_classes.count, stats.component_count)
+        self.assertEqual(2, stats.max_depth)
+        self.assertEqual(2, stats.phase_calls["link"])
+        self.assertGreater(stats.phase_calls["union_find"], 0)
+        self.assertGreaterEqual(stats.find_path_max, 0)
+        self.assertGreaterEqual(
+            stats.total_seconds, stats.phase_seconds["build_blocks"]
+        )
+        self.assertEqual(
+            stats.phase_calls["build_blocks"], stats.phase_calls["validate"]
+        )
+        self.assertEqual(
+            stats.phase_calls["build_blocks"], stats.phase_calls["build_body"]
+        )
+        self.assertNotIn("freeze", stats.phase_seconds)
+
+    def test_stats_describe_last_full_build(self):
+        sample_code = "x = 1\ndef f():\n    y = 2\n"
+        received = []
+        cfg = CFG.from_source(sample_code, stats_hook=received.append)
+        cfg.update(sample_code.replace("y = 2", "y = 3"))
+        self.assertEqual(1, len(received))
+        self.assertIs(received[0], cfg.stats)
+        self.assertEqual(2, cfg.stats.block_count)
+        cfg.update(sample_code.replace("x = 1", "x = 1\nz = 3"))
+        self.assertEqual(2, len(received))
+        self.assertIs(received[1], cfg.stats)
+
+    def test_stats_hook_receives_stats(self):
+        received = []
+        cfg = CFG.from_source(
+            self.sample_code, freeze=True, stats_hook=received.append
+        )
+        self.assertEqual([cfg.stats], received)
+        self.assertEqual(1, cfg.stats.phase_calls["freeze"])
+        summary = received[0].as_dict()
+        self.assertEqual(cfg.stats.block_count, summary["block_count"])
+
+    def test_instrumentation_is_removed_after_build(self):
+        cfg = CFG.from_source(self.sample_code, stats=True)
+        self.assertNotIn("_build_block", vars(cfg))
+        self.assertNotIn("_resolve_nested_link", vars(cfg))
+        self.assertNotIn("_find_root", vars(cfg.equivalence_classes))
+        cfg.equivalence_classes.connect(2, 0)
+        self.assertEqual(cfg.stats.edge_count, 2)
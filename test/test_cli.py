@@ -0,0 +1,124 @@
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import mock
+from src.cli import find_files, main, run, summarize_file
+
+
+class TestCLI(unittest.TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.root = self.directory.name
+        os.makedirs(os.path.join(self.root, "package", "nested"))
+        self.files = {
+            "package/a.py": "x = 1\nif x:\n    y = 2\n",
+            "package/nested/b.py": "def f():\n    return 1\n",
+            "package/notes.txt": "not python",
+            "broken.py": "def f(:\n",
+        }
+        for name, source in self.files.items():
+            with open(os.path.join(self.root, name), "w") as source_file:
+                source_file.write(source)
+        self.package = os.path.join(self.root, "package")
+        self.broken = os.path.join(self.root, "broken.py")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def summaries(self, *args, **kwargs):
+        output = StringIO()
+        failures = run(*args, output=output, **kwargs)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        return failures, sorted(lines, key=lambda summary: summary["path"])
+
+    def test_find_files_searches_directories(self):
+        self.assertEqual(
+            [
+                os.path.join(self.package, "a.py"),
+                os.path.join(self.package, "nested", "b.py"),
+                self.broken,
+            ],
+            list(find_files([self.package, self.broken])),
+        )
+
+    def test_summaries(self):
+        failures, summaries = self.summaries([self.package])
+        self.assertEqual(0, failures)
+        self.assertEqual(2, len(summaries))
+        summary = summaries[0]
+        self.assertEqual(os.path.join(self.package, "a.py"), summary["path"])
+        self.assertEqual(2, summary["blocks"])
+        self.assertEqual(1, summary["edges"])
+        self.assertEqual(1, summary["components"])
+        self.assertGreaterEqual(summary["build_seconds"], 0)
+
+    def test_errors_are_reported_per_file(self):
+        failures, summaries = self.summaries([self.broken, self.package])
+        self.assertEqual(1, failures)
+        self.assertEqual(self.broken, summaries[0]["path"])
+        self.assertTrue(summaries[0]["error"].startswith("SyntaxError"))
+
+    def test_unexpected_errors_are_reported_per_file(self):
+        path = os.path.join(self.package, "a.py")
+        with mock.patch("src.cli.CFG", side_effect=TypeError("boom")):
+            summary = summarize_file(path)
+        self.assertEqual({"path": path, "error": "TypeError: boom"}, summary)
+
+    def test_files_in_flight_are_bounded(self):
+        paths = []
+        for i in range(20):
+            path = os.path.join(self.root, f"module_{i}.py")
+            with open(path, "w") as source_file:
+                source_file.write(f"x = {i}\n")
+            paths.append(path)
+        found = []
+        in_flight = []
+
+        def files(paths, changed_since):
+            for path in paths:
+                found.append(path)
+                yield path
+
+        class Output(StringIO):
+            def write(self, text):
+                if text != "\n":
+                    in_flight.append(len(found) - len(in_flight))
+                return super().write(text)
+
+        with mock.patch("src.cli.find_files", files):
+            self.assertEqual(0, run(paths, jobs=2, output=Output()))
+        self.assertEqual(20, len(in_flight))
+        self.assertLessEqual(max(in_flight), 5)
+
+    def test_worker_processes_match_serial_run(self):
+        serial = self.summaries([self.package])[1]
+        parallel = self.summaries([self.package], jobs=2)[1]
+        for summaries in (serial, parallel):
+            for summary in summaries:
+                del summary["parse_seconds"], summary["build_seconds"]
+        self.assertEqual(serial, parallel)
+
+    def test_changed_since(self):
+        old = os.path.join(self.package, "a.py")
+        os.utime(old, (1000000000, 1000000000))
+        _, summaries = self.summaries(
+            [self.package], changed_since=1500000000
+        )
+        self.assertEqual(
+            [os.path.join(self.package, "nested", "b.py")],
+            [summary["path"] for summary in summaries],
+        )
+
+    def test_main(self):
+        output = StringIO()
+        with redirect_stdout(output):
+            status = main(
+                ["-j", "1", "--changed-since", "2001-01-01", self.package]
+            )
+        self.assertEqual(0, status)
+        self.assertEqual(2, len(output.getvalue().splitlines()))
+        with redirect_stdout(StringIO()):
+            self.assertEqual(1, main([self.broken]))
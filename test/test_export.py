@@ -0,0 +1,99 @@
+import json
+import unittest
+from io import StringIO
+from xml.dom.minidom import parseString
+from src.cfg import CFG
+from src.export import write_dot, write_graphml, write_json_lines
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        sample_code = "x = 1\n"
+        sample_code += "if x:\n"
+        sample_code += "    y = 2\n"
+        sample_code += "    z = 3\n"
+        sample_code += "def f():\n"
+        sample_code += "    while a:\n"
+        sample_code += "        b()\n"
+        # Edges are 0 -> 1 and 2 -> 1
+        self.cfg = CFG.from_source(sample_code)
+
+    def export(self, write, **kwargs) -> str:
+        output = StringIO()
+        write(self.cfg, output, **kwargs)
+        return output.getvalue()
+
+    def test_dot(self):
+        self.assertEqual(
+            "digraph CFG {\n"
+            "    node [shape=box];\n"
+            '    0 [label="line 1"];\n'
+            "    0 -> 1;\n"
+            '    1 [label="lines 3-4"];\n'
+            '    2 [label="line 7"];\n'
+            "    2 -> 1;\n"
+            "}\n",
+            self.export(write_dot),
+        )
+
+    def test_graphml(self):
+        document = parseString(self.export(write_graphml))
+        nodes = document.getElementsByTagName("node")
+        edges = document.getElementsByTagName("edge")
+        self.assertEqual(
+            ["0", "1", "2"], [node.getAttribute("id") for node in nodes]
+        )
+        self.assertEqual(
+            [("0", "1"), ("2", "1")],
+            [
+                (edge.getAttribute("source"), edge.getAttribute("target"))
+                for edge in edges
+            ],
+        )
+        label = nodes[1].getElementsByTagName("data")[0]
+        self.assertEqual("lines 3-4", label.firstChild.data)
+
+    def test_json_lines(self):
+        records = [
+            json.loads(line)
+            for line in self.export(write_json_lines).splitlines()
+        ]
+        self.assertEqual(
+            {
+                "type": "block",
+                "id": 1,
+                "first_line": 3,
+                "last_line": 4,
+                "label": "lines 3-4",
+            },
+            records[2],
+        )
+        self.assertEqual(
+            [(0, 1), (2, 1)],
+            [
+                (record["source"], record["destination"])
+                for record in records
+                if record["type"] == "edge"
+            ],
+        )
+
+    def test_scope_filter_drops_edges_leaving_scope(self):
+        records = [
+            json.loads(line)
+            for line in self.export(write_json_lines, scope="f").splitlines()
+        ]
+        self.assertEqual([2], [record["id"] for record in records])
+
+    def test_component_filter(self):
+        component = self.cfg.equivalence_classes.find(0)
+        self.assertEqual(
+            self.export(write_dot),
+            self.export(write_dot, component=component),
+        )
+        self.assertEqual(
+            "digraph CFG {\n    node [shape=box];\n}\n",
+            self.export(write_dot, component=component + 1),
+        )
+
+    def test_unknown_scope(self):
+        self.assertRaises(ValueError, self.export, write_dot, scope="g")
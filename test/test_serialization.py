@@ -0,0 +1,90 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from src.cfg import CFG
+from src.serialization import MappedCFG, format_version
+
+
+class TestSerialization(unittest.TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "sample.pcfg")
+        sample_code = "x = 1\n"
+        sample_code += "if x:\n"
+        sample_code += "    y = 2\n"
+        sample_code += "    print(y)\n"
+        sample_code += "while x:\n"
+        sample_code += "    z = 3\n"
+        self.cfg = CFG.from_source(sample_code)
+        self.cfg.save(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_edges_and_classes_round_trip(self):
+        equivalence_classes = self.cfg.equivalence_classes
+        with MappedCFG(self.path) as mapped:
+            self.assertEqual(len(self.cfg.basic_blocks), mapped.block_count)
+            self.assertEqual(equivalence_classes.count, mapped.component_count)
+            for basic_block in self.cfg.basic_blocks:
+                identifier = basic_block.identifier
+                self.assertEqual(
+                    sorted(equivalence_classes.successors(identifier)),
+                    mapped.successors(identifier),
+                )
+                self.assertEqual(
+                    sorted(equivalence_classes.predecessors(identifier)),
+                    mapped.predecessors(identifier),
+                )
+            for source in self.cfg.basic_blocks:
+                for destination in self.cfg.basic_blocks:
+                    self.assertEqual(
+                        equivalence_classes.find(source.identifier)
+                        == equivalence_classes.find(destination.identifier),
+                        mapped.find(source.identifier)
+                        == mapped.find(destination.identifier),
+                    )
+
+    def test_block_metadata(self):
+        with MappedCFG(self.path) as mapped:
+            self.assertEqual((3, 4), mapped.line_range(1))
+            self.assertEqual(["Assign", "Call"], mapped.statement_kinds(1))
+            self.assertEqual(["Assign"], mapped.statement_kinds(0))
+
+    def test_identifiers_that_are_not_positions(self):
+        sample_code = "def f():\n"
+        sample_code += "    x = 1\n"
+        sample_code += "    if x:\n"
+        sample_code += "        y = 2\n"
+        sample_code += "z = f()\n"
+        cfg = CFG.from_source(sample_code, lazy=True)
+        cfg.scopes["f"]
+        cfg.save(self.path)
+        with MappedCFG(self.path) as mapped:
+            self.assertEqual([1, 2, 0], list(mapped.identifiers))
+            self.assertEqual([2], mapped.successors(1))
+            self.assertEqual((5, 5), mapped.line_range(0))
+            self.assertRaises(ValueError, mapped.successors, 3)
+
+    def test_unknown_block(self):
+        with MappedCFG(self.path) as mapped:
+            self.assertRaises(ValueError, mapped.find, 10)
+            self.assertRaises(ValueError, mapped.line_range, -1)
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as cfg_file:
+            cfg_file.write(b"not a graph at all, not even close")
+        self.assertRaises(ValueError, MappedCFG, self.path)
+        open(self.path, "wb").close()
+        self.assertRaises(ValueError, MappedCFG, self.path)
+
+    def test_rejects_other_versions_and_truncation(self):
+        with open(self.path, "rb") as cfg_file:
+            data = cfg_file.read()
+        version = (format_version + 1).to_bytes(4, "little")
+        with open(self.path, "wb") as cfg_file:
+            cfg_file.write(data[:4] + version + data[8:])
+        self.assertRaises(ValueError, MappedCFG, self.path)
+        with open(self.path, "wb") as cfg_file:
+            cfg_file.write(data[:-1])
+        self.assertRaises(ValueError, MappedCFG, self.path)